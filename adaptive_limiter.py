@@ -0,0 +1,115 @@
+from functools import wraps
+from typing import Optional
+
+from rate_limiter import TokenBucket
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token bucket whose rate follows the health of the backend it protects
+    (additive increase, multiplicative decrease).
+
+    Callers report each call's latency and whether it failed. Outcomes are
+    judged once per ``interval``: if any call failed or the mean latency
+    exceeded ``latency_target`` the rate is multiplied by ``backoff``;
+    otherwise ``increase`` is added, but only if callers used at least half of
+    the allowed rate: a rate nobody uses says nothing about the backend and
+    would otherwise grow without limit. The rate always stays within
+    [floor, ceiling].
+    """
+    def __init__(self, initial_rate: float, floor: float, ceiling: float, latency_target: float,
+                 increase: Optional[float] = None, backoff: float = 0.5, interval: float = 1.0,
+                 burst: float = 1, **options):
+        """
+        Args:
+            initial_rate: Calls per second to start with
+            floor: Lowest rate the limiter backs off to
+            ceiling: Highest rate the limiter grows to
+            latency_target: Mean latency (seconds) above which the backend counts as overloaded
+            increase: Calls per second added after a healthy interval; defaults to 5% of ceiling
+            backoff: Factor applied to the rate after an unhealthy interval
+            interval: Seconds of outcomes judged together
+            burst: Bucket capacity
+            **options: clock and sleep overrides accepted by RateLimiter
+        """
+        if not 0 < floor <= initial_rate <= ceiling:
+            raise ValueError("Rates must satisfy 0 < floor <= initial_rate <= ceiling")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        super().__init__(initial_rate, burst, **options)
+        self.floor = floor
+        self.ceiling = ceiling
+        self.latency_target = latency_target
+        self.increase = ceiling * 0.05 if increase is None else increase
+        self.backoff = backoff
+        self.interval = interval
+        self._window_start = self.clock()
+        self._calls = 0
+        self._errors = 0
+        self._latency_total = 0.0
+
+    def record(self, latency: float, error: bool = False) -> None:
+        """
+        Reports the outcome of one call.
+
+        Args:
+            latency: Seconds the call took
+            error: Whether the call failed
+        """
+        with self._lock:
+            now = self.clock()
+            if now - self._window_start >= self.interval:
+                self._adjust(now)
+            self._calls += 1
+            self._errors += error
+            self._latency_total += latency
+
+    def _adjust(self, now: float) -> None:
+        if self._calls:
+            overloaded = self._errors or self._latency_total / self._calls > self.latency_target
+            if overloaded:
+                rate = max(self.floor, self.rate * self.backoff)
+            elif self._calls >= 0.5 * self.rate * (now - self._window_start):
+                rate = min(self.ceiling, self.rate + self.increase)
+            else:
+                rate = self.rate
+            # Settle tokens earned at the old rate before switching
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+        self._window_start = now
+        self._calls = self._errors = 0
+        self._latency_total = 0.0
+
+
+def adaptive_rate_limit(limiter: AdaptiveRateLimiter, blocking: bool = True, timeout: Optional[float] = None):
+    """
+    Rate-limit decorator that feeds each call's latency and exceptions back to the limiter.
+
+    Args:
+        limiter: Adaptive limiter shared by every call of the decorated function
+        blocking: Wait for a token; otherwise calls over the limit return None
+        timeout: Maximum seconds a blocking call waits before returning None
+
+    Returns:
+        Decorator for the function to limit
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            acquired = limiter.acquire(timeout=timeout) if blocking else limiter.try_acquire()
+            if not acquired:
+                return None
+            start = limiter.clock()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                limiter.record(limiter.clock() - start, error=True)
+                raise
+            limiter.record(limiter.clock() - start)
+            return result
+        wrapper.limiter = limiter
+        return wrapper
+    return decorator
@@ -0,0 +1,162 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Optional, Union
+
+from canonical_hash import canonical_digest
+from key_spec import MISSING, KeySpec, compile_key_spec
+
+
+class AsyncDeduplicator:
+    """
+    Deduplication stage for asyncio pipelines.
+
+    Records are pulled from an async source only as fast as the consumer pulls
+    unique records out, so a slow consumer slows the source down instead of
+    letting records pile up. When an executor is given, key functions run on it
+    with at most ``max_in_flight`` records read ahead, and records are still
+    released in input order so the first occurrence of each key wins.
+    """
+    def __init__(self, key_func: Union[Callable[[Dict], Any], KeySpec], executor: Optional[Executor] = None,
+                 max_in_flight: int = 64, seen: Optional[Any] = None):
+        """
+        Args:
+            key_func: Function that takes a record and returns its dedup key
+                (or key_spec.MISSING to skip it), or a key spec to compile;
+                records lacking a single key path are skipped
+            executor: Optional executor for expensive key functions; a
+                ProcessPoolExecutor needs a picklable, module-level key_func
+            max_in_flight: Maximum number of key computations pending on the executor
+            seen: Optional set-like container for seen keys, e.g. an
+                ApproximateSeenSet for fixed-memory approximate dedup
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        # A lone path compiles with MISSING so records lacking it are skipped,
+        # as in async_deduplicate_by_key, instead of sharing the key None
+        default = MISSING if isinstance(key_func, str) else None
+        self.key_func = compile_key_spec(key_func, default=default)
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.seen = set() if seen is None else seen
+        self.passed = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    def _accept(self, key: Any) -> bool:
+        if key is MISSING:
+            self.skipped += 1
+            return False
+        if key in self.seen:
+            self.dropped += 1
+            return False
+        self.seen.add(key)
+        self.passed += 1
+        return True
+
+    async def filter(self, source: AsyncIterable[Dict]) -> AsyncIterator[Dict]:
+        """
+        Yields the records of source whose key has not been seen before.
+
+        Args:
+            source: Async iterable of records
+
+        Returns:
+            Async iterator of unique records, in input order
+        """
+        if self.executor is None:
+            async for record in source:
+                if self._accept(self.key_func(record)):
+                    yield record
+            return
+
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            async for record in source:
+                pending.append((record, loop.run_in_executor(self.executor, self.key_func, record)))
+                while len(pending) >= self.max_in_flight:
+                    record, future = pending.popleft()
+                    if self._accept(await future):
+                        yield record
+            while pending:
+                record, future = pending.popleft()
+                if self._accept(await future):
+                    yield record
+        finally:
+            # The consumer stopped early or the source failed
+            for _, future in pending:
+                future.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Counts of records passed through, dropped as duplicates and skipped for a missing key
+        """
+        return {"passed": self.passed, "dropped": self.dropped, "skipped": self.skipped}
+
+
+def async_deduplicate_by_key(source: AsyncIterable[Dict], key: KeySpec, **options) -> AsyncIterator[Dict]:
+    """
+    Async version of deduplicate_by_key; records missing the key are skipped.
+
+    Args:
+        source: Async iterable of records
+        key: The key to use for deduplication (dotted paths and compiled key specs work too)
+        **options: Executor and backpressure options accepted by AsyncDeduplicator
+
+    Returns:
+        Async iterator of deduplicated objects
+    """
+    return AsyncDeduplicator(compile_key_spec(key, default=MISSING), **options).filter(source)
+
+
+def async_deduplicate_by_multiple_keys(source: AsyncIterable[Dict], keys: KeySpec,
+                                       **options) -> AsyncIterator[Dict]:
+    """
+    Async version of deduplicate_by_multiple_keys.
+
+    Args:
+        source: Async iterable of records
+        keys: List of keys (or dotted paths) to use for deduplication, or a compiled key spec
+        **options: Executor and backpressure options accepted by AsyncDeduplicator
+
+    Returns:
+        Async iterator of deduplicated objects
+    """
+    key_func = compile_key_spec(keys) if callable(keys) else compile_key_spec(list(keys))
+    return AsyncDeduplicator(key_func, **options).filter(source)
+
+
+def async_deduplicate_by_custom_function(source: AsyncIterable[Dict],
+                                         key_func: Union[Callable[[Dict], Any], KeySpec],
+                                         **options) -> AsyncIterator[Dict]:
+    """
+    Async version of deduplicate_by_custom_function.
+
+    Args:
+        source: Async iterable of records
+        key_func: Function that takes an object and returns a key for deduplication
+        **options: Executor and backpressure options accepted by AsyncDeduplicator
+
+    Returns:
+        Async iterator of deduplicated objects
+    """
+    return AsyncDeduplicator(key_func, **options).filter(source)
+
+
+def async_deduplicate_by_json_string(source: AsyncIterable[Dict], **options) -> AsyncIterator[Dict]:
+    """
+    Async version of deduplicate_by_json_string.
+
+    Hashing whole records is the most expensive key function here, so this is
+    the strategy that benefits most from an executor.
+
+    Args:
+        source: Async iterable of records
+        **options: Executor and backpressure options accepted by AsyncDeduplicator
+
+    Returns:
+        Async iterator of deduplicated objects
+    """
+    return AsyncDeduplicator(canonical_digest, **options).filter(source)
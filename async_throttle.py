@@ -0,0 +1,188 @@
+import asyncio
+import inspect
+from collections import deque
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+
+# Slack for float rounding in the token count, as in rate_limiter
+_EPSILON = 1e-9
+
+
+class AsyncThrottle:
+    """
+    Rate limiter and concurrency limiter for coroutine functions.
+
+    Calls over the limit are queued in FIFO order instead of being dropped.
+    A token bucket releases them at ``rate`` per second (with bursts of up to
+    ``burst``), and at most ``max_concurrency`` admitted calls run at once.
+    The queue is driven by a single event-loop timer that fires when the next
+    token is due, so waiting calls cost no CPU. A queued call can be
+    cancelled like any task, and gives up with asyncio.TimeoutError once its
+    deadline passes.
+
+    Use an instance as a decorator, call run(), or hold a slot with
+    ``async with throttle:``.
+    """
+    def __init__(self, rate: float, burst: float = 1, max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            rate: Calls admitted per second
+            burst: Calls that may be admitted back to back after a quiet period
+            max_concurrency: Maximum number of admitted calls running at once
+            timeout: Default number of seconds a call may wait in the queue
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.active = 0
+        self._tokens = burst
+        self._updated = None
+        self._waiters = deque()
+        self._timer = None
+
+    @property
+    def pending(self) -> int:
+        """Number of calls waiting in the queue."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _has_slot(self) -> bool:
+        return self.max_concurrency is None or self.active < self.max_concurrency
+
+    def _admit(self) -> None:
+        self._tokens = max(0.0, self._tokens - 1)
+        self.active += 1
+
+    def _wake(self) -> None:
+        """Admits queued calls in order while tokens and slots allow."""
+        loop = asyncio.get_running_loop()
+        self._refill(loop.time())
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.done():
+                # Cancelled or timed out while queued
+                self._waiters.popleft()
+                continue
+            if not self._has_slot():
+                # release() wakes the queue when a slot frees up
+                return
+            if self._tokens + _EPSILON < 1:
+                if self._timer is None:
+                    self._timer = loop.call_later((1 - self._tokens) / self.rate, self._on_timer)
+                return
+            self._waiters.popleft()
+            self._admit()
+            waiter.set_result(None)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._wake()
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_exception(asyncio.TimeoutError("Call was not admitted before its deadline"))
+            self._wake()
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """
+        Waits until a call may start, taking one token and one concurrency slot.
+
+        Args:
+            timeout: Seconds to wait in the queue; defaults to the throttle's timeout
+
+        Raises:
+            asyncio.TimeoutError: If the call was not admitted in time
+        """
+        loop = asyncio.get_running_loop()
+        self._refill(loop.time())
+        if not self._waiters and self._has_slot() and self._tokens + _EPSILON >= 1:
+            self._admit()
+            return
+
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else loop.call_later(timeout, self._expire, waiter)
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # Admitted just before being cancelled: hand the token and slot back
+                self._tokens = min(self.burst, self._tokens + 1)
+                self.release()
+            raise
+        finally:
+            if deadline is not None:
+                deadline.cancel()
+
+    def release(self) -> None:
+        """Frees the concurrency slot taken by acquire()."""
+        self.active -= 1
+        self._wake()
+
+    async def __aenter__(self) -> "AsyncThrottle":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release()
+
+    async def run(self, func: Callable[..., Awaitable], *args, timeout: Optional[float] = None,
+                  **kwargs) -> Any:
+        """
+        Runs a coroutine function once the throttle admits it.
+
+        Args:
+            func: Coroutine function to call
+            *args: Positional arguments for func
+            timeout: Seconds to wait in the queue; defaults to the throttle's timeout
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The result of func
+        """
+        await self.acquire(timeout)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self.release()
+
+    def __call__(self, func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        if not inspect.iscoroutinefunction(func):
+            raise TypeError(f"{func.__name__} is not a coroutine function")
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await self.run(func, *args, **kwargs)
+        wrapper.throttle = self
+        return wrapper
+
+
+def async_throttle(rate: float, burst: float = 1, max_concurrency: Optional[int] = None,
+                   timeout: Optional[float] = None) -> AsyncThrottle:
+    """
+    Throttle decorator for coroutine functions that queues excess calls.
+
+    Args:
+        rate: Calls admitted per second
+        burst: Calls that may be admitted back to back after a quiet period
+        max_concurrency: Maximum number of admitted calls running at once
+        timeout: Seconds a call may wait in the queue before raising asyncio.TimeoutError
+
+    Returns:
+        Decorator for the coroutine function to throttle
+    """
+    return AsyncThrottle(rate, burst, max_concurrency, timeout)
@@ -0,0 +1,274 @@
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from canonical_hash import key_digest
+
+# Keys DiskKeySet.add buffers in memory before writing them in one transaction
+_DISK_BATCH = 10_000
+_MASK64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """
+    A compact bit-array Bloom filter sized for a target false-positive rate.
+
+    Memory is fixed at construction time; adding more keys than
+    ``expected_items`` keeps memory flat but raises the false-positive rate.
+    """
+    def __init__(self, expected_items: int, error_rate: float = 0.01):
+        """
+        Initializes the filter.
+
+        Args:
+            expected_items: Number of distinct keys the filter is sized for
+            error_rate: Target false-positive rate at ``expected_items`` keys
+        """
+        if expected_items < 1:
+            raise ValueError("expected_items must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.expected_items = expected_items
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-expected_items * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / expected_items * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.bits_set = 0
+        self._probes = range(self.num_hashes)
+        self._last_key = self._last_hashes = None
+
+    def _hashes(self, key: Any) -> Tuple[int, int]:
+        # hash() agrees with == (1, 1.0 and True share one) like the set the
+        # filter stands in for; two multiplicative mixes spread it into the
+        # pair of hashes that double hashing derives all k positions from.
+        # Both are reduced below num_bits so the probe loops use small ints.
+        h1 = (hash(key) * 0x9E3779B97F4A7C15) & _MASK64
+        h2 = (((h1 >> 29) ^ h1) * 0xBF58476D1CE4E5B9) & _MASK64
+        hashes = self._last_hashes = (h1 % self.num_bits, h2 % (self.num_bits - 1) + 1)
+        self._last_key = key
+        return hashes
+
+    def __contains__(self, key: Any) -> bool:
+        # Dedup loops test a key and then add the same object, so the last
+        # key's hashes are reused instead of computed again
+        pos, step = self._last_hashes if key is self._last_key else self._hashes(key)
+        bits, m = self.bits, self.num_bits
+        for _ in self._probes:
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+            pos += step
+            if pos >= m:
+                pos -= m
+        return True
+
+    def add(self, key: Any) -> bool:
+        """
+        Adds a key to the filter.
+
+        Args:
+            key: The key to add; any hashable value.
+
+        Returns:
+            True if the key was possibly present already, False if it was definitely new.
+        """
+        pos, step = self._last_hashes if key is self._last_key else self._hashes(key)
+        bits, m = self.bits, self.num_bits
+        present = True
+        for _ in self._probes:
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            pos += step
+            if pos >= m:
+                pos -= m
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                self.bits_set += 1
+                present = False
+        if not present:
+            self.count += 1
+        return present
+
+    def estimated_false_positive_rate(self) -> float:
+        """Current false-positive probability, estimated from the fraction of bits set."""
+        return (self.bits_set / self.num_bits) ** self.num_hashes
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+class DiskKeySet:
+    """
+    An exact set of keys kept in a SQLite file instead of memory.
+
+    Keys are stored as canonical_hash.key_digest digests, so they must be
+    values key_digest supports. Added keys are buffered and written in
+    batches; lookups see buffered keys too.
+    """
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: File to keep the keys in; a temporary file removed on
+                close() is used when omitted
+        """
+        self._temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".sqlite")
+            os.close(fd)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_keys (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._pending = set()
+
+    def __contains__(self, key: Any) -> bool:
+        digest = key_digest(key)
+        if digest in self._pending:
+            return True
+        return self.conn.execute("SELECT 1 FROM seen_keys WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def add(self, key: Any) -> None:
+        self._pending.add(key_digest(key))
+        if len(self._pending) >= _DISK_BATCH:
+            self.flush()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM seen_keys").fetchone()[0]
+
+    def flush(self) -> None:
+        """Writes buffered keys to the file."""
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO seen_keys VALUES (?)", ((d,) for d in self._pending))
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+    def __enter__(self) -> "DiskKeySet":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ApproximateSeenSet:
+    """
+    A drop-in replacement for the ``seen`` set used by the dedup functions.
+
+    Membership is answered by a Bloom filter. With an exact ``store`` (such
+    as a DiskKeySet), every added key is also written to the store and keys
+    the filter flags as already seen are checked against it, so only true
+    duplicates are dropped while memory stays fixed. Without one, a flagged
+    key is treated as a duplicate and roughly ``error_rate`` of unique keys
+    are dropped by mistake; report() estimates how many.
+    """
+    def __init__(self, expected_items: int, error_rate: float = 0.01, store: Optional[Any] = None):
+        """
+        Args:
+            expected_items: Number of distinct keys the filter is sized for
+            error_rate: Target false-positive rate
+            store: Optional exact set-like store (``in`` and add) fed by add()
+                and consulted only for keys the filter flags
+        """
+        self.filter = BloomFilter(expected_items, error_rate)
+        self.store = store
+        self.flagged = 0
+        self.dropped = 0
+
+    def __contains__(self, key: Any) -> bool:
+        if key not in self.filter:
+            return False
+        self.flagged += 1
+        if self.store is not None and key not in self.store:
+            return False
+        self.dropped += 1
+        return True
+
+    def add(self, key: Any) -> None:
+        self.filter.add(key)
+        if self.store is not None:
+            self.store.add(key)
+
+    def __len__(self) -> int:
+        return self.filter.count
+
+    def _expected_false_drops(self) -> float:
+        # While the i-th kept key was looked up, the filter flagged a new key
+        # with probability p_i = (1 - e^(-k i / m))^k, so p_i / (1 - p_i) new
+        # keys were dropped per kept one on average
+        k, m = self.filter.num_hashes, self.filter.num_bits
+        kept = self.filter.count
+        steps = min(kept, 1000)
+        total = 0.0
+        for step in range(steps):
+            added = (step + 0.5) * kept / steps
+            rate = (1 - math.exp(-k * added / m)) ** k
+            total += rate / (1 - rate) if rate < 1 else 0.0
+        return total * kept / steps if steps else 0.0
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarizes the filter's state.
+
+        Returns:
+            Dictionary with the number of keys added, keys flagged by the
+            filter and keys reported as duplicates (dropped), the estimated
+            number of unique keys among the dropped ones (0 with a store),
+            the estimated false-positive rate and memory use
+        """
+        return {
+            "keys_added": self.filter.count,
+            "flagged": self.flagged,
+            "dropped_as_duplicate": self.dropped,
+            "false_positives_caught": self.flagged - self.dropped,
+            "estimated_unique_dropped": 0 if self.store is not None else round(self._expected_false_drops()),
+            "estimated_false_positive_rate": self.filter.estimated_false_positive_rate(),
+            "memory_bytes": self.filter.memory_bytes,
+            "num_hashes": self.filter.num_hashes,
+        }
+
+
+def benchmark_approximate_dedup(count: int = 1_000_000, unique: int = 500_000) -> None:
+    """
+    Compare deduplicate_by_key with an exact set, the Bloom filter alone and
+    the Bloom filter backed by a DiskKeySet.
+
+    Args:
+        count: Number of records
+        unique: Number of distinct keys among them
+    """
+    from deduplicate_objects import deduplicate_by_key
+
+    objects = [{"id": f"user-{i % unique}"} for i in range(count)]
+    print(f"deduplicate_by_key on {count:,} records with {unique:,} distinct keys")
+    with DiskKeySet() as store:
+        cases = [
+            ("set", set()),
+            ("ApproximateSeenSet", ApproximateSeenSet(unique, 0.01)),
+            ("ApproximateSeenSet + DiskKeySet", ApproximateSeenSet(unique, 0.01, store=store)),
+        ]
+        for label, seen in cases:
+            start = time.perf_counter()
+            kept = len(deduplicate_by_key(objects, "id", seen=seen))
+            elapsed = time.perf_counter() - start
+            extra = ""
+            if isinstance(seen, ApproximateSeenSet):
+                report = seen.report()
+                extra = (f", {report['memory_bytes']:,} filter bytes, "
+                         f"~{report['estimated_unique_dropped']} unique keys dropped")
+            print(f"{label:<32} {elapsed:6.2f}s  kept {kept:,}{extra}")
+
+
+if __name__ == "__main__":
+    benchmark_approximate_dedup()
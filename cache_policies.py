@@ -0,0 +1,468 @@
+import random
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+
+from lru_cache import LRUCache
+
+# Counters saturate at 15, as 4-bit counters would
+_MAX_COUNT = 15
+
+# Returned by WTinyLFUCache._touch for puts of keys the cache does not hold
+_ABSENT = object()
+
+
+class CountMinSketch:
+    """
+    Approximate access counts for an unbounded set of keys in fixed memory.
+
+    Each key maps to one counter in each of ``depth`` rows and its estimate
+    is the smallest of them, so collisions can only inflate it. Once
+    ``sample_size`` accesses have been counted every counter is halved, so
+    the counts describe recent popularity rather than all of history.
+    """
+    def __init__(self, width: int, depth: int = 4, sample_size: Optional[int] = None):
+        """
+        Args:
+            width: Counters per row; about the number of keys worth telling apart
+            depth: Number of rows
+            sample_size: Accesses between halvings; defaults to 10 * width
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or 10 * width
+        self._table = bytearray(width * depth)
+        self._additions = 0
+
+    def _slots(self, key: Hashable) -> List[int]:
+        # Double hashing: row i uses h1 + i * h2, offset into its own row
+        h1 = hash(key)
+        h2 = ((h1 * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32 | 1
+        width = self.width
+        return [row * width + (h1 + row * h2) % width for row in range(self.depth)]
+
+    def increment(self, key: Hashable) -> None:
+        """
+        Counts one access to key.
+
+        Args:
+            key: The key accessed
+        """
+        table = self._table
+        for slot in self._slots(key):
+            if table[slot] < _MAX_COUNT:
+                table[slot] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._table = bytearray(count >> 1 for count in table)
+            self._additions //= 2
+
+    def frequency(self, key: Hashable) -> int:
+        """
+        Returns:
+            Estimated number of recent accesses to key (at most 15)
+        """
+        table = self._table
+        return min(table[slot] for slot in self._slots(key))
+
+
+class WTinyLFUCache:
+    """
+    Window TinyLFU: an LRU window in front of a frequency-filtered main cache.
+
+    New items enter a small LRU window (``window_ratio`` of the capacity).
+    An item pushed out of the window competes with the main cache's next
+    eviction victim and only gets in if a count-min sketch has seen it more
+    often, so a one-off scan cannot push out popular items. The main cache
+    is a segmented LRU: items enter a probation segment and move to the
+    protected segment when they are hit again. Every get and every put of a
+    new key counts as an access in the sketch.
+    """
+    def __init__(self, capacity: int, window_ratio: float = 0.01, protected_ratio: float = 0.8):
+        """
+        Args:
+            capacity: The maximum number of items the cache can hold
+            window_ratio: Share of the capacity used by the admission window
+            protected_ratio: Share of the main cache reserved for items hit more than once
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.window_capacity = min(capacity, max(1, round(capacity * window_ratio)))
+        self.main_capacity = capacity - self.window_capacity
+        self.protected_capacity = int(self.main_capacity * protected_ratio)
+        self.sketch = CountMinSketch(max(16, capacity))
+        self._window = OrderedDict()
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Retrieves an item from the cache.
+
+        Args:
+            key: The key of the item to retrieve
+
+        Returns:
+            The value of the item, or -1 if the key is not in the cache
+        """
+        self.sketch.increment(key)
+        return self._touch(key, None, False)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Adds an item to the admission window, or updates it where it is.
+
+        Args:
+            key: The key of the item to add
+            value: The value of the item to add
+        """
+        if self._touch(key, value, True) is not _ABSENT:
+            return
+        self.sketch.increment(key)
+        self._window[key] = value
+        if len(self._window) > self.window_capacity:
+            self._admit(*self._window.popitem(last=False))
+
+    def _touch(self, key: Hashable, value: Any, update: bool) -> Any:
+        # Marks a resident key as used (optionally replacing its value) and
+        # returns its value; returns -1 for get or _ABSENT for put if absent
+        for segment in (self._window, self._protected):
+            if key in segment:
+                if update:
+                    segment[key] = value
+                segment.move_to_end(key)
+                return segment[key]
+        if key in self._probation:
+            # Hit again while on probation: promote, demoting the protected LRU if needed
+            stored = self._probation.pop(key)
+            if update:
+                stored = value
+            self._protected[key] = stored
+            if len(self._protected) > self.protected_capacity:
+                demoted, demoted_value = self._protected.popitem(last=False)
+                self._probation[demoted] = demoted_value
+            return stored
+        return _ABSENT if update else -1
+
+    def _admit(self, candidate: Hashable, value: Any) -> None:
+        if not self.main_capacity:
+            return
+        if len(self._probation) + len(self._protected) >= self.main_capacity:
+            victims = self._probation or self._protected
+            victim = next(iter(victims))
+            if self.sketch.frequency(candidate) <= self.sketch.frequency(victim):
+                return
+            del victims[victim]
+        self._probation[candidate] = value
+
+
+class ARCCache:
+    """
+    Adaptive Replacement Cache (Megiddo and Modha).
+
+    Items seen once live in a recency list (T1) and items seen again in a
+    frequency list (T2). Keys evicted from each list are remembered in ghost
+    lists (B1, B2) without their values; a miss on a ghost key shows which
+    list was evicted too eagerly and shifts the target size of T1 towards
+    it. A scan only churns T1, so items in T2 survive it.
+    """
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: The maximum number of items the cache can hold
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        # Target size of T1
+        self.p = 0
+        self._t1 = OrderedDict()
+        self._t2 = OrderedDict()
+        self._b1 = OrderedDict()
+        self._b2 = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._t1) + len(self._t2)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._t1 or key in self._t2
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Retrieves an item from the cache.
+
+        Args:
+            key: The key of the item to retrieve
+
+        Returns:
+            The value of the item, or -1 if the key is not in the cache
+        """
+        if key in self._t1:
+            value = self._t2[key] = self._t1.pop(key)
+            return value
+        if key in self._t2:
+            self._t2.move_to_end(key)
+            return self._t2[key]
+        return -1
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Adds or updates an item.
+
+        Args:
+            key: The key of the item to add
+            value: The value of the item to add
+        """
+        t1, t2, b1, b2 = self._t1, self._t2, self._b1, self._b2
+        if key in t1:
+            del t1[key]
+            t2[key] = value
+            return
+        if key in t2:
+            t2[key] = value
+            t2.move_to_end(key)
+            return
+        if key in b1:
+            self.p = min(self.capacity, self.p + max(len(b2) // len(b1), 1))
+            self._replace(key)
+            del b1[key]
+            t2[key] = value
+            return
+        if key in b2:
+            self.p = max(0, self.p - max(len(b1) // len(b2), 1))
+            self._replace(key)
+            del b2[key]
+            t2[key] = value
+            return
+
+        if len(t1) + len(b1) >= self.capacity:
+            if len(t1) < self.capacity:
+                b1.popitem(last=False)
+                self._replace(key)
+            else:
+                t1.popitem(last=False)
+        else:
+            total = len(t1) + len(t2) + len(b1) + len(b2)
+            if total >= self.capacity:
+                if total >= 2 * self.capacity:
+                    b2.popitem(last=False)
+                self._replace(key)
+        t1[key] = value
+
+    def _replace(self, key: Hashable) -> None:
+        # Evicts from T1 or T2, whichever is over its target, into its ghost list
+        t1 = self._t1
+        if t1 and (len(t1) > self.p or (key in self._b2 and len(t1) == self.p) or not self._t2):
+            evicted, _ = t1.popitem(last=False)
+            self._b1[evicted] = None
+        elif self._t2:
+            evicted, _ = self._t2.popitem(last=False)
+            self._b2[evicted] = None
+
+
+class TwoQCache:
+    """
+    The full 2Q policy (Johnson and Shasha).
+
+    New items enter a FIFO queue (A1in). Items pushed out of it are
+    remembered without their values in a ghost queue (A1out); only an item
+    requested again while in A1out is promoted to the main LRU list (Am).
+    Items touched a few times in quick succession and then never again, such
+    as a scan, pass through A1in without reaching Am.
+    """
+    def __init__(self, capacity: int, in_ratio: float = 0.25, out_ratio: float = 0.5):
+        """
+        Args:
+            capacity: The maximum number of items the cache can hold
+            in_ratio: Size of A1in as a share of the capacity
+            out_ratio: Number of ghost keys kept in A1out as a share of the capacity
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.in_capacity = max(1, int(capacity * in_ratio))
+        self.out_capacity = max(1, int(capacity * out_ratio))
+        self._in = OrderedDict()
+        self._out = OrderedDict()
+        self._main = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._in) + len(self._main)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._in or key in self._main
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Retrieves an item from the cache.
+
+        Args:
+            key: The key of the item to retrieve
+
+        Returns:
+            The value of the item, or -1 if the key is not in the cache
+        """
+        if key in self._main:
+            self._main.move_to_end(key)
+            return self._main[key]
+        # A hit in A1in is deliberately not counted as reuse
+        return self._in.get(key, -1)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Adds or updates an item.
+
+        Args:
+            key: The key of the item to add
+            value: The value of the item to add
+        """
+        if key in self._main:
+            self._main[key] = value
+            self._main.move_to_end(key)
+        elif key in self._in:
+            self._in[key] = value
+        elif key in self._out:
+            del self._out[key]
+            self._reclaim()
+            self._main[key] = value
+        else:
+            self._reclaim()
+            self._in[key] = value
+
+    def _reclaim(self) -> None:
+        # Frees one slot if the cache is full
+        if len(self._in) + len(self._main) < self.capacity:
+            return
+        if len(self._in) > self.in_capacity or not self._main:
+            evicted, _ = self._in.popitem(last=False)
+            self._out[evicted] = None
+            if len(self._out) > self.out_capacity:
+                self._out.popitem(last=False)
+        else:
+            self._main.popitem(last=False)
+
+
+# Policies compared by compare_policies, by name
+POLICIES: Dict[str, Callable[[int], Any]] = {
+    "LRU": LRUCache,
+    "2Q": TwoQCache,
+    "ARC": ARCCache,
+    "W-TinyLFU": WTinyLFUCache,
+}
+
+
+def load_trace(path: str) -> List[str]:
+    """
+    Reads a recorded key trace.
+
+    Args:
+        path: Text file with one key per line; blank lines are skipped
+
+    Returns:
+        The keys in request order
+    """
+    with open(path) as trace:
+        return [line for line in (raw.strip() for raw in trace) if line]
+
+
+def scan_trace(hot_keys: int = 5000, catalog: int = 20_000, requests: int = 400_000,
+               scan_every: int = 100_000, skew: float = 0.9, seed: Optional[int] = 1) -> List[int]:
+    """
+    Synthetic trace of a Zipf-distributed hot set interrupted by full catalog scans.
+
+    Args:
+        hot_keys: Number of keys in the popular set
+        catalog: Number of keys read by each scan, none of them popular
+        requests: Number of popular requests
+        scan_every: Popular requests between scans
+        skew: Zipf exponent of the popular requests
+        seed: Seed for a reproducible trace
+
+    Returns:
+        Keys in request order; popular keys are below hot_keys
+    """
+    generator = random.Random(seed)
+    weights = [1 / (rank + 1) ** skew for rank in range(hot_keys)]
+    popular = generator.choices(range(hot_keys), weights=weights, k=requests)
+    trace = []
+    for start in range(0, requests, scan_every):
+        trace.extend(popular[start:start + scan_every])
+        trace.extend(range(hot_keys, hot_keys + catalog))
+    return trace
+
+
+def replay(trace: Iterable[Hashable], cache: Any) -> float:
+    """
+    Replays a trace, putting every missed key, and measures the hit ratio.
+
+    Args:
+        trace: Keys in request order
+        cache: Empty cache with get and put
+
+    Returns:
+        Share of requests that hit
+    """
+    get, put = cache.get, cache.put
+    hits = requests = 0
+    for key in trace:
+        requests += 1
+        if get(key) == -1:
+            put(key, True)
+        else:
+            hits += 1
+    return hits / requests if requests else 0.0
+
+
+def compare_policies(trace: Sequence[Hashable], capacities: Sequence[int],
+                     policies: Optional[Dict[str, Callable[[int], Any]]] = None) -> Dict[str, Dict[int, float]]:
+    """
+    Replays one trace against every policy at every capacity.
+
+    Args:
+        trace: Keys in request order
+        capacities: Cache sizes to try
+        policies: Cache factories taking a capacity, by name; defaults to POLICIES
+
+    Returns:
+        {policy name: {capacity: hit ratio}}
+    """
+    policies = policies or POLICIES
+    return {name: {capacity: replay(trace, factory(capacity)) for capacity in capacities}
+            for name, factory in policies.items()}
+
+
+def print_comparison(trace: Sequence[Hashable], fractions: Sequence[float] = (0.01, 0.05, 0.1, 0.25)) -> None:
+    """
+    Prints hit ratios of every policy with capacities sized relative to the trace.
+
+    Args:
+        trace: Keys in request order
+        fractions: Cache sizes as shares of the trace's distinct keys
+    """
+    distinct = len(set(trace))
+    capacities = sorted({max(1, int(distinct * fraction)) for fraction in fractions})
+    results = compare_policies(trace, capacities)
+    print(f"{len(trace):,} requests, {distinct:,} distinct keys")
+    print(f"{'policy':<10} " + " ".join(f"{capacity:>9,}" for capacity in capacities))
+    for name, ratios in results.items():
+        print(f"{name:<10} " + " ".join(f"{ratios[capacity]:>9.1%}" for capacity in capacities))
+
+
+if __name__ == "__main__":
+    # python cache_policies.py [trace file ...]; without files, replays a synthetic scan trace
+    if sys.argv[1:]:
+        for path in sys.argv[1:]:
+            print(path)
+            print_comparison(load_trace(path))
+    else:
+        print("Synthetic trace: Zipf hot set with periodic catalog scans")
+        print_comparison(scan_trace())
@@ -0,0 +1,168 @@
+import datetime
+import decimal
+import hashlib
+import json
+import time
+import tracemalloc
+import uuid
+from typing import Any, List
+
+DIGEST_SIZE = 16  # 128-bit digests
+
+
+def _json_default(obj: Any) -> Any:
+    """Map values JSON cannot represent onto tagged, order-independent forms."""
+    if isinstance(obj, (set, frozenset)):
+        return {"\x00set": sorted(_canonical_text(item) for item in obj)}
+    if isinstance(obj, (bytes, bytearray)):
+        return {"\x00bytes": bytes(obj).hex()}
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return {"\x00" + type(obj).__name__: obj.isoformat()}
+    if isinstance(obj, datetime.timedelta):
+        return {"\x00timedelta": [obj.days, obj.seconds, obj.microseconds]}
+    if isinstance(obj, decimal.Decimal):
+        return {"\x00Decimal": str(obj)}
+    if isinstance(obj, uuid.UUID):
+        return {"\x00UUID": obj.hex}
+    raise TypeError(f"Object of type {type(obj).__name__} cannot be canonically hashed")
+
+
+# Reusing one encoder keeps the C fast path and avoids building an encoder per call
+_encoder = json.JSONEncoder(sort_keys=True, separators=(",", ":"), check_circular=False,
+                            default=_json_default)
+
+
+def _encode(obj: Any, parts: List[str]) -> None:
+    """
+    Structural encoding used when the JSON encoder cannot sort a dict's keys,
+    e.g. mixed int and str keys or tuple keys. Scalars use repr, which is
+    self-delimiting; dict entries are sorted by their encoded form.
+    """
+    if isinstance(obj, dict):
+        entries = sorted((_canonical_text(k), _canonical_text(v)) for k, v in obj.items())
+        parts.append("{")
+        for k, v in entries:
+            parts.append(k)
+            parts.append(":")
+            parts.append(v)
+            parts.append(",")
+        parts.append("}")
+    elif isinstance(obj, (list, tuple)):
+        parts.append("[")
+        for item in obj:
+            parts.append(_canonical_text(item))
+            parts.append(",")
+        parts.append("]")
+    elif obj is None or isinstance(obj, (str, int, float)):
+        parts.append(repr(obj))
+    else:
+        parts.append(_canonical_text(_json_default(obj)))
+
+
+def _canonical_text(obj: Any) -> str:
+    try:
+        return _encoder.encode(obj)
+    except TypeError:
+        # \x01 never starts a JSON document, so the two encodings cannot collide
+        parts = ["\x01"]
+        _encode(obj, parts)
+        return "".join(parts)
+
+
+def canonical_digest(obj: Any) -> bytes:
+    """
+    Compute a fixed-size 128-bit digest of an object's content.
+
+    Dicts, lists, tuples and scalars are walked recursively and dict key order
+    does not affect the result. Two objects get the same digest exactly when
+    json.dumps(obj, sort_keys=True) would produce the same string; on top of
+    that, sets, bytes, datetimes, dates, times, timedeltas, Decimals, UUIDs and
+    dicts with mixed-type keys are supported.
+
+    Args:
+        obj: The object to hash
+
+    Returns:
+        16-byte digest
+
+    Raises:
+        TypeError: If obj contains a value of an unsupported type
+    """
+    encoded = _canonical_text(obj).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(encoded, digest_size=DIGEST_SIZE).digest()
+
+
+def _normalize_key(key: Any) -> Any:
+    # Keys that compare equal in a set (1, 1.0, True) must get the same digest
+    if isinstance(key, bool):
+        return int(key)
+    if isinstance(key, float) and key.is_integer():
+        return int(key)
+    if isinstance(key, tuple):
+        return tuple(_normalize_key(part) for part in key)
+    return key
+
+
+def key_digest(key: Any) -> bytes:
+    """
+    Compute a 128-bit digest of a dedup key that is stable across processes.
+
+    Unlike canonical_digest, numbers that compare equal (1, 1.0 and True)
+    share a digest, so the digest can stand in for the key in a set.
+
+    Args:
+        key: The dedup key, e.g. a scalar or a tuple of scalars
+
+    Returns:
+        16-byte digest
+    """
+    return canonical_digest(_normalize_key(key))
+
+
+def benchmark_json_string_dedup(count: int = 200_000, distinct: int = 100_000) -> None:
+    """
+    Compare keeping json.dumps strings in the seen set against keeping digests.
+
+    Args:
+        count: Number of records to deduplicate
+        distinct: Number of distinct records among them
+    """
+    records = [
+        {"order_id": f"o{j}", "user_id": j % 977, "amount": j * 1.5, "status": "paid",
+         "items": [{"sku": f"s{j % 31}", "qty": 1}], "tags": ["web", "promo"]}
+        for j in (i % distinct for i in range(count))
+    ]
+
+    def dedup(key_func):
+        seen = set()
+        for record in records:
+            key = key_func(record)
+            if key not in seen:
+                seen.add(key)
+        return seen
+
+    def run(key_func):
+        start = time.perf_counter()
+        kept = len(dedup(key_func))
+        elapsed = time.perf_counter() - start
+        # Measure memory in a separate pass; tracing skews the timing
+        tracemalloc.start()
+        seen = dedup(key_func)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del seen
+        return kept, elapsed, retained
+
+    print(f"Deduplicating {count:,} records ({distinct:,} distinct)")
+    print("-" * 60)
+    for label, key_func in [
+        ("json.dumps(sort_keys=True)", lambda obj: json.dumps(obj, sort_keys=True)),
+        ("canonical_digest", canonical_digest),
+    ]:
+        kept, elapsed, retained = run(key_func)
+        print(f"{label:<28} kept={kept:,}  {count / elapsed:>10,.0f} rec/s  "
+              f"seen set={retained / 1024 / 1024:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    benchmark_json_string_dedup()
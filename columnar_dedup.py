@@ -0,0 +1,133 @@
+import time
+from typing import Any, List, Optional, Sequence
+
+from deduplicate_objects import deduplicate_by_key, deduplicate_by_multiple_keys
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; first_occurrence_indices then falls back to a set
+    np = None
+
+# Longer strings make fixed-width unicode arrays wasteful, so they use the set-based path
+MAX_STRING_LENGTH = 64
+# Floats represent every integer up to 2**53 exactly
+_MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+def _to_column(values: List[Any]) -> Optional["np.ndarray"]:
+    """
+    Convert a list of key values to a NumPy array whose equality matches Python's,
+    or return None when that is not possible.
+    """
+    types = set(map(type, values))
+    try:
+        if types <= {int, bool}:
+            return np.array(values, dtype=np.int64)
+        if types <= {int, float, bool}:
+            if any(type(v) is int and abs(v) > _MAX_EXACT_FLOAT_INT for v in values):
+                return None
+            column = np.array(values, dtype=np.float64)
+            # NaN never equals itself in Python but np.unique collapses NaNs
+            return None if np.isnan(column).any() else column
+        if types == {str}:
+            # NumPy strips trailing NULs, which would make "a" equal "a\x00"
+            if "\x00" in "".join(values):
+                return None
+            column = np.array(values, dtype=str)
+            return None if column.dtype.itemsize // 4 > MAX_STRING_LENGTH else column
+    except OverflowError:
+        return None
+    return None
+
+
+def _first_occurrences(columns: List["np.ndarray"]) -> "np.ndarray":
+    """
+    Indices of the first row of each distinct combination of column values,
+    in ascending order.
+    """
+    if len(columns) == 1:
+        _, first = np.unique(columns[0], return_index=True)
+    else:
+        # lexsort is stable, so the first row of each run of equal rows in
+        # sorted order is also the earliest occurrence in the input
+        order = np.lexsort(columns[::-1])
+        starts = np.zeros(len(order), dtype=bool)
+        starts[0] = True
+        for column in columns:
+            ordered = column[order]
+            starts[1:] |= ordered[1:] != ordered[:-1]
+        first = order[starts]
+    first.sort()
+    return first
+
+
+def first_occurrence_indices(columns: Sequence[Sequence[Any]]) -> List[int]:
+    """
+    Deduplicate data that is stored as columns.
+
+    With the keys already in NumPy arrays (e.g. read from Parquet or a
+    DataFrame), nothing has to be pulled out of per-record dicts and the whole
+    dedup is a vectorized sort; NumPy arrays compare with NumPy's equality, so
+    NaNs equal each other. Other sequences are converted only when that keeps
+    Python's equality (plain ints, floats and short strings); otherwise, or
+    when NumPy is not installed, rows are deduplicated with a set.
+
+    Args:
+        columns: Equal-length key columns, one per key
+
+    Returns:
+        Ascending indices of the first row of each distinct combination of
+        column values
+    """
+    if not columns:
+        raise ValueError("At least one column is required")
+    length = len(columns[0])
+    if any(len(column) != length for column in columns):
+        raise ValueError("Columns must all have the same length")
+    if length == 0:
+        return []
+    if np is not None:
+        arrays = [column if isinstance(column, np.ndarray) else _to_column(list(column)) for column in columns]
+        if all(array is not None for array in arrays):
+            return _first_occurrences(arrays).tolist()
+    seen = set()
+    first = []
+    for index, row in enumerate(zip(*columns)):
+        if row not in seen:
+            seen.add(row)
+            first.append(index)
+    return first
+
+
+def benchmark_columnar_dedup(count: int = 1_000_000) -> None:
+    """
+    Compare the pure-Python loop on dicts with first_occurrence_indices on
+    the same keys held in NumPy columns.
+
+    Args:
+        count: Number of records to deduplicate
+    """
+    objects = [{"id": i % (count // 3), "sku": f"s{i % 1013}", "store": i % 17} for i in range(count)]
+    if np is None:
+        print("NumPy is not installed")
+        return
+    columns = {key: np.array([obj[key] for obj in objects]) for key in ("id", "sku", "store")}
+    cases = [
+        ("by_key(id)", lambda: deduplicate_by_key(objects, "id"),
+         lambda: first_occurrence_indices([columns["id"]])),
+        ("by_multiple_keys(sku, store)", lambda: deduplicate_by_multiple_keys(objects, ["sku", "store"]),
+         lambda: first_occurrence_indices([columns["sku"], columns["store"]])),
+    ]
+    print(f"Deduplicating {count:,} records")
+    print(f"{'':<30} {'python dicts':>13} {'columns':>9}")
+    for label, *runs in cases:
+        timings = []
+        for run in runs:
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        print(f"{label:<30} {timings[0]:>12.3f}s {timings[1]:>8.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark_columnar_dedup()
@@ -0,0 +1,176 @@
+from array import array
+from typing import Any, Callable, Dict, List, Union
+
+from canonical_hash import canonical_digest
+from key_spec import MISSING, KeySpec, compile_key_spec, is_flat_key
+
+
+class DuplicateGroups:
+    """
+    Index-based result of a dedup pass.
+
+    Instead of copying records into a result list, the pass records compact
+    int64 arrays that downstream stages can gather from (or wrap without
+    copying, e.g. ``numpy.frombuffer(groups.kept, dtype=numpy.int64)``):
+
+    - ``kept``: index of the record kept for each group, in output order
+    - ``counts``: number of input records in each group, aligned with ``kept``
+    - ``representative``: for every input record, the index of the record
+      kept for its group, or -1 if the record was skipped (missing key)
+    """
+    def __init__(self, kept: array, counts: array, representative: array):
+        self.kept = kept
+        self.counts = counts
+        self.representative = representative
+
+    def __len__(self) -> int:
+        """Number of groups."""
+        return len(self.kept)
+
+    def gather(self, objects: List[Dict]) -> List[Dict]:
+        """
+        Collects the kept records; equal to the matching deduplicate_* result.
+
+        Args:
+            objects: The list the groups were computed from
+
+        Returns:
+            List of deduplicated objects
+        """
+        return [objects[i] for i in self.kept]
+
+    def dropped(self) -> array:
+        """
+        Returns:
+            Indices of records that duplicated a kept record, in input order
+        """
+        return array("q", (i for i, rep in enumerate(self.representative) if rep != -1 and rep != i))
+
+    def duplicates_of(self) -> Dict[int, List[int]]:
+        """
+        Returns:
+            Mapping from each kept index to the indices it absorbed, for groups with duplicates
+        """
+        absorbed = {}
+        for i, rep in enumerate(self.representative):
+            if rep != -1 and rep != i:
+                absorbed.setdefault(rep, []).append(i)
+        return absorbed
+
+
+def group_by_custom_function(objects: List[Dict], key_func: Union[Callable[[Dict], Any], KeySpec]) -> DuplicateGroups:
+    """
+    Group objects by a key function, keeping the first occurrence of each key.
+
+    Args:
+        objects: List of dictionaries to group
+        key_func: Function that takes an object and returns a key for
+            deduplication (or key_spec.MISSING to skip it); key specs are compiled
+
+    Returns:
+        DuplicateGroups for the objects
+    """
+    group_ids = {}
+    kept = array("q")
+    counts = array("q")
+    group_of = array("q")
+    key_func = compile_key_spec(key_func)
+    for i, obj in enumerate(objects):
+        key = key_func(obj)
+        if key is MISSING:
+            group_of.append(-1)
+            continue
+        group = group_ids.get(key)
+        if group is None:
+            group = group_ids[key] = len(kept)
+            kept.append(i)
+            counts.append(0)
+        counts[group] += 1
+        group_of.append(group)
+    representative = array("q", (kept[group] if group >= 0 else -1 for group in group_of))
+    return DuplicateGroups(kept, counts, representative)
+
+
+def group_by_key(objects: List[Dict], key: KeySpec) -> DuplicateGroups:
+    """
+    Index-based version of deduplicate_by_key; objects missing the key are skipped.
+
+    Args:
+        objects: List of dictionaries to group
+        key: The key to use for deduplication (dotted paths and compiled key specs work too)
+
+    Returns:
+        DuplicateGroups for the objects
+    """
+    return group_by_custom_function(objects, compile_key_spec(key, default=MISSING))
+
+
+def group_by_multiple_keys(objects: List[Dict], keys: KeySpec) -> DuplicateGroups:
+    """
+    Index-based version of deduplicate_by_multiple_keys.
+
+    Args:
+        objects: List of dictionaries to group
+        keys: List of keys (or dotted paths) to use for deduplication, or a compiled key spec
+
+    Returns:
+        DuplicateGroups for the objects
+    """
+    return group_by_custom_function(objects, compile_key_spec(keys) if callable(keys) else compile_key_spec(list(keys)))
+
+
+def group_by_json_string(objects: List[Dict]) -> DuplicateGroups:
+    """
+    Index-based version of deduplicate_by_json_string.
+
+    Args:
+        objects: List of dictionaries to group
+
+    Returns:
+        DuplicateGroups for the objects
+    """
+    return group_by_custom_function(objects, canonical_digest)
+
+
+def group_keep_latest(objects: List[Dict], key: KeySpec, timestamp_key: str = "timestamp") -> DuplicateGroups:
+    """
+    Index-based version of deduplicate_keep_latest.
+
+    Groups are ordered by the first appearance of their key, and the kept
+    index of each group is its record with the latest timestamp.
+
+    Args:
+        objects: List of dictionaries to group
+        key: The key to use for deduplication (dotted paths and compiled key specs work too)
+        timestamp_key: The key containing timestamp information
+
+    Returns:
+        DuplicateGroups for the objects
+    """
+    get_key = compile_key_spec(key, default=MISSING)
+    get_timestamp = compile_key_spec(timestamp_key, default=0)
+    flat = is_flat_key(key) and is_flat_key(timestamp_key)
+    group_ids = {}
+    kept = array("q")
+    counts = array("q")
+    latest = []
+    group_of = array("q")
+    for i, obj in enumerate(objects):
+        obj_key = (obj[key] if key in obj else MISSING) if flat else get_key(obj)
+        if obj_key is MISSING:
+            group_of.append(-1)
+            continue
+        timestamp = obj.get(timestamp_key, 0) if flat else get_timestamp(obj)
+        group = group_ids.get(obj_key)
+        if group is None:
+            group = group_ids[obj_key] = len(kept)
+            kept.append(i)
+            counts.append(0)
+            latest.append(timestamp)
+        elif timestamp > latest[group]:
+            kept[group] = i
+            latest[group] = timestamp
+        counts[group] += 1
+        group_of.append(group)
+    representative = array("q", (kept[group] if group >= 0 else -1 for group in group_of))
+    return DuplicateGroups(kept, counts, representative)
@@ -0,0 +1,225 @@
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from canonical_hash import key_digest
+from key_spec import MISSING, KeySpec, compile_key_spec
+
+# Stay well below SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedup_keys (
+    digest BLOB PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    batch_id INTEGER NOT NULL,
+    record_offset INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS dedup_keys_timestamp ON dedup_keys (timestamp);
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    record_count INTEGER NOT NULL
+);
+"""
+
+
+class DedupIndex:
+    """
+    A persistent key index that lets each new batch be deduplicated against
+    every batch processed before it.
+
+    Keys are stored as 128-bit digests mapped to (timestamp, batch_id,
+    record_offset) in a local SQLite file in WAL mode, so one process can write
+    while others open the same file with ``read_only=True``. Deduplicating a
+    batch costs one indexed lookup per distinct key in the batch, independent
+    of how much history the index holds.
+    """
+    def __init__(self, path: str, read_only: bool = False, timeout: float = 30.0):
+        """
+        Opens (and if needed creates) the index.
+
+        Args:
+            path: Path to the index file
+            read_only: Open without write access; batches are filtered against
+                the index but not recorded in it
+            timeout: Seconds to wait for another writer's lock
+        """
+        self.path = path
+        self.read_only = read_only
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=timeout)
+        else:
+            self.conn = sqlite3.connect(path, timeout=timeout)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "DedupIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM dedup_keys").fetchone()[0]
+
+    def __contains__(self, key: Any) -> bool:
+        return self.lookup(key) is not None
+
+    def lookup(self, key: Any) -> Optional[Tuple[float, int, int]]:
+        """
+        Looks up a key.
+
+        Args:
+            key: The dedup key
+
+        Returns:
+            (timestamp, batch_id, record_offset) for the key, or None if it was never recorded
+        """
+        return self.conn.execute(
+            "SELECT timestamp, batch_id, record_offset FROM dedup_keys WHERE digest = ?",
+            (key_digest(key),),
+        ).fetchone()
+
+    def _stored_timestamps(self, digests: List[bytes]) -> Dict[bytes, float]:
+        stored = {}
+        for start in range(0, len(digests), _LOOKUP_CHUNK):
+            chunk = digests[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT digest, timestamp FROM dedup_keys WHERE digest IN ({placeholders})", chunk
+            )
+            stored.update(rows)
+        return stored
+
+    def _record_batch(self, entries: List[Tuple[bytes, float, int]], record_count: int) -> None:
+        if self.read_only:
+            return
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO batches (created_at, record_count) VALUES (?, ?)", (time.time(), record_count)
+            )
+            batch_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dedup_keys (digest, timestamp, batch_id, record_offset) "
+                "VALUES (?, ?, ?, ?)",
+                ((digest, timestamp, batch_id, offset) for digest, timestamp, offset in entries),
+            )
+
+    def deduplicate_by_key(self, objects: List[Dict], key: KeySpec,
+                           timestamp_key: Optional[str] = None) -> List[Dict]:
+        """
+        Deduplicate a batch based on a key, dropping keys seen in this batch or any earlier one.
+
+        Args:
+            objects: List of dictionaries to deduplicate
+            key: The key to use for deduplication (dotted paths and compiled key specs work too)
+            timestamp_key: Optional key whose value is stored as the entry's
+                timestamp; the current time is used otherwise
+
+        Returns:
+            List of objects whose key was never seen before
+        """
+        get_key = compile_key_spec(key, default=MISSING)
+        batch = {}
+        for offset, obj in enumerate(objects):
+            obj_key = get_key(obj)
+            if obj_key is MISSING:
+                continue
+            digest = key_digest(obj_key)
+            if digest not in batch:
+                batch[digest] = offset
+
+        stored = self._stored_timestamps(list(batch))
+        now = time.time()
+        get_timestamp = compile_key_spec(timestamp_key, default=now) if timestamp_key else None
+        result = []
+        entries = []
+        for digest, offset in batch.items():
+            if digest in stored:
+                continue
+            obj = objects[offset]
+            timestamp = get_timestamp(obj) if get_timestamp else now
+            entries.append((digest, timestamp, offset))
+            result.append(obj)
+
+        self._record_batch(entries, len(objects))
+        return result
+
+    def deduplicate_keep_latest(self, objects: List[Dict], key: KeySpec,
+                                timestamp_key: str = "timestamp") -> List[Dict]:
+        """
+        Deduplicate a batch keeping the latest version of each key across all batches.
+
+        Within the batch this matches deduplicate_keep_latest. A key is then
+        only returned if its latest timestamp is newer than the one recorded
+        by an earlier batch.
+
+        Args:
+            objects: List of dictionaries to deduplicate
+            key: The key to use for deduplication (dotted paths and compiled key specs work too)
+            timestamp_key: The key containing timestamp information
+
+        Returns:
+            List of objects that are new or newer than anything seen before
+        """
+        get_key = compile_key_spec(key, default=MISSING)
+        get_timestamp = compile_key_spec(timestamp_key, default=0)
+        # digest -> [timestamp, offset]
+        latest = {}
+        for offset, obj in enumerate(objects):
+            obj_key = get_key(obj)
+            if obj_key is MISSING:
+                continue
+            digest = key_digest(obj_key)
+            timestamp = get_timestamp(obj)
+            entry = latest.get(digest)
+            if entry is None:
+                latest[digest] = [timestamp, offset]
+            elif timestamp > entry[0]:
+                entry[0] = timestamp
+                entry[1] = offset
+
+        stored = self._stored_timestamps(list(latest))
+        result = []
+        entries = []
+        for digest, (timestamp, offset) in latest.items():
+            if digest in stored and not timestamp > stored[digest]:
+                continue
+            entries.append((digest, timestamp, offset))
+            result.append(objects[offset])
+
+        self._record_batch(entries, len(objects))
+        return result
+
+    def compact(self, older_than: Optional[float] = None) -> int:
+        """
+        Drops expired entries and reclaims their space.
+
+        Args:
+            older_than: Remove entries whose timestamp is below this value;
+                None only rewrites the file
+
+        Returns:
+            Number of entries removed
+        """
+        if self.read_only:
+            raise ValueError("Cannot compact an index opened read-only")
+        removed = 0
+        if older_than is not None:
+            with self.conn:
+                removed = self.conn.execute("DELETE FROM dedup_keys WHERE timestamp < ?", (older_than,)).rowcount
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conn.execute("VACUUM")
+        return removed
+
+    def batches(self) -> Iterable[Tuple[int, float, int]]:
+        """
+        Returns:
+            (batch_id, created_at, record_count) for every recorded batch
+        """
+        return self.conn.execute("SELECT batch_id, created_at, record_count FROM batches ORDER BY batch_id").fetchall()
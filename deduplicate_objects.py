@@ -1,69 +1,97 @@
-import json
-from typing import List, Dict, Any, Callable, Optional
-from collections import defaultdict
+import heapq
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Union
+from itertools import groupby
+from operator import itemgetter
 import unittest
+from canonical_hash import canonical_digest
+from key_spec import MISSING, KeySpec, compile_key_spec, is_flat_key
 
-def deduplicate_by_key(objects: List[Dict], key: str) -> List[Dict]:
+def deduplicate_by_key(objects: List[Dict], key: KeySpec, seen: Optional[Any] = None) -> List[Dict]:
     """
     Deduplicate objects based on a specific key.
     Keeps the first occurrence of each unique key value.
+    Objects without the key are skipped.
     
     Args:
         objects: List of dictionaries to deduplicate
-        key: The key to use for deduplication
+        key: The key to use for deduplication; a dotted path such as
+            "customer.address.zip" or a compiled key spec also works
+        seen: Optional set-like container for seen keys, e.g. an
+            ApproximateSeenSet for fixed-memory approximate dedup
     
     Returns:
         List of deduplicated objects
     """
-    seen = set()
+    if seen is None:
+        seen = set()
     result = []
     
+    if is_flat_key(key):
+        for obj in objects:
+            if key not in obj:
+                continue
+            value = obj[key]
+            if value not in seen:
+                seen.add(value)
+                result.append(obj)
+        return result
+    
+    get_key = compile_key_spec(key, default=MISSING)
     for obj in objects:
-        if key not in obj:
+        value = get_key(obj)
+        if value is MISSING:
             continue
-        if obj[key] not in seen:
-            seen.add(obj[key])
+        if value not in seen:
+            seen.add(value)
             result.append(obj)
     
     return result
 
-def deduplicate_by_multiple_keys(objects: List[Dict], keys: List[str]) -> List[Dict]:
+def deduplicate_by_multiple_keys(objects: List[Dict], keys: KeySpec) -> List[Dict]:
     """
     Deduplicate objects based on multiple keys.
     Keeps the first occurrence of each unique combination of key values.
     
     Args:
         objects: List of dictionaries to deduplicate
-        keys: List of keys to use for deduplication
+        keys: List of keys (or dotted paths) to use for deduplication, or a
+            compiled key spec; missing keys count as None
     
     Returns:
         List of deduplicated objects
     """
     seen = set()
     result = []
+    get_key = compile_key_spec(keys) if callable(keys) else compile_key_spec(list(keys))
     
     for obj in objects:
         # Create a tuple of values for the specified keys
-        key_values = tuple(obj.get(key) for key in keys)
+        key_values = get_key(obj)
         if key_values not in seen:
             seen.add(key_values)
             result.append(obj)
     
     return result
 
-def deduplicate_by_custom_function(objects: List[Dict], key_func: Callable[[Dict], Any]) -> List[Dict]:
+def deduplicate_by_custom_function(objects: List[Dict], key_func: Union[Callable[[Dict], Any], KeySpec],
+                                   seen: Optional[Any] = None) -> List[Dict]:
     """
     Deduplicate objects using a custom function to generate the key.
     
     Args:
         objects: List of dictionaries to deduplicate
-        key_func: Function that takes an object and returns a key for deduplication
+        key_func: Function that takes an object and returns a key for
+            deduplication; key specs (paths or lists of paths) are compiled
+        seen: Optional set-like container for seen keys, e.g. an
+            ApproximateSeenSet for fixed-memory approximate dedup
     
     Returns:
         List of deduplicated objects
     """
-    seen = set()
+    if seen is None:
+        seen = set()
     result = []
+    key_func = compile_key_spec(key_func)
     
     for obj in objects:
         key = key_func(obj)
@@ -75,8 +103,10 @@ def deduplicate_by_custom_function(objects: List[Dict], key_func: Callable[[Dict
 
 def deduplicate_by_json_string(objects: List[Dict]) -> List[Dict]:
     """
-    Deduplicate objects by converting them to JSON strings.
+    Deduplicate objects by their canonical JSON content.
     This removes objects with identical content regardless of key order.
+    Only a 128-bit digest of each object is kept in memory, and values JSON
+    cannot represent (datetimes, sets, bytes, ...) are supported.
     
     Args:
         objects: List of dictionaries to deduplicate
@@ -88,39 +118,158 @@ def deduplicate_by_json_string(objects: List[Dict]) -> List[Dict]:
     result = []
     
     for obj in objects:
-        # Sort keys to ensure consistent JSON representation
-        json_str = json.dumps(obj, sort_keys=True)
-        if json_str not in seen:
-            seen.add(json_str)
+        digest = canonical_digest(obj)
+        if digest not in seen:
+            seen.add(digest)
             result.append(obj)
     
     return result
 
-def deduplicate_keep_latest(objects: List[Dict], key: str, timestamp_key: str = 'timestamp') -> List[Dict]:
+def deduplicate_keep_latest(objects: List[Dict], key: KeySpec, timestamp_key: str = 'timestamp') -> List[Dict]:
     """
     Deduplicate objects based on a key, keeping the latest version based on timestamp.
     
     Args:
         objects: List of dictionaries to deduplicate
-        key: The key to use for deduplication
-        timestamp_key: The key containing timestamp information
+        key: The key to use for deduplication (dotted paths and compiled key specs work too)
+        timestamp_key: The key containing timestamp information; may be a dotted path
     
     Returns:
         List of deduplicated objects with latest timestamps
     """
+    # key -> [timestamp, obj]; caching the timestamp avoids re-reading it on every comparison
     latest_objects = {}
     
+    if is_flat_key(key) and is_flat_key(timestamp_key):
+        for obj in objects:
+            if key not in obj:
+                continue
+            obj_key = obj[key]
+            current_timestamp = obj.get(timestamp_key, 0)
+            entry = latest_objects.get(obj_key)
+            if entry is None:
+                latest_objects[obj_key] = [current_timestamp, obj]
+            elif current_timestamp > entry[0]:
+                entry[0] = current_timestamp
+                entry[1] = obj
+        return [obj for _, obj in latest_objects.values()]
+    
+    get_key = compile_key_spec(key, default=MISSING)
+    get_timestamp = compile_key_spec(timestamp_key, default=0)
     for obj in objects:
-        if key not in obj:
+        obj_key = get_key(obj)
+        if obj_key is MISSING:
             continue
             
-        obj_key = obj[key]
-        current_timestamp = obj.get(timestamp_key, 0)
+        current_timestamp = get_timestamp(obj)
+        entry = latest_objects.get(obj_key)
         
-        if obj_key not in latest_objects or current_timestamp > latest_objects[obj_key].get(timestamp_key, 0):
-            latest_objects[obj_key] = obj
+        if entry is None:
+            latest_objects[obj_key] = [current_timestamp, obj]
+        elif current_timestamp > entry[0]:
+            entry[0] = current_timestamp
+            entry[1] = obj
+    
+    return [obj for _, obj in latest_objects.values()]
+
+def deduplicate_keep_latest_k(objects: List[Dict], key: KeySpec, k: int,
+                              timestamp_key: str = 'timestamp') -> List[Dict]:
+    """
+    Deduplicate objects based on a key, keeping the k latest versions of each key.
+    Each key holds a min-heap of at most k entries, so a newer record replaces
+    the oldest one in O(log k). With k=1 this matches deduplicate_keep_latest.
+    
+    Args:
+        objects: List of dictionaries to deduplicate
+        key: The key to use for deduplication (dotted paths and compiled key specs work too)
+        k: Number of versions to keep per key
+        timestamp_key: The key containing timestamp information; may be a dotted path
     
-    return list(latest_objects.values())
+    Returns:
+        List of deduplicated objects, grouped by key in order of first
+        appearance and newest first within each key (ties keep input order)
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    # key -> heap of (timestamp, -seq, obj); the root is the oldest entry, and
+    # among equal timestamps the later record, which is evicted first
+    heaps = {}
+    get_key = compile_key_spec(key, default=MISSING)
+    get_timestamp = compile_key_spec(timestamp_key, default=0)
+    
+    for seq, obj in enumerate(objects):
+        obj_key = get_key(obj)
+        if obj_key is MISSING:
+            continue
+        entry = (get_timestamp(obj), -seq, obj)
+        heap = heaps.get(obj_key)
+        if heap is None:
+            heaps[obj_key] = [entry]
+        elif len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    
+    result = []
+    for heap in heaps.values():
+        heap.sort(reverse=True)
+        result.extend(obj for _, _, obj in heap)
+    return result
+
+def merge_sorted_partitions(partitions: Iterable[Iterable[Dict]], key: KeySpec, k: int = 1,
+                            timestamp_key: str = 'timestamp') -> Iterator[Dict]:
+    """
+    Deduplicate several partitions that are each already sorted by key, such
+    as daily shard files, in one streaming k-way merge.
+    Only the head record of each partition and the current key's candidates
+    are held in memory, so memory grows with the number of partitions (and k)
+    rather than with the number of keys.
+    
+    Args:
+        partitions: Iterables of dictionaries, each sorted by key
+        key: The key to use for deduplication (dotted paths and compiled key specs work too);
+            records without it are skipped
+        k: Number of latest versions to keep per key
+        timestamp_key: The key containing timestamp information; may be a dotted path
+    
+    Returns:
+        Iterator of deduplicated objects in key order, newest first within
+        each key (ties keep partition order)
+    
+    Raises:
+        ValueError: If a partition is not sorted by key
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    get_key = compile_key_spec(key, default=MISSING)
+    get_timestamp = compile_key_spec(timestamp_key, default=0)
+    
+    def keyed(partition):
+        for obj in partition:
+            obj_key = get_key(obj)
+            if obj_key is not MISSING:
+                yield obj_key, obj
+    
+    # heapq.merge is stable, so equal keys come out in partition order
+    merged = heapq.merge(*map(keyed, partitions), key=itemgetter(0))
+    
+    seq = 0
+    previous = MISSING
+    for obj_key, group in groupby(merged, key=itemgetter(0)):
+        if previous is not MISSING and obj_key < previous:
+            raise ValueError(f"Partitions must be sorted by key; {obj_key!r} came after {previous!r}")
+        previous = obj_key
+        heap = []
+        for _, obj in group:
+            entry = (get_timestamp(obj), -seq, obj)
+            seq += 1
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        heap.sort(reverse=True)
+        for _, _, obj in heap:
+            yield obj
 
 # Test cases
 def run_test_cases():
@@ -269,6 +418,41 @@ class TestDeduplication(unittest.TestCase):
         # Check that we kept the latest timestamp for user_id 1
         user1_order = next(order for order in result if order["user_id"] == 1)
         self.assertEqual(user1_order["timestamp"], 2000)
+    
+    def test_deduplicate_keep_latest_k(self):
+        """Test keeping the k latest versions per key."""
+        orders = [
+            {"user_id": 1, "amount": 100, "timestamp": 1000},
+            {"user_id": 2, "amount": 300, "timestamp": 1500},
+            {"user_id": 1, "amount": 200, "timestamp": 3000},
+            {"user_id": 1, "amount": 250, "timestamp": 2000},
+            {"amount": 50, "timestamp": 4000},
+        ]
+        result = deduplicate_keep_latest_k(orders, "user_id", 2, "timestamp")
+        self.assertEqual([order["amount"] for order in result], [200, 250, 300])
+        
+        # k=1 matches deduplicate_keep_latest, including ties
+        ties = orders + [{"user_id": 2, "amount": 400, "timestamp": 1500}]
+        self.assertEqual(deduplicate_keep_latest_k(ties, "user_id", 1), deduplicate_keep_latest(ties, "user_id"))
+        with self.assertRaises(ValueError):
+            deduplicate_keep_latest_k(orders, "user_id", 0)
+    
+    def test_merge_sorted_partitions(self):
+        """Test k-way merge of partitions sorted by key."""
+        day1 = [{"id": 1, "timestamp": 10}, {"id": 3, "timestamp": 10}, {"id": 5, "timestamp": 10}]
+        day2 = [{"id": 1, "timestamp": 20}, {"id": 2, "timestamp": 20}, {"id": 5, "timestamp": 5}]
+        day3 = [{"id": 3, "timestamp": 30}, {"timestamp": 99}, {"id": 4, "timestamp": 30}]
+        
+        result = list(merge_sorted_partitions([iter(day1), iter(day2), iter(day3)], "id"))
+        self.assertEqual(result, [day2[0], day2[1], day3[0], day3[2], day1[2]])
+        self.assertEqual(sorted(result, key=lambda obj: obj["id"]),
+                         sorted(deduplicate_keep_latest(day1 + day2 + day3, "id"), key=lambda obj: obj["id"]))
+        
+        result = list(merge_sorted_partitions([day1, day2, day3], "id", k=2))
+        self.assertEqual(result, [day2[0], day1[0], day2[1], day3[0], day1[1], day3[2], day1[2], day2[2]])
+        
+        with self.assertRaises(ValueError):
+            list(merge_sorted_partitions([[{"id": 2}, {"id": 1}]], "id"))
 
 if __name__ == "__main__":
     # Run test cases
@@ -288,4 +472,6 @@ if __name__ == "__main__":
     print("- Deduplicate by multiple keys")
     print("- Deduplicate by custom function")
     print("- Deduplicate by exact content match")
-    print("- Deduplicate keeping latest version") 
\ No newline at end of file
+    print("- Deduplicate keeping latest version")
+    print("- Keep the k latest versions per key")
+    print("- Merge pre-sorted partitions in one streaming pass") 
\ No newline at end of file
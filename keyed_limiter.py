@@ -0,0 +1,199 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Hashable, Optional
+
+from limiter_metrics import REGISTRY, default_name
+
+# Slack for float rounding in the token count, as in rate_limiter
+_EPSILON = 1e-9
+
+
+class KeyedTokenBucket:
+    """
+    Independent token buckets for an unbounded set of keys (users, endpoints, ...).
+
+    Each key costs one small [tokens, updated] entry. Keys are spread over
+    ``stripes`` tables, each an OrderedDict in least-recently-used order with
+    its own lock, so threads working on different keys rarely contend.
+    Eviction pops entries off the cold end of a table: keys idle for longer
+    than ``idle_timeout`` on every call, and the least recently used key when
+    a table is full. Both are O(1) amortized per call.
+
+    By default idle_timeout is the time an empty bucket takes to refill, so
+    an evicted key's bucket would have been full anyway and eviction never
+    lets a key through early. Capacity eviction can forget a busy key; size
+    max_keys above the number of keys active within that time.
+    """
+    def __init__(self, rate: float, burst: float = 1, max_keys: int = 100_000,
+                 idle_timeout: Optional[float] = None, stripes: int = 16,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate: Tokens added per second to each key's bucket
+            burst: Capacity of each key's bucket; new keys start full
+            max_keys: Maximum number of keys tracked at once
+            idle_timeout: Seconds after which an unused key is dropped;
+                defaults to burst / rate
+            stripes: Number of independently locked tables
+            clock: Monotonic time source
+            sleep: Sleep function used by acquire()
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if max_keys < stripes or stripes < 1:
+            raise ValueError("max_keys must be at least stripes, which must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_timeout = burst / rate if idle_timeout is None else idle_timeout
+        self.clock = clock
+        self.sleep = sleep
+        self._stripe_capacity = -(-max_keys // stripes)
+        self._tables = [OrderedDict() for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._evicted = [0] * stripes
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables)
+
+    @property
+    def evicted(self) -> int:
+        """Number of keys evicted so far."""
+        return sum(self._evicted)
+
+    def _try_acquire(self, key: Hashable, tokens: float) -> float:
+        if tokens > self.burst:
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket of {self.burst}")
+        stripe = hash(key) % len(self._tables)
+        table = self._tables[stripe]
+        with self._locks[stripe]:
+            now = self.clock()
+            entry = table.get(key)
+            if entry is None:
+                entry = table[key] = [self.burst, now]
+            else:
+                table.move_to_end(key)
+                entry[0] = min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+                entry[1] = now
+
+            # The table is in last-use order, so idle keys sit at the front
+            horizon = now - self.idle_timeout
+            while len(table) > 1:
+                _, (_, updated) = next(iter(table.items()))
+                if updated > horizon and len(table) <= self._stripe_capacity:
+                    break
+                table.popitem(last=False)
+                self._evicted[stripe] += 1
+
+            if entry[0] + _EPSILON >= tokens:
+                entry[0] = max(0.0, entry[0] - tokens)
+                return 0
+            return (tokens - entry[0]) / self.rate
+
+    def try_acquire(self, key: Hashable, tokens: float = 1) -> bool:
+        """
+        Takes tokens from a key's bucket if they are available right now.
+
+        Args:
+            key: The key whose limit applies
+            tokens: Number of tokens (calls) to take
+
+        Returns:
+            True if the tokens were taken
+        """
+        return self._try_acquire(key, tokens) == 0
+
+    def acquire(self, key: Hashable, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Takes tokens from a key's bucket, waiting until they become available.
+
+        Args:
+            key: The key whose limit applies
+            tokens: Number of tokens (calls) to take
+            timeout: Maximum number of seconds to wait; None waits indefinitely
+
+        Returns:
+            True if the tokens were taken, False if they could not be taken before the timeout
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            wait = self._try_acquire(key, tokens)
+            if wait == 0:
+                return True
+            if deadline is not None and self.clock() + wait > deadline:
+                return False
+            self.sleep(wait)
+
+
+def _first_argument_of(func: Callable) -> Callable[..., Hashable]:
+    """
+    Build a key function returning the value of func's first parameter,
+    whether it is passed positionally, by keyword or left at its default.
+    """
+    parameters = list(inspect.signature(func).parameters.values())
+    if not parameters or parameters[0].kind is inspect.Parameter.VAR_KEYWORD:
+        raise TypeError(f"{func.__qualname__} has no first parameter to key on; pass key_func")
+    first = parameters[0]
+    by_keyword = first.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+
+    def first_argument(*args, **kwargs):
+        if args and first.kind is not inspect.Parameter.KEYWORD_ONLY:
+            return args[0]
+        if by_keyword and first.name in kwargs:
+            return kwargs[first.name]
+        if first.default is not inspect.Parameter.empty:
+            return first.default
+        raise TypeError(f"{func.__qualname__}() missing its first argument {first.name!r}")
+    return first_argument
+
+
+def keyed_throttle(rate: float, burst: float = 1, key_func: Optional[Callable[..., Hashable]] = None,
+                   blocking: bool = False, timeout: Optional[float] = None, name: Optional[str] = None,
+                   **options):
+    """
+    Throttle decorator with an independent limit per key derived from the call arguments.
+
+    Args:
+        rate: Calls allowed per second for each key
+        burst: Calls a key may make back to back after a quiet period
+        key_func: Function that takes the call's arguments and returns its key;
+            defaults to the value of the function's first parameter, however
+            it is passed
+        blocking: Wait for the key's next token; otherwise calls over the limit return None
+        timeout: Maximum seconds a blocking call waits before returning None
+        name: Name the metrics in limiter_metrics.REGISTRY are reported under;
+            defaults to the function's module and qualified name
+        **options: max_keys, idle_timeout, stripes and clock overrides accepted by KeyedTokenBucket
+
+    Returns:
+        Decorator for the function to throttle
+    """
+    def decorator(func):
+        limiter = KeyedTokenBucket(rate, burst, **options)
+        metrics = REGISTRY.limiter(name or default_name(func))
+        get_key = key_func or _first_argument_of(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = get_key(*args, **kwargs)
+            if limiter.try_acquire(key):
+                metrics.allowed()
+            elif not blocking:
+                metrics.throttled()
+                return None
+            else:
+                start = limiter.clock()
+                acquired = limiter.acquire(key, timeout=timeout)
+                metrics.waited(limiter.clock() - start, acquired)
+                if not acquired:
+                    return None
+            return func(*args, **kwargs)
+        wrapper.limiter = limiter
+        wrapper.metrics = metrics
+        return wrapper
+    return decorator
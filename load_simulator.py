@@ -0,0 +1,242 @@
+import math
+import random
+import time
+from array import array
+from itertools import cycle
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from keyed_limiter import KeyedTokenBucket
+from rate_limiter import SlidingWindowCounter, SlidingWindowLog, TokenBucket
+from throttle_example import ThrottleFunction, throttle
+
+# Latency percentiles included in every report
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class VirtualClock:
+    """
+    Simulated time that only moves when told to.
+
+    Pass ``time`` or ``monotonic`` wherever a limiter takes a clock and
+    ``sleep`` wherever it takes a sleep function: sleeping advances the clock
+    instantly, so blocking limiters can be replayed without waiting.
+    """
+    def __init__(self, start: float = 0.0):
+        """
+        Args:
+            start: Initial time in seconds
+        """
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now += seconds
+
+    def advance_to(self, when: float) -> None:
+        """
+        Moves the clock forward to when; never moves it back.
+
+        Args:
+            when: Time to move to
+        """
+        if when > self.now:
+            self.now = when
+
+
+def poisson_arrivals(rate: float, duration: float, seed: Optional[int] = None) -> Iterator[float]:
+    """
+    Arrival times of a Poisson process (independent requests at a steady mean rate).
+
+    Args:
+        rate: Mean arrivals per second
+        duration: Seconds of traffic to generate
+        seed: Seed for a reproducible trace
+
+    Returns:
+        Iterator of increasing arrival times starting after 0
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    expovariate = random.Random(seed).expovariate
+    now = expovariate(rate)
+    while now < duration:
+        yield now
+        now += expovariate(rate)
+
+
+def bursty_arrivals(base_rate: float, burst_rate: float, burst_length: float, period: float,
+                    duration: float, seed: Optional[int] = None) -> Iterator[float]:
+    """
+    Arrival times alternating between a burst and a quieter base rate.
+
+    Every period starts with burst_length seconds at burst_rate, followed by
+    base_rate for the rest of the period; arrivals within each phase are Poisson.
+
+    Args:
+        base_rate: Mean arrivals per second between bursts (0 for silence)
+        burst_rate: Mean arrivals per second during a burst
+        burst_length: Seconds each burst lasts
+        period: Seconds from the start of one burst to the next
+        duration: Seconds of traffic to generate
+        seed: Seed for a reproducible trace
+
+    Returns:
+        Iterator of increasing arrival times starting after 0
+    """
+    if not 0 < burst_length <= period:
+        raise ValueError("burst_length must be positive and at most period")
+    expovariate = random.Random(seed).expovariate
+    phase_start = 0.0
+    while phase_start < duration:
+        for rate, length in ((burst_rate, burst_length), (base_rate, period - burst_length)):
+            phase_end = min(phase_start + length, duration)
+            if rate > 0:
+                now = phase_start + expovariate(rate)
+                while now < phase_end:
+                    yield now
+                    now += expovariate(rate)
+            phase_start = phase_end
+
+
+def diurnal_arrivals(mean_rate: float, duration: float, period: float = 86400.0, amplitude: float = 0.8,
+                     seed: Optional[int] = None) -> Iterator[float]:
+    """
+    Arrival times whose rate follows a daily cycle.
+
+    The rate is mean_rate * (1 - amplitude * cos(2 pi t / period)), lowest at
+    the start of each period and highest halfway through. The trace is drawn
+    by thinning a Poisson process at the peak rate.
+
+    Args:
+        mean_rate: Arrivals per second averaged over a period
+        duration: Seconds of traffic to generate
+        period: Seconds in one cycle
+        amplitude: Relative swing around mean_rate, between 0 and 1
+        seed: Seed for a reproducible trace
+
+    Returns:
+        Iterator of increasing arrival times starting after 0
+    """
+    if not 0 <= amplitude <= 1:
+        raise ValueError("amplitude must be between 0 and 1")
+    generator = random.Random(seed)
+    peak = mean_rate * (1 + amplitude)
+    angular = 2 * math.pi / period
+    for now in poisson_arrivals(peak, duration, generator.random()):
+        if generator.random() * peak < mean_rate * (1 - amplitude * math.cos(angular * now)):
+            yield now
+
+
+def simulate(call: Callable[[], Any], arrivals: Iterable[float], clock: VirtualClock) -> Dict[str, Any]:
+    """
+    Replays an arrival trace against a limiter in virtual time.
+
+    Calls are made one at a time in arrival order. A call that blocks (by
+    sleeping on the clock) holds up the calls behind it, as a single worker
+    serving a queue would; a call's latency runs from its arrival until it
+    returns. The limiter must use clock for its time and sleep functions.
+
+    Args:
+        call: Makes one limited call and returns a truthy value if it was admitted
+        arrivals: Increasing arrival times, e.g. from poisson_arrivals
+        clock: Virtual clock shared with the limiter
+
+    Returns:
+        calls, admitted, rejected, duration (virtual seconds), throughput
+        (admitted per virtual second), rejection_rate, latency percentiles
+        as {percentile: seconds}, max_latency and elapsed (real seconds)
+    """
+    latencies = array("d")
+    admitted = 0
+    start = clock.now
+    started = time.perf_counter()
+    for arrival in arrivals:
+        clock.advance_to(arrival)
+        admitted += bool(call())
+        latencies.append(clock.now - arrival)
+    elapsed = time.perf_counter() - started
+
+    calls = len(latencies)
+    duration = clock.now - start
+    ordered = sorted(latencies)
+    return {
+        "calls": calls,
+        "admitted": admitted,
+        "rejected": calls - admitted,
+        "duration": duration,
+        "throughput": admitted / duration if duration > 0 else 0.0,
+        "rejection_rate": (calls - admitted) / calls if calls else 0.0,
+        "latency": {p: ordered[min(calls - 1, int(p / 100 * calls))] if calls else 0.0 for p in PERCENTILES},
+        "max_latency": ordered[-1] if calls else 0.0,
+        "elapsed": elapsed,
+    }
+
+
+def benchmark_limiters(rate: float = 100.0, duration: float = 3600.0, seed: int = 1) -> None:
+    """
+    Replay Poisson, bursty and diurnal traffic against each limiter.
+
+    Offered load averages twice the allowed rate, so every limiter has
+    calls to reject. A blocking token bucket is then replayed below its rate
+    to show how queueing latency grows with load.
+
+    Args:
+        rate: Calls per second each limiter allows
+        duration: Virtual seconds of traffic per trace
+        seed: Seed for the traces
+    """
+    traces = {
+        "poisson": lambda: poisson_arrivals(2 * rate, duration, seed),
+        "bursty": lambda: bursty_arrivals(rate / 2, 20 * rate, 5.0, 60.0, duration, seed),
+        "diurnal": lambda: diurnal_arrivals(2 * rate, duration, period=duration, seed=seed),
+    }
+
+    def keyed(clock: VirtualClock, name: str):
+        bucket = KeyedTokenBucket(rate / 10, rate / 10, clock=clock, sleep=clock.sleep)
+        users = cycle(range(10))
+        return lambda: bucket.try_acquire(next(users))
+
+    # Each factory builds a fresh limiter on the clock it is given, reporting
+    # metrics under the given name
+    limiters = {
+        "throttle": lambda clock, name: throttle(1 / rate, name=name, clock=clock)(lambda: True),
+        "ThrottleFunction": lambda clock, name: ThrottleFunction(lambda: True, 1 / rate, name=name, clock=clock),
+        "TokenBucket": lambda clock, name: TokenBucket(rate, rate, clock=clock, sleep=clock.sleep).try_acquire,
+        "SlidingWindowLog": lambda clock, name: SlidingWindowLog(int(rate), 1.0, clock=clock,
+                                                                 sleep=clock.sleep).try_acquire,
+        "SlidingWindowCounter": lambda clock, name: SlidingWindowCounter(int(rate), 1.0, clock=clock,
+                                                                         sleep=clock.sleep).try_acquire,
+        "KeyedTokenBucket x10": keyed,
+    }
+
+    print(f"Allowed rate {rate:g}/s, {duration:g} virtual seconds per trace")
+    print(f"{'trace':<8} {'limiter':<22} {'calls':>10} {'admitted/s':>11} {'rejected':>9} {'real s':>7}")
+    for trace_name, trace in traces.items():
+        for limiter_name, factory in limiters.items():
+            clock = VirtualClock()
+            report = simulate(factory(clock, f"simulated.{trace_name}.{limiter_name}"), trace(), clock)
+            print(f"{trace_name:<8} {limiter_name:<22} {report['calls']:>10,} {report['throughput']:>11.1f} "
+                  f"{report['rejection_rate']:>9.1%} {report['elapsed']:>7.2f}")
+
+    print("\nBlocking TokenBucket(burst=1), Poisson arrivals, latency in ms")
+    print(f"{'load':>5} {'calls':>10} {'p50':>8} {'p90':>8} {'p99':>8} {'p99.9':>8} {'max':>8}")
+    for load in (0.5, 0.9, 0.99):
+        clock = VirtualClock()
+        bucket = TokenBucket(rate, 1, clock=clock, sleep=clock.sleep)
+        report = simulate(bucket.acquire, poisson_arrivals(load * rate, duration, seed), clock)
+        latency = report["latency"]
+        print(f"{load:>5.0%} {report['calls']:>10,} " + " ".join(f"{latency[p] * 1e3:>8.1f}" for p in PERCENTILES)
+              + f" {report['max_latency'] * 1e3:>8.1f}")
+
+
+if __name__ == "__main__":
+    benchmark_limiters()
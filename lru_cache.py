@@ -1,19 +1,59 @@
 
+import sys
+import threading
+import time
 from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Expired entries removed per get or put on top of the one being looked at;
+# more than one per put lets the sweep catch up with any backlog
+_EXPIRE_BATCH = 2
+
 
 class LRUCache:
     """
     A simple implementation of a Least Recently Used (LRU) cache.
+
+    Capacity counts entries unless a weigher is given, in which case it
+    bounds the total weight (e.g. bytes) and least recently used entries are
+    evicted until the new one fits. With a ttl, entries expire that many
+    seconds after they were last put. Expired entries are dropped when they
+    are looked up, and every get and put also sweeps a few from the front of
+    an expiry queue kept in deadline order, so expiry costs O(1) amortized
+    per operation and never scans the cache.
+
+    The evictions, expirations and rejections attributes count entries
+    removed to make room, entries dropped because they expired, and puts not
+    cached because the item alone outweighs the capacity.
+
+    Not thread-safe; use ShardedLRUCache from multiple threads.
     """
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, ttl: Optional[float] = None,
+                 weigher: Optional[Callable[[Any], float]] = None, clock: Callable[[], float] = time.monotonic):
         """
         Initializes the LRU cache with a given capacity.
 
         Args:
-            capacity: The maximum number of items the cache can hold.
+            capacity: The maximum number of items the cache can hold, or their
+                maximum total weight when a weigher is given.
+            ttl: Seconds an item stays valid after it is put; None never expires.
+            weigher: Function returning the weight of a value, e.g. len for bytes.
+            clock: Monotonic time source used for expiry.
         """
         self.cache = OrderedDict()
         self.capacity = capacity
+        self.ttl = ttl
+        self.weigher = weigher
+        self.clock = clock
+        self.weight = 0
+        # key -> weight, kept only with a weigher (everything else weighs 1)
+        self._weights = {}
+        # key -> expiry time in put order, which is expiry order since every
+        # entry lives for the same ttl
+        self._deadlines = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
 
     def get(self, key: int) -> int:
         """
@@ -23,29 +63,273 @@ class LRUCache:
             key: The key of the item to retrieve.
 
         Returns:
-            The value of the item, or -1 if the key is not in the cache.
+            The value of the item, or -1 if the key is not in the cache or has expired.
         """
         if key not in self.cache:
             return -1
-        else:
-            # Move the accessed item to the end to mark it as recently used.
-            self.cache.move_to_end(key)
-            return self.cache[key]
+        if self.ttl is not None:
+            now = self.clock()
+            if self._deadlines[key] <= now:
+                self._remove(key)
+                self.expirations += 1
+                return -1
+            self._expire(now, _EXPIRE_BATCH)
+        # Move the accessed item to the end to mark it as recently used.
+        self.cache.move_to_end(key)
+        return self.cache[key]
 
     def put(self, key: int, value: int) -> None:
         """
         Adds an item to the cache.
 
         If the key already exists, its value is updated. If the cache is full,
-        the least recently used item is removed.
+        least recently used items are removed until the new item fits. An item
+        heavier than the whole capacity is not cached.
 
         Args:
             key: The key of the item to add.
             value: The value of the item to add.
         """
-        self.cache[key] = value
-        # Move the accessed item to the end to mark it as recently used.
-        self.cache.move_to_end(key)
-        if len(self.cache) > self.capacity:
+        weight = 1 if self.weigher is None else self.weigher(value)
+        cache = self.cache
+        if weight > self.capacity:
+            if key in cache:
+                self._remove(key)
+            self.rejections += 1
+            return
+        if key in cache:
+            self.weight += weight - self._weights.get(key, 1)
+            cache[key] = value
+            # Move the accessed item to the end to mark it as recently used.
+            cache.move_to_end(key)
+        else:
+            cache[key] = value
+            self.weight += weight
+        if self.weigher is not None:
+            self._weights[key] = weight
+        if self.ttl is not None:
+            now = self.clock()
+            self._deadlines[key] = now + self.ttl
+            self._deadlines.move_to_end(key)
+            self._expire(now, _EXPIRE_BATCH)
+        while self.weight > self.capacity:
             # Remove the first item in the dictionary, which is the least recently used.
-            self.cache.popitem(last=False)
+            self._remove(next(iter(cache)))
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self.cache
+
+    def expire(self) -> int:
+        """
+        Removes every expired item, e.g. from a periodic maintenance task.
+
+        Returns:
+            The number of items removed.
+        """
+        return self._expire(self.clock()) if self.ttl is not None else 0
+
+    def _expire(self, now: float, limit: Optional[int] = None) -> int:
+        removed = 0
+        deadlines = self._deadlines
+        while deadlines and removed != limit:
+            key = next(iter(deadlines))
+            if deadlines[key] > now:
+                break
+            self._remove(key)
+            removed += 1
+        self.expirations += removed
+        return removed
+
+    def _remove(self, key: int) -> None:
+        del self.cache[key]
+        self.weight -= self._weights.pop(key, 1)
+        self._deadlines.pop(key, None)
+
+
+class ShardedLRUCache:
+    """
+    A thread-safe LRU cache split into independently locked segments.
+
+    Keys are hashed to one of ``shards`` segments, each an LRU cache with its
+    own lock and its share of the capacity, so threads working on different
+    segments never wait for each other. Recency and eviction are tracked per
+    segment: the cache evicts the least recently used key of the segment that
+    overflows, which approximates global LRU order when keys spread evenly.
+    As with LRUCache, a stored value of -1 is reported as a miss.
+
+    Segments that count their own evictions, expirations and rejections like
+    LRUCache report those; for other segments every entry a put removes
+    beyond the new key's slot is counted as an eviction.
+    """
+    def __init__(self, capacity: int, shards: int = 16,
+                 segment_factory: Callable[[int], LRUCache] = LRUCache):
+        """
+        Args:
+            capacity: Maximum number of items (or total weight, with weighted
+                segments) across all segments, rounded up to a multiple of shards
+            shards: Number of independently locked segments
+            segment_factory: Function that takes a segment capacity and returns
+                an empty cache with get, put, len() and ``in`` like LRUCache
+                (e.g. a policy from cache_policies)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        shards = min(shards, capacity)
+        self.shard_capacity = -(-capacity // shards)
+        self.capacity = self.shard_capacity * shards
+        self._segments = [segment_factory(self.shard_capacity) for _ in range(shards)]
+        self._self_counting = all(hasattr(segment, "evictions") for segment in self._segments)
+        self._locks = [threading.Lock() for _ in range(shards)]
+        # hits, misses, evictions per segment; updated under the segment's lock,
+        # evictions only for segments that do not count their own
+        self._counts = [[0, 0, 0] for _ in range(shards)]
+        # What get needs per segment, prebound to keep the hit path short
+        self._getters = [(lock, segment.get, counts)
+                         for lock, segment, counts in zip(self._locks, self._segments, self._counts)]
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Retrieves an item and marks it as recently used.
+
+        Args:
+            key: The key of the item to retrieve
+
+        Returns:
+            The value of the item, or -1 if the key is not in the cache
+        """
+        lock, get, counts = self._getters[hash(key) % len(self._getters)]
+        with lock:
+            value = get(key)
+            # Misses are -1; compare types first so values with unusual __eq__
+            # (e.g. arrays) are never compared to it
+            counts[type(value) is int and value == -1] += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Adds or updates an item, evicting its segment's least recently used item if the segment is full.
+
+        Args:
+            key: The key of the item to add
+            value: The value of the item to add
+        """
+        shard = hash(key) % len(self._segments)
+        segment = self._segments[shard]
+        with self._locks[shard]:
+            if self._self_counting:
+                segment.put(key, value)
+                return
+            # Whatever the segment lost beyond the new key's slot was evicted
+            expected = len(segment) + (key not in segment)
+            segment.put(key, value)
+            self._counts[shard][2] += expected - len(segment)
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            hits, misses, evictions, expirations and rejections summed over
+            all segments, the hit ratio, the current size and capacity, and
+            each segment's size
+        """
+        hits = misses = evictions = expirations = rejections = 0
+        sizes = []
+        for segment, lock, counts in zip(self._segments, self._locks, self._counts):
+            with lock:
+                hits += counts[0]
+                misses += counts[1]
+                if self._self_counting:
+                    evictions += segment.evictions
+                    expirations += getattr(segment, "expirations", 0)
+                    rejections += getattr(segment, "rejections", 0)
+                else:
+                    evictions += counts[2]
+                sizes.append(len(segment))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "expirations": expirations,
+            "rejections": rejections,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "size": sum(sizes),
+            "capacity": self.capacity,
+            "shard_sizes": sizes,
+        }
+
+
+def _locked(cache: LRUCache) -> Callable[[Hashable], Any]:
+    lock = threading.Lock()
+
+    def get(key):
+        with lock:
+            return cache.get(key)
+    return get
+
+
+def benchmark_thread_scaling(thread_counts=(1, 2, 4, 8, 16), duration: float = 0.5, keys: int = 10_000) -> None:
+    """
+    Measure cache hits per second as threads are added.
+
+    Compares one LRUCache behind a single global lock with ShardedLRUCache
+    at 1 and 16 shards. Every lookup hits. Sharding only pays off when
+    threads really run in parallel (a free-threaded build); under the GIL
+    the numbers mostly show locking overhead.
+
+    Args:
+        thread_counts: Thread counts to run
+        duration: Seconds each run lasts
+        keys: Number of keys in the cache, all looked up at random
+    """
+    def hammer(get, threads):
+        barrier = threading.Barrier(threads + 1)
+        counts = [0] * threads
+
+        def worker(index):
+            lookups = 0
+            barrier.wait()
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                # Stride through the keys from a per-thread offset
+                for key in range(index * 7919 % keys, keys, 97):
+                    get(key)
+                lookups += len(range(index * 7919 % keys, keys, 97))
+            counts[index] = lookups
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+        for thread in workers:
+            thread.start()
+        barrier.wait()
+        start = time.monotonic()
+        for thread in workers:
+            thread.join()
+        return sum(counts) / (time.monotonic() - start)
+
+    def filled(cache):
+        for key in range(keys):
+            cache.put(key, key)
+        return cache
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Hits per second, {keys:,} keys, GIL {'enabled' if gil else 'disabled'}")
+    print(f"{'threads':>7} {'global lock':>12} {'1 shard':>12} {'16 shards':>12}")
+    for threads in thread_counts:
+        rates = [
+            hammer(_locked(filled(LRUCache(keys))), threads),
+            hammer(filled(ShardedLRUCache(keys, shards=1)).get, threads),
+            hammer(filled(ShardedLRUCache(keys, shards=16)).get, threads),
+        ]
+        print(f"{threads:>7} " + " ".join(f"{rate:>12,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    benchmark_thread_scaling()
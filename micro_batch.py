@@ -0,0 +1,184 @@
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+from typing import Any, Callable, Hashable, List, Sequence, Tuple
+
+
+class MicroBatcher:
+    """
+    Collects single calls and runs them as one call of a bulk function.
+
+    A batch is sent when it reaches ``max_batch_size`` items or when its first
+    item has waited ``max_delay`` seconds, whichever comes first, so no call
+    waits longer than max_delay plus one bulk call. Full batches run on the
+    thread that filled them; batches closed by the timer run on a background
+    flusher thread. With ``coalesce``, equal items in a batch are sent once and
+    share the result.
+    """
+    def __init__(self, bulk_func: Callable[[List[Any]], Sequence[Any]], max_batch_size: int = 100,
+                 max_delay: float = 0.05, coalesce: bool = True, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            bulk_func: Function that takes a list of items and returns a list
+                of results in the same order
+            max_batch_size: Maximum number of items per bulk call
+            max_delay: Maximum seconds the first item of a batch waits for more items
+            coalesce: Send equal (hashable) items once per batch
+            clock: Monotonic time source
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_delay < 0:
+            raise ValueError("max_delay cannot be negative")
+        self.bulk_func = bulk_func
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.coalesce = coalesce
+        self.clock = clock
+        self.calls = 0
+        self.batches = 0
+        self._pending: List[Tuple[Any, Future]] = []
+        self._deadline = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._flusher = None
+
+    def submit(self, item: Any) -> Future:
+        """
+        Adds an item to the current batch.
+
+        Args:
+            item: Argument for the bulk function
+
+        Returns:
+            Future that resolves to the item's result
+        """
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed MicroBatcher")
+            self._pending.append((item, future))
+            self.calls += 1
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._take()
+            else:
+                batch = None
+                if len(self._pending) == 1:
+                    self._deadline = self.clock() + self.max_delay
+                    self._ensure_flusher()
+                    self._condition.notify()
+        if batch:
+            self._run(batch)
+        return future
+
+    def flush(self) -> None:
+        """Sends the current batch now, on the calling thread."""
+        with self._condition:
+            batch = self._take()
+        if batch:
+            self._run(batch)
+
+    def close(self) -> None:
+        """Sends the current batch and stops the flusher thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self.flush()
+        if self._flusher is not None:
+            self._flusher.join()
+
+    def __enter__(self) -> "MicroBatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _take(self) -> List[Tuple[Any, Future]]:
+        batch, self._pending = self._pending, []
+        self._deadline = None
+        return batch
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_on_deadline, name="micro-batch-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_on_deadline(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and (self._deadline is None or self.clock() < self._deadline):
+                    timeout = None if self._deadline is None else self._deadline - self.clock()
+                    self._condition.wait(timeout)
+                if self._closed:
+                    return
+                batch = self._take()
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[Any, Future]]) -> None:
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        with self._condition:
+            self.batches += 1
+        try:
+            if self.coalesce:
+                slots = {}
+                items = []
+                for item, _ in batch:
+                    if item not in slots:
+                        slots[item] = len(items)
+                        items.append(item)
+                positions = [slots[item] for item, _ in batch]
+            else:
+                items = [item for item, _ in batch]
+                positions = range(len(batch))
+            results = list(self.bulk_func(items))
+            if len(results) != len(items):
+                raise ValueError(f"{getattr(self.bulk_func, '__name__', 'bulk_func')} returned "
+                                 f"{len(results)} results for {len(items)} items")
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), position in zip(batch, positions):
+            future.set_result(results[position])
+
+
+def micro_batch(max_batch_size: int = 100, max_delay: float = 0.05, coalesce: bool = True):
+    """
+    Decorator that turns a bulk function into a per-item function returning futures.
+
+    Unlike throttle, calls arriving close together are merged instead of
+    dropped: each caller passes one item and gets a Future for its own result.
+
+    Args:
+        max_batch_size: Maximum number of items per bulk call
+        max_delay: Maximum seconds the first item of a batch waits for more items
+        coalesce: Send equal (hashable) items once per batch
+
+    Returns:
+        Decorator for a function taking a list of items and returning a list of results
+    """
+    def decorator(bulk_func):
+        batcher = MicroBatcher(bulk_func, max_batch_size, max_delay, coalesce)
+
+        @wraps(bulk_func)
+        def wrapper(item: Hashable) -> Future:
+            return batcher.submit(item)
+        wrapper.batcher = batcher
+        wrapper.flush = batcher.flush
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    @micro_batch(max_batch_size=10, max_delay=0.2)
+    def search_api(queries):
+        print(f"Searching for {len(queries)} queries in one call: {queries}")
+        time.sleep(0.1)  # Simulate one search round trip
+        return [f"Search results for: {query}" for query in queries]
+
+    futures = [search_api(query) for query in ["python", "javascript", "python", "react", "django"]]
+    for future in futures:
+        print(f"✓ {future.result()}")
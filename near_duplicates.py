@@ -0,0 +1,243 @@
+import random
+import re
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; signatures are then computed one record at a time
+    np = None
+
+# Mersenne prime 2**31 - 1 keeps a * x + b below 2**63, so NumPy uint64 math never wraps
+_PRIME = (1 << 31) - 1
+
+
+def _shingles(text: str, size: int) -> FrozenSet[int]:
+    """Hash the character shingles of normalized text to 31-bit integers."""
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    if len(text) <= size:
+        grams = [text]
+    else:
+        grams = [text[i:i + size] for i in range(len(text) - size + 1)]
+    return frozenset(zlib.crc32(gram.encode("utf-8")) % _PRIME for gram in grams)
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[List[int], List[int]]:
+    rng = random.Random(seed)
+    a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+    b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+    return a, b
+
+
+def _signatures_python(shingle_sets: Sequence[FrozenSet[int]], a: List[int], b: List[int]) -> List[Tuple[int, ...]]:
+    return [
+        tuple(min((ai * x + bi) % _PRIME for x in shingles) for ai, bi in zip(a, b))
+        for shingles in shingle_sets
+    ]
+
+
+def _signatures_numpy(shingle_sets: Sequence[FrozenSet[int]], a: List[int], b: List[int],
+                      batch_size: int) -> List[Tuple[int, ...]]:
+    a_col = np.array(a, dtype=np.uint64)[:, None]
+    b_col = np.array(b, dtype=np.uint64)[:, None]
+    signatures = []
+    for start in range(0, len(shingle_sets), batch_size):
+        batch = shingle_sets[start:start + batch_size]
+        lengths = np.fromiter((len(s) for s in batch), dtype=np.int64, count=len(batch))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        values = np.fromiter((x for s in batch for x in s), dtype=np.uint64, count=int(lengths.sum()))
+        # (num_perm, total_shingles) hash matrix, then a per-record column minimum
+        hashed = (a_col * values[None, :] + b_col) % _PRIME
+        minima = np.minimum.reduceat(hashed, offsets, axis=1)
+        signatures.extend(map(tuple, minima.T.tolist()))
+    return signatures
+
+
+def _signatures(shingle_sets: Sequence[FrozenSet[int]], num_perm: int, seed: int,
+                batch_size: int) -> List[Tuple[int, ...]]:
+    a, b = _permutations(num_perm, seed)
+    if np is None:
+        return _signatures_python(shingle_sets, a, b)
+    return _signatures_numpy(shingle_sets, a, b, batch_size)
+
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = 128, shingle_size: int = 3, seed: int = 1,
+                       batch_size: int = 1024) -> List[Tuple[int, ...]]:
+    """
+    Compute MinHash signatures for a sequence of texts.
+
+    Signatures are computed in vectorized batches with NumPy when it is
+    installed, and one text at a time otherwise; both give identical results.
+
+    Args:
+        texts: Texts to sign
+        num_perm: Number of hash permutations (signature length)
+        shingle_size: Length of the character shingles
+        seed: Seed for the permutation coefficients
+        batch_size: Number of texts hashed per vectorized batch
+
+    Returns:
+        One signature tuple per text
+    """
+    shingle_sets = [_shingles(text, shingle_size) for text in texts]
+    return _signatures(shingle_sets, num_perm, seed, batch_size)
+
+
+def _probability_integral(func, lower: float, upper: float, steps: int = 50) -> float:
+    width = (upper - lower) / steps
+    return sum(func(lower + (i + 0.5) * width) for i in range(steps)) * width
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose the LSH band count and rows per band for a Jaccard threshold.
+
+    Minimizes the combined probability of false positives below the threshold
+    and false negatives above it.
+
+    Args:
+        threshold: Target Jaccard similarity
+        num_perm: Signature length
+
+    Returns:
+        (bands, rows) with bands * rows <= num_perm
+    """
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = _probability_integral(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+            false_negative = _probability_integral(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+            error = false_positive + false_negative
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_near_duplicates(objects: List[Dict], fields: List[str], threshold: float = 0.5, num_perm: int = 128,
+                         shingle_size: int = 3, seed: int = 1, bands: Optional[int] = None,
+                         batch_size: int = 1024) -> List[List[int]]:
+    """
+    Find clusters of records whose text fields are near-duplicates.
+
+    The selected fields are joined into one text, split into character
+    shingles and signed with MinHash. Missing and None fields count as
+    empty, and records whose text is empty are never clustered. Banded LSH over the signatures puts
+    similar records in the same buckets. Within a bucket, each record is
+    checked against the bucket's first record only, using the exact Jaccard
+    similarity of their shingle sets, and linked records are joined into
+    clusters with union-find. This keeps the work linear in the bucket size,
+    even for large groups of identical records. Two records that are only
+    ever bucketed beside a dissimilar first record are not linked; with
+    several bands that is rare.
+
+    Args:
+        objects: List of dictionaries to compare
+        fields: Keys whose values make up each record's text
+        threshold: Minimum Jaccard similarity for two records to be linked
+        num_perm: Signature length
+        shingle_size: Length of the character shingles
+        seed: Seed for the MinHash permutations
+        bands: Number of LSH bands, from 1 to num_perm (chosen from
+            threshold when omitted)
+        batch_size: Number of records hashed per vectorized batch
+
+    Returns:
+        Clusters of two or more object indices, each sorted, ordered by first index
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be in (0, 1]")
+    if bands is not None and not 1 <= bands <= num_perm:
+        raise ValueError("bands must be between 1 and num_perm")
+
+    # Missing and None fields add no text; records left with no text at all
+    # have nothing to compare and never join a cluster
+    texts = [" ".join(str(value) for value in (obj.get(field) for field in fields) if value is not None)
+             for obj in objects]
+    indexed = [index for index, text in enumerate(texts) if text.strip()]
+    shingle_sets = [_shingles(texts[index], shingle_size) for index in indexed]
+    signatures = _signatures(shingle_sets, num_perm, seed, batch_size)
+
+    if bands is None:
+        bands, rows = optimal_bands(threshold, num_perm)
+    else:
+        rows = num_perm // bands
+
+    # Union-find runs over positions in indexed
+    parent = list(range(len(indexed)))
+    for band in range(bands):
+        buckets = defaultdict(list)
+        lo, hi = band * rows, (band + 1) * rows
+        for index, signature in enumerate(signatures):
+            buckets[signature[lo:hi]].append(index)
+        for representative, *members in buckets.values():
+            shingles_left = shingle_sets[representative]
+            for right in members:
+                root_left, root_right = _find(parent, representative), _find(parent, right)
+                if root_left == root_right:
+                    continue
+                shingles_right = shingle_sets[right]
+                similarity = len(shingles_left & shingles_right) / len(shingles_left | shingles_right)
+                if similarity >= threshold:
+                    parent[max(root_left, root_right)] = min(root_left, root_right)
+
+    clusters = defaultdict(list)
+    for position, index in enumerate(indexed):
+        clusters[_find(parent, position)].append(index)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def deduplicate_near_duplicates(objects: List[Dict], fields: List[str], threshold: float = 0.5,
+                                **options) -> List[Dict]:
+    """
+    Deduplicate objects whose text fields are near-duplicates, keeping the first of each cluster.
+
+    Args:
+        objects: List of dictionaries to deduplicate
+        fields: Keys whose values make up each record's text
+        threshold: Minimum Jaccard similarity for two records to be duplicates
+        **options: Signature and LSH options accepted by find_near_duplicates
+
+    Returns:
+        List of deduplicated objects
+    """
+    dropped = set()
+    for cluster in find_near_duplicates(objects, fields, threshold, **options):
+        dropped.update(cluster[1:])
+    return [obj for i, obj in enumerate(objects) if i not in dropped]
+
+
+def benchmark_near_duplicates(count: int = 20_000) -> None:
+    """
+    Time find_near_duplicates on a synthetic catalog with planted near-duplicates.
+
+    Args:
+        count: Number of catalog records
+    """
+    rng = random.Random(0)
+    words = ["laptop", "phone", "tablet", "charger", "cable", "case", "pro", "max", "mini", "ultra",
+             "wireless", "usb", "black", "white", "16gb", "32gb", "stand", "screen", "keyboard", "mouse"]
+    catalog = []
+    for i in range(count):
+        if catalog and rng.random() < 0.2:
+            base = rng.choice(catalog)["name"]
+            catalog.append({"name": base + " " + rng.choice(words)})
+        else:
+            catalog.append({"name": " ".join(rng.choice(words) for _ in range(5)) + f" {i}"})
+    start = time.perf_counter()
+    clusters = find_near_duplicates(catalog, ["name"], threshold=0.7)
+    elapsed = time.perf_counter() - start
+    print(f"{count:,} records -> {len(clusters):,} clusters in {elapsed:.2f}s "
+          f"(NumPy {'available' if np is not None else 'missing'})")
+
+
+if __name__ == "__main__":
+    benchmark_near_duplicates()
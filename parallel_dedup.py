@@ -0,0 +1,315 @@
+import gc
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from canonical_hash import canonical_digest, key_digest
+from deduplicate_objects import (
+    deduplicate_by_custom_function,
+    deduplicate_by_json_string,
+    deduplicate_by_key,
+    deduplicate_by_multiple_keys,
+    deduplicate_keep_latest,
+)
+from key_spec import MISSING, KeySpec, compile_key_spec, is_flat_key
+
+STRATEGIES = ("key", "multiple_keys", "custom_function", "json_string", "keep_latest")
+
+# Set in each forked worker by _share_objects; the parent never sets it
+_shared_objects: Optional[Sequence[Dict]] = None
+
+
+def _portable_shard(key: Any, num_shards: int) -> int:
+    # Without fork, workers hash strings with different seeds, so shard on a stable digest
+    digest = key if isinstance(key, bytes) else key_digest(key)
+    return int.from_bytes(digest[:8], "little") % num_shards
+
+
+def _map_records(records: Sequence[Dict], start: int, spec: Tuple, num_shards: int, portable: bool,
+                 workdir: str) -> None:
+    """
+    Extract the dedup key of every record, route (seq, key, timestamp)
+    entries to their shard and write each shard's entries to its own file
+    for the reducers to read. Entries within a shard stay in sequence order.
+    """
+    strategy, arg, timestamp_key = spec
+    keep_latest = strategy == "keep_latest"
+    # Compiled getters are closures and do not pickle, so each worker compiles its own
+    if strategy == "key" or keep_latest:
+        get_key = compile_key_spec(arg, default=MISSING)
+    elif strategy == "multiple_keys":
+        get_key = compile_key_spec(arg) if callable(arg) else compile_key_spec(list(arg))
+    elif strategy == "custom_function":
+        get_key = arg
+    else:
+        get_key = canonical_digest
+    get_timestamp = compile_key_spec(timestamp_key, default=0)
+    flat = strategy in ("key", "keep_latest") and is_flat_key(arg) and is_flat_key(timestamp_key)
+
+    seqs = [array("q") for _ in range(num_shards)]
+    keys = [[] for _ in range(num_shards)]
+    timestamps = [[] for _ in range(num_shards)]
+    for seq, obj in enumerate(records, start):
+        if flat:
+            if arg not in obj:
+                continue
+            key = obj[arg]
+        else:
+            key = get_key(obj)
+            if key is MISSING:
+                continue
+        # Forked workers share the parent's hash seed, so the built-in hash is consistent
+        shard = _portable_shard(key, num_shards) if portable else hash(key) % num_shards
+        seqs[shard].append(seq)
+        keys[shard].append(key)
+        if keep_latest:
+            timestamps[shard].append(obj.get(timestamp_key, 0) if flat else get_timestamp(obj))
+
+    for shard in range(num_shards):
+        with open(_shard_path(workdir, start, shard), "wb") as spill:
+            pickle.dump((seqs[shard], keys[shard], timestamps[shard]), spill, pickle.HIGHEST_PROTOCOL)
+
+
+def _share_objects(objects: Sequence[Dict]) -> None:
+    # Pool initializer; under fork its arguments are inherited, not pickled
+    global _shared_objects
+    _shared_objects = objects
+
+
+def _map_shared_range(start: int, end: int, spec: Tuple, num_shards: int, portable: bool, workdir: str) -> None:
+    _map_records(_shared_objects[start:end], start, spec, num_shards, portable, workdir)
+
+
+def _shard_path(workdir: str, start: int, shard: int) -> str:
+    return os.path.join(workdir, f"{start}-{shard}")
+
+
+def _reduce_shard(paths: List[str], keep_latest: bool) -> Tuple[array, Optional[array]]:
+    """
+    Deduplicate one shard from the files the map tasks wrote for it, in chunk order.
+
+    Returns:
+        first_seq of every key in ascending order, and for keep_latest the
+        seq of the record to keep for each of them (None otherwise, as the
+        first occurrence is kept)
+    """
+    if not keep_latest:
+        seen = set()
+        kept = array("q")
+        for path in paths:
+            with open(path, "rb") as spill:
+                seqs, keys, _ = pickle.load(spill)
+            for seq, key in zip(seqs, keys):
+                if key not in seen:
+                    seen.add(key)
+                    kept.append(seq)
+        return kept, None
+
+    # key -> [first_seq, chosen_seq, timestamp]
+    latest = {}
+    for path in paths:
+        with open(path, "rb") as spill:
+            seqs, keys, timestamps = pickle.load(spill)
+        for seq, key, timestamp in zip(seqs, keys, timestamps):
+            entry = latest.get(key)
+            if entry is None:
+                latest[key] = [seq, seq, timestamp]
+            elif timestamp > entry[2]:
+                entry[1] = seq
+                entry[2] = timestamp
+    entries = latest.values()
+    return array("q", [entry[0] for entry in entries]), array("q", [entry[1] for entry in entries])
+
+
+def _build_spec(strategy: str, key: Optional[str], keys: Optional[List[str]],
+                key_func: Optional[Callable[[Dict], Any]], timestamp_key: str) -> Tuple:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    if strategy in ("key", "keep_latest"):
+        if key is None:
+            raise ValueError(f"Strategy {strategy!r} requires key")
+        return (strategy, key, timestamp_key)
+    if strategy == "multiple_keys":
+        if keys is None:
+            raise ValueError("Strategy 'multiple_keys' requires keys")
+        return (strategy, list(keys), timestamp_key)
+    if strategy == "custom_function":
+        if key_func is None:
+            raise ValueError("Strategy 'custom_function' requires key_func")
+        return (strategy, key_func, timestamp_key)
+    return (strategy, None, timestamp_key)
+
+
+def parallel_deduplicate(objects: Sequence[Dict], strategy: str = "key", key: Optional[KeySpec] = None,
+                         keys: Optional[List[str]] = None, key_func: Optional[Callable[[Dict], Any]] = None,
+                         timestamp_key: str = "timestamp", max_workers: Optional[int] = None,
+                         chunk_size: Optional[int] = None, temp_dir: Optional[str] = None) -> List[Dict]:
+    """
+    Deduplicate objects across multiple processes.
+
+    Map tasks extract keys from contiguous chunks, hash-partition them into
+    one shard per worker and write each shard to a spill file; each reducer
+    reads its shard's files directly and deduplicates it, returning only the
+    sequence numbers to keep. The parent never handles keys, so its serial
+    share is limited to scheduling and gathering the kept records. The result
+    is identical to the matching single-core function, which is what runs
+    when there is a single worker.
+
+    Workers use the default multiprocessing start method. Under fork they
+    read the records inherited from the parent; otherwise each map task is
+    sent its chunk. Scaling is well short of linear: every key is still
+    extracted in Python, pickled to a spill file and hashed again by its
+    reducer, and the parent gathers the result alone. On 1M keep_latest
+    records benchmark_parallel_dedup projects about 1.2x at 4 workers and
+    1.5x at 8, so this pays off only for large inputs with expensive keys.
+
+    Args:
+        objects: List of dictionaries to deduplicate
+        strategy: One of "key", "multiple_keys", "custom_function",
+            "json_string" or "keep_latest"
+        key: Key (or dotted path) for the "key" and "keep_latest" strategies
+        keys: Keys (or dotted paths) for the "multiple_keys" strategy
+        key_func: Picklable (module-level) function for "custom_function";
+            without the fork start method its keys must be supported by
+            canonical_digest
+        timestamp_key: Timestamp key for the "keep_latest" strategy
+        max_workers: Number of worker processes (defaults to the CPU count);
+            1 runs the single-core function in the calling process
+        chunk_size: Records per map task (defaults to one chunk per worker)
+        temp_dir: Directory for the shard spill files (defaults to the
+            system temp dir); they hold every key once
+
+    Returns:
+        List of deduplicated objects
+    """
+    spec = _build_spec(strategy, key, keys, key_func, timestamp_key)
+    keep_latest = strategy == "keep_latest"
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(objects) // max_workers))
+    if max_workers == 1 or len(objects) <= chunk_size:
+        return _deduplicate_serial(objects, spec)
+
+    num_shards = max_workers
+    ranges = [(start, min(start + chunk_size, len(objects))) for start in range(0, len(objects), chunk_size)]
+    context = multiprocessing.get_context()
+    use_fork = context.get_start_method() == "fork"
+    portable = not use_fork
+    frozen_before = gc.get_freeze_count()
+    if use_fork:
+        # Move the records out of the collector's view: otherwise every full
+        # collection in a worker walks them all and dirties their pages
+        gc.freeze()
+    try:
+        with tempfile.TemporaryDirectory(dir=temp_dir) as workdir, \
+                ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                    initializer=_share_objects if use_fork else None,
+                                    initargs=(objects,) if use_fork else ()) as pool:
+            if use_fork:
+                futures = [pool.submit(_map_shared_range, start, end, spec, num_shards, portable, workdir)
+                           for start, end in ranges]
+            else:
+                futures = [pool.submit(_map_records, objects[start:end], start, spec, num_shards, portable, workdir)
+                           for start, end in ranges]
+            for future in futures:
+                future.result()
+            shard_paths = [[_shard_path(workdir, start, shard) for start, _ in ranges] for shard in range(num_shards)]
+            reduced = list(pool.map(_reduce_shard, shard_paths, [keep_latest] * num_shards))
+    finally:
+        # Leave alone anything the application froze itself, e.g. before preforking
+        if use_fork and frozen_before == 0:
+            gc.unfreeze()
+    return _gather(objects, reduced)
+
+
+def _deduplicate_serial(objects: Sequence[Dict], spec: Tuple) -> List[Dict]:
+    strategy, arg, timestamp_key = spec
+    if strategy == "key":
+        return deduplicate_by_key(objects, arg)
+    if strategy == "keep_latest":
+        return deduplicate_keep_latest(objects, arg, timestamp_key)
+    if strategy == "multiple_keys":
+        return deduplicate_by_multiple_keys(objects, arg)
+    if strategy == "custom_function":
+        return deduplicate_by_custom_function(objects, arg)
+    return deduplicate_by_json_string(objects)
+
+
+def _gather(objects: Sequence[Dict], reduced: List[Tuple[array, Optional[array]]]) -> List[Dict]:
+    firsts = array("q")
+    for shard_firsts, _ in reduced:
+        firsts.extend(shard_firsts)
+    if reduced[0][1] is None:
+        # Each shard is already sorted, so this merges runs
+        return [objects[seq] for seq in sorted(firsts)]
+    chosen = array("q")
+    for _, shard_chosen in reduced:
+        chosen.extend(shard_chosen)
+    order = sorted(range(len(firsts)), key=firsts.__getitem__)
+    return [objects[chosen[i]] for i in order]
+
+
+def _noop() -> None:
+    pass
+
+
+def benchmark_parallel_dedup(count: int = 1_000_000, worker_counts: Sequence[int] = (2, 4, 8)) -> None:
+    """
+    Time parallel_deduplicate against the single-core function.
+
+    Besides the wall time on this machine, each phase is timed on its own
+    (pool start-up, every map task, every reduce task and the gather in the
+    parent) to project the wall time on a machine with one core per worker:
+    start-up + slowest map + slowest reduce + gather. On a host with fewer
+    cores than workers only the projection shows the attainable speedup.
+
+    Args:
+        count: Number of records to deduplicate
+        worker_counts: Worker counts to compare
+    """
+    objects = [{"order_id": i, "user_id": f"u{i % (count // 4)}", "timestamp": i % 997} for i in range(count)]
+    spec = _build_spec("keep_latest", "user_id", None, None, "timestamp")
+
+    def timed(func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+    expected, serial = timed(deduplicate_keep_latest, objects, "user_id", "timestamp")
+    print(f"Deduplicating {count:,} records (keep_latest) on {os.cpu_count()} CPUs")
+    print(f"single-core deduplicate_keep_latest: {serial:.2f}s")
+    print(f"{'workers':>7} {'wall':>7} {'start-up':>9} {'map':>7} {'reduce':>7} {'gather':>7} "
+          f"{'projected':>10} {'speedup':>8}")
+    for workers in worker_counts:
+        result, wall = timed(parallel_deduplicate, objects, "keep_latest", "user_id", None, None, "timestamp",
+                             workers)
+        assert result == expected
+
+        def start_pool():
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context()) as pool:
+                for future in [pool.submit(_noop) for _ in range(workers)]:
+                    future.result()
+        _, startup = timed(start_pool)
+
+        chunk_size = -(-count // workers)
+        ranges = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+        with tempfile.TemporaryDirectory() as workdir:
+            maps = [timed(_map_records, objects[start:end], start, spec, workers, False, workdir)[1]
+                    for start, end in ranges]
+            reductions = [timed(_reduce_shard, [_shard_path(workdir, start, shard) for start, _ in ranges], True)
+                          for shard in range(workers)]
+        _, gather = timed(_gather, objects, [reduced for reduced, _ in reductions])
+        projected = startup + max(maps) + max(elapsed for _, elapsed in reductions) + gather
+        print(f"{workers:>7} {wall:>6.2f}s {startup:>8.2f}s {max(maps):>6.2f}s "
+              f"{max(elapsed for _, elapsed in reductions):>6.2f}s {gather:>6.2f}s {projected:>9.2f}s "
+              f"{serial / projected:>7.1f}x")
+    print("(map and reduce show the slowest task; projected assumes one core per worker)")
+
+
+if __name__ == "__main__":
+    benchmark_parallel_dedup()
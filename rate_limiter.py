@@ -0,0 +1,321 @@
+import math
+import sys
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from limiter_metrics import REGISTRY, default_name
+
+# Slack for float rounding, so a caller woken exactly when its tokens are due
+# is not sent back to sleep for a vanishingly small interval
+_EPSILON = 1e-9
+
+
+class RateLimiter:
+    """
+    Base class for rate limiters.
+
+    Subclasses implement _try_acquire, which either takes the tokens and
+    returns 0 or returns how many seconds to wait before trying again. Time
+    comes from a monotonic clock so wall-clock adjustments cannot open or
+    close the limiter; clock and sleep can be replaced for testing.
+
+    Limiters are thread-safe. The lock is held only while the state is
+    updated, never while a caller sleeps.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tokens: float, now: float) -> float:
+        raise NotImplementedError
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes tokens if they are available right now, without waiting.
+
+        Args:
+            tokens: Number of tokens (calls) to take
+
+        Returns:
+            True if the tokens were taken
+        """
+        with self._lock:
+            return self._try_acquire(tokens, self.clock()) == 0
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Takes tokens, waiting until they become available.
+
+        Args:
+            tokens: Number of tokens (calls) to take
+            timeout: Maximum number of seconds to wait; None waits indefinitely
+
+        Returns:
+            True if the tokens were taken, False if they could not be taken before the timeout
+        """
+        deadline = None
+        while True:
+            with self._lock:
+                now = self.clock()
+                wait = self._try_acquire(tokens, now)
+            if wait == 0:
+                return True
+            if deadline is None and timeout is not None:
+                deadline = now + timeout
+            # Give up at once instead of sleeping past the deadline
+            if deadline is not None and now + wait > deadline:
+                return False
+            self.sleep(wait)
+
+
+class TokenBucket(RateLimiter):
+    """
+    Allows a sustained rate of calls with bursts of up to ``burst`` calls.
+
+    The bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+    second; each call takes one token.
+    """
+    def __init__(self, rate: float, burst: float = 1, **options):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity; the bucket starts full
+            **options: clock and sleep overrides accepted by RateLimiter
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        super().__init__(**options)
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = self.clock()
+
+    def _try_acquire(self, tokens: float, now: float) -> float:
+        if tokens > self.burst:
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket of {self.burst}")
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens + _EPSILON >= tokens:
+            self._tokens = max(0.0, self._tokens - tokens)
+            return 0
+        return (tokens - self._tokens) / self.rate
+
+    @property
+    def available(self) -> float:
+        """Tokens that could be taken right now."""
+        with self._lock:
+            return min(self.burst, self._tokens + (self.clock() - self._updated) * self.rate)
+
+
+class SlidingWindowLog(RateLimiter):
+    """
+    Allows at most ``limit`` calls in any ``window`` seconds.
+
+    Exact: the timestamp of every call in the current window is kept, so
+    memory grows with ``limit``. Fractional costs are rounded up to whole
+    calls.
+    """
+    def __init__(self, limit: int, window: float, **options):
+        """
+        Args:
+            limit: Maximum number of calls per window
+            window: Window length in seconds
+            **options: clock and sleep overrides accepted by RateLimiter
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        super().__init__(**options)
+        self.limit = limit
+        self.window = window
+        self._log = deque()
+
+    def _try_acquire(self, tokens: float, now: float) -> float:
+        # One timestamp per call, so a cost of 0.5 takes a whole slot rather than none
+        tokens = math.ceil(tokens)
+        if tokens > self.limit:
+            raise ValueError(f"Cannot take {tokens} tokens from a window of {self.limit}")
+        log = self._log
+        while log and log[0] <= now - self.window:
+            log.popleft()
+        if len(log) + tokens <= self.limit:
+            log.extend([now] * tokens)
+            return 0
+        # Wait until enough of the oldest calls have left the window
+        return log[len(log) + tokens - self.limit - 1] + self.window - now
+
+
+class SlidingWindowCounter(RateLimiter):
+    """
+    Approximately allows at most ``limit`` calls in any ``window`` seconds
+    using two counters.
+
+    The count for the sliding window is estimated from the current fixed
+    window's count plus the previous window's count weighted by how much of
+    it still overlaps the sliding window. Memory is constant.
+    """
+    def __init__(self, limit: int, window: float, **options):
+        """
+        Args:
+            limit: Maximum number of calls per window
+            window: Window length in seconds
+            **options: clock and sleep overrides accepted by RateLimiter
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        super().__init__(**options)
+        self.limit = limit
+        self.window = window
+        self._window_start = self.clock()
+        self._previous = 0
+        self._current = 0
+
+    def _try_acquire(self, tokens: float, now: float) -> float:
+        if tokens > self.limit:
+            raise ValueError(f"Cannot take {tokens} tokens from a window of {self.limit}")
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            windows = int(elapsed // self.window)
+            self._previous = self._current if windows == 1 else 0
+            self._current = 0
+            self._window_start += windows * self.window
+            elapsed = now - self._window_start
+
+        weight = 1 - elapsed / self.window
+        if self._previous * weight + self._current + tokens <= self.limit + _EPSILON:
+            self._current += tokens
+            return 0
+        room = self.limit - self._current - tokens
+        if room >= 0 and self._previous:
+            # The previous window's share decays linearly to zero
+            return max(self.window * (1 - room / self._previous) - elapsed, _EPSILON)
+        return self.window - elapsed
+
+
+def rate_limit(limiter: RateLimiter, blocking: bool = True, timeout: Optional[float] = None,
+               name: Optional[str] = None):
+    """
+    Rate-limit decorator with the same shape as throttle.
+
+    Unlike throttle, calls over the limit can wait for capacity instead of
+    being dropped. Allowed, throttled and queued calls and their wait times
+    are recorded in limiter_metrics.REGISTRY.
+
+    Args:
+        limiter: Limiter shared by every call of the decorated function
+        blocking: Wait for a token; otherwise calls over the limit return None
+        timeout: Maximum seconds a blocking call waits before returning None
+        name: Name the metrics are reported under; defaults to the function's module and qualified name
+
+    Returns:
+        Decorator for the function to limit
+    """
+    def decorator(func):
+        gauge = (lambda: limiter.available) if hasattr(type(limiter), "available") else None
+        metrics = REGISTRY.limiter(name or default_name(func), gauge)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if limiter.try_acquire():
+                metrics.allowed()
+            elif not blocking:
+                metrics.throttled()
+                return None
+            else:
+                start = limiter.clock()
+                acquired = limiter.acquire(timeout=timeout)
+                metrics.waited(limiter.clock() - start, acquired)
+                if not acquired:
+                    return None
+            return func(*args, **kwargs)
+        wrapper.limiter = limiter
+        wrapper.metrics = metrics
+        return wrapper
+    return decorator
+
+
+def _hammer(limiter_call: Callable[[], bool], threads: int, duration: float) -> Tuple[int, int, float]:
+    """Calls limiter_call from many threads for duration seconds; returns (calls, admitted, elapsed)."""
+    barrier = threading.Barrier(threads + 1)
+    counts = [[0, 0] for _ in range(threads)]
+
+    def worker(count):
+        barrier.wait()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            count[0] += 1
+            if limiter_call():
+                count[1] += 1
+
+    workers = [threading.Thread(target=worker, args=(count,)) for count in counts]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.monotonic()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - start
+    return sum(c[0] for c in counts), sum(c[1] for c in counts), elapsed
+
+
+def benchmark_thread_scaling(thread_counts=(1, 2, 4, 8, 16, 32, 64), duration: float = 0.5) -> None:
+    """
+    Stress the limiters and throttles from a growing number of threads.
+
+    Reports acquisitions per second on an uncontended bucket (pure locking
+    overhead), and checks that a tight bucket and the throttle decorators
+    never admit more calls than their limits allow.
+
+    Args:
+        thread_counts: Thread counts to run
+        duration: Seconds each run lasts
+    """
+    from throttle_example import ThrottleFunction, throttle
+
+    print(f"{'threads':>7} {'acquire/s':>12} {'bucket':>14} {'throttle':>10} {'class':>10}")
+    print("-" * 60)
+    for threads in thread_counts:
+        open_bucket = TokenBucket(rate=1e12, burst=1e12)
+        calls, _, elapsed = _hammer(open_bucket.try_acquire, threads, duration)
+
+        tight = TokenBucket(rate=200.0, burst=20)
+        _, admitted, elapsed_tight = _hammer(tight.try_acquire, threads, duration)
+        bucket_limit = 20 + 200.0 * elapsed_tight + 1
+
+        delay = 0.05
+        throttled = throttle(delay, name=f"benchmark.throttle.{threads}")(lambda: True)
+        class_throttled = ThrottleFunction(lambda: True, delay, name=f"benchmark.class_throttle.{threads}")
+        _, passed, elapsed_throttle = _hammer(lambda: throttled() is not None, threads, duration)
+        _, class_passed, elapsed_class = _hammer(lambda: class_throttled() is not None, threads, duration)
+
+        def verdict(count, limit):
+            return f"{count}{'' if count <= limit else '!'}"
+
+        print(f"{threads:>7} {calls / elapsed:>12,.0f} {verdict(admitted, bucket_limit):>14} "
+              f"{verdict(passed, elapsed_throttle / delay + 1):>10} "
+              f"{verdict(class_passed, elapsed_class / delay + 1):>10}")
+    print("(counts marked ! exceeded their limit)")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_thread_scaling()
+        sys.exit()
+
+    @rate_limit(TokenBucket(rate=5.0, burst=3))
+    def api_call(endpoint):
+        return f"Response from {endpoint}"
+
+    start = time.monotonic()
+    for i in range(10):
+        print(f"{time.monotonic() - start:5.2f}s  {api_call(f'/api/users/{i}')}")
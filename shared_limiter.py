@@ -0,0 +1,198 @@
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from rate_limiter import RateLimiter
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; SharedTokenBucket then cannot be created
+    fcntl = None
+
+# Slack for float rounding in the token count, as in rate_limiter
+_EPSILON = 1e-9
+
+_MAGIC = b"TOKBKT01"
+# magic, rate, burst, tokens, updated
+_LAYOUT = struct.Struct("<8sdddd")
+_STATE = struct.Struct("<dd")
+_STATE_OFFSET = 8 + 2 * 8
+
+# Open buckets, given a file description of their own in every forked child
+_open_buckets = weakref.WeakSet()
+
+
+def _reopen_after_fork() -> None:
+    for bucket in list(_open_buckets):
+        bucket._reopen()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reopen_after_fork)
+
+
+class SharedTokenBucket(RateLimiter):
+    """
+    A token bucket shared by every process on a host that opens the same file.
+
+    The bucket state lives in a small memory-mapped file, so separate
+    worker processes draw from one global budget instead of one each. Updates
+    happen under an exclusive flock on the file. The kernel drops that lock
+    when its holder exits, so a worker that crashes mid-update cannot wedge
+    the others. flock belongs to the open file description, which a fork
+    shares with the child, so a bucket opened before forking (e.g. in a
+    preloading server) reopens its file in every child to keep the lock
+    exclusive. Timestamps come from time.monotonic, which all processes on a
+    host share. A file put on a RAM-backed path such as /dev/shm never touches
+    the disk.
+    """
+    def __init__(self, path: str, rate: float, burst: float = 1, **options):
+        """
+        Opens the shared bucket, creating it full if the file does not exist yet.
+
+        Args:
+            path: File holding the bucket state
+            rate: Tokens added per second, for all processes together
+            burst: Bucket capacity
+            **options: clock and sleep overrides accepted by RateLimiter
+
+        Raises:
+            ValueError: If the file holds a bucket with a different rate or burst
+        """
+        if fcntl is None:
+            raise RuntimeError("SharedTokenBucket needs fcntl.flock, which this platform lacks")
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        super().__init__(**options)
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._locked():
+                if os.fstat(self._fd).st_size < _LAYOUT.size:
+                    os.ftruncate(self._fd, _LAYOUT.size)
+                    os.pwrite(self._fd, _LAYOUT.pack(_MAGIC, rate, burst, burst, self.clock()), 0)
+                magic, stored_rate, stored_burst, _, _ = _LAYOUT.unpack(os.pread(self._fd, _LAYOUT.size, 0))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} does not hold a shared token bucket")
+            if (stored_rate, stored_burst) != (rate, burst):
+                raise ValueError(f"{path} holds a bucket with rate={stored_rate}, burst={stored_burst}")
+            self._map = mmap.mmap(self._fd, _LAYOUT.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        _open_buckets.add(self)
+
+    def close(self) -> None:
+        _open_buckets.discard(self)
+        self._map.close()
+        os.close(self._fd)
+
+    def _reopen(self) -> None:
+        # Runs in a forked child. The shared mapping stays valid, but the
+        # inherited descriptor shares its flock with the parent. Reopening
+        # through /proc also works if the file was unlinked meanwhile.
+        inherited = self._fd
+        proc_path = f"/proc/self/fd/{inherited}"
+        self._fd = os.open(proc_path if os.path.exists(proc_path) else self.path, os.O_RDWR)
+        os.close(inherited)
+        # Another thread may have held the lock when the parent forked
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SharedTokenBucket":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _try_acquire(self, tokens: float, now: float) -> float:
+        if tokens > self.burst:
+            raise ValueError(f"Cannot take {tokens} tokens from a bucket of {self.burst}")
+        with self._locked():
+            # Read the clock under the file lock: a time taken before waiting for
+            # it could be older than another process's update
+            now = self.clock()
+            stored_tokens, updated = _STATE.unpack_from(self._map, _STATE_OFFSET)
+            if not math.isfinite(stored_tokens) or updated > now:
+                # Left over from before a reboot (monotonic time restarted) or corrupted: start full
+                stored_tokens, updated = self.burst, now
+            available = min(self.burst, max(0.0, stored_tokens) + (now - updated) * self.rate)
+            if available + _EPSILON >= tokens:
+                _STATE.pack_into(self._map, _STATE_OFFSET, max(0.0, available - tokens), now)
+                return 0
+            _STATE.pack_into(self._map, _STATE_OFFSET, available, now)
+            return (tokens - available) / self.rate
+
+
+def _hammer_shared(path: str, rate: float, burst: float, duration: float, results) -> None:
+    limiter = SharedTokenBucket(path, rate, burst)
+    calls = admitted = 0
+    start = time.monotonic()
+    deadline = start + duration
+    while time.monotonic() < deadline:
+        calls += 1
+        admitted += limiter.try_acquire()
+    results.put((calls, admitted, start, time.monotonic()))
+    limiter.close()
+
+
+def benchmark_shared_limiter(processes: int = 16, duration: float = 1.0, rate: float = 1000.0,
+                             burst: float = 100) -> None:
+    """
+    Measure acquire latency and check the global budget across processes.
+
+    Args:
+        processes: Number of worker processes sharing the bucket
+        duration: Seconds each worker runs
+        rate: Shared rate in tokens per second
+        burst: Shared bucket capacity
+    """
+    with tempfile.TemporaryDirectory(dir="/dev/shm" if os.path.isdir("/dev/shm") else None) as workdir:
+        path = os.path.join(workdir, "bucket")
+        with SharedTokenBucket(path, rate=1e12, burst=1e12) as limiter:
+            count = 200_000
+            start = time.perf_counter()
+            for _ in range(count):
+                limiter.try_acquire()
+            latency = (time.perf_counter() - start) / count
+        print(f"try_acquire latency, one process: {latency * 1e6:.2f} us")
+
+        path = os.path.join(workdir, "shared")
+        SharedTokenBucket(path, rate, burst).close()
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=_hammer_shared, args=(path, rate, burst, duration, results))
+                   for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    calls = sum(outcome[0] for outcome in outcomes)
+    admitted = sum(outcome[1] for outcome in outcomes)
+    elapsed = max(outcome[3] for outcome in outcomes) - min(outcome[2] for outcome in outcomes)
+    limit = burst + rate * elapsed
+    print(f"{processes} processes, {elapsed:.2f}s: {calls:,} calls ({calls / elapsed / processes:,.0f}/s per process), "
+          f"{admitted:,} admitted (limit {limit:,.0f})")
+
+
+if __name__ == "__main__":
+    benchmark_shared_limiter()
@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import threading
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlightError(Exception):
+    """
+    Raised in callers that shared a call which failed; the call's own
+    exception is the __cause__. Only the caller that ran the call gets the
+    original exception.
+    """
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Shares one execution among concurrent threads making the same call.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is running wait for it and receive the same result, or a
+    SingleFlightError raised from the same exception. The key is forgotten
+    as soon as the call finishes, so later callers run the function again:
+    this collapses concurrent duplicates and is not a cache.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def in_flight(self, key: Hashable) -> int:
+        """
+        Returns:
+            Number of callers sharing the running call for key (0 if none is running)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            return 0 if call is None else call.followers + 1
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Runs func unless a call for key is already running, and returns its result.
+
+        Args:
+            key: Identifies calls that may share one execution
+            func: Function to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            SingleFlightError: If the call failed and another caller ran it
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                # A fresh exception per caller: re-raising the shared one
+                # would have every thread append to its one __traceback__
+                raise SingleFlightError(f"shared call for {key!r} failed") from call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    Shares one execution among concurrent coroutines making the same call.
+
+    The shared call runs as its own task, so a caller that is cancelled
+    stops waiting without cancelling the call for everyone else. Failures
+    are reported as in SingleFlight.
+    """
+    def __init__(self):
+        # key -> [task, number of callers sharing it]
+        self._calls: Dict[Hashable, list] = {}
+
+    def in_flight(self, key: Hashable) -> int:
+        """
+        Returns:
+            Number of callers sharing the running call for key (0 if none is running)
+        """
+        call = self._calls.get(key)
+        return 0 if call is None else call[1]
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """
+        Awaits func unless a call for key is already running, and returns its result.
+
+        Args:
+            key: Identifies calls that may share one execution
+            func: Coroutine function to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            SingleFlightError: If the call failed and another caller started it
+        """
+        call = self._calls.get(key)
+        leader = call is None
+        if leader:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        call[1] += 1
+        try:
+            return await asyncio.shield(call[0])
+        except Exception as exc:
+            if leader:
+                raise
+            raise SingleFlightError(f"shared call for {key!r} failed") from exc
+
+
+def _call_key(*args, **kwargs) -> Hashable:
+    return (args, frozenset(kwargs.items())) if kwargs else args
+
+
+def single_flight(key_func: Optional[Callable[..., Hashable]] = None):
+    """
+    Decorator that collapses concurrent identical calls into one execution.
+
+    Works on plain and async def functions. Applied on top of a throttle
+    decorator, only the one shared execution passes through the throttle:
+
+        @single_flight()
+        @throttle(3.0)
+        def user_profile_api(user_id): ...
+
+    Args:
+        key_func: Function that takes the call's arguments and returns its key;
+            defaults to the (hashable) arguments themselves
+
+    Returns:
+        Decorator for the function to share
+    """
+    key_func = key_func or _call_key
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            flight = AsyncSingleFlight()
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.do(key_func(*args, **kwargs), func, *args, **kwargs)
+            async_wrapper.flight = flight
+            return async_wrapper
+
+        flight = SingleFlight()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return flight.do(key_func(*args, **kwargs), func, *args, **kwargs)
+        wrapper.flight = flight
+        return wrapper
+    return decorator
@@ -0,0 +1,301 @@
+import heapq
+import json
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from canonical_hash import canonical_digest
+from key_spec import MISSING, KeySpec, compile_key_spec, is_flat_key
+
+Source = Union[Iterable[Dict], str, os.PathLike]
+
+
+def iter_jsonl(path: Union[str, os.PathLike]) -> Iterator[Dict]:
+    """
+    Lazily read objects from a JSONL file, one object per non-blank line.
+
+    Args:
+        path: Path to the JSONL file
+
+    Returns:
+        Iterator over the decoded objects
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _iter_source(source: Source) -> Iterator[Dict]:
+    if isinstance(source, (str, os.PathLike)):
+        return iter_jsonl(source)
+    return iter(source)
+
+
+def _dump(f, item) -> None:
+    pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_all(f) -> Iterator[Any]:
+    f.seek(0)
+    while True:
+        try:
+            yield pickle.load(f)
+        except EOFError:
+            return
+
+
+class _SpillFiles:
+    """A set of temp files, one per hash partition."""
+
+    def __init__(self, workdir: str, prefix: str, count: int):
+        self.files = [
+            open(os.path.join(workdir, f"{prefix}-{i}"), "w+b") for i in range(count)
+        ]
+
+    def write(self, partition: int, item) -> None:
+        _dump(self.files[partition], item)
+
+    def close(self) -> None:
+        for f in self.files:
+            f.close()
+
+
+def _merge_by_sequence(outputs: _SpillFiles) -> Iterator[Dict]:
+    # Each output partition is already in sequence order, so a k-way merge
+    # restores the global first-occurrence order.
+    for _, record in heapq.merge(*(_load_all(f) for f in outputs.files), key=lambda item: item[0]):
+        yield record
+
+
+def _external_unique(records: Iterator[Dict], key_func: Callable[[Dict], Any], emitted: set,
+                     num_partitions: int, temp_dir: Optional[str]) -> Iterator[Dict]:
+    """
+    Continue a first-occurrence dedup on disk once the in-memory seen set is full.
+
+    Keys already emitted and the remaining records are hash-partitioned into temp
+    files; each partition is then deduplicated on its own, so only one partition's
+    keys are held in memory at a time.
+    """
+    with tempfile.TemporaryDirectory(dir=temp_dir) as workdir:
+        key_files = _SpillFiles(workdir, "keys", num_partitions)
+        record_files = _SpillFiles(workdir, "records", num_partitions)
+        outputs = _SpillFiles(workdir, "unique", num_partitions)
+        try:
+            for key in emitted:
+                key_files.write(hash(key) % num_partitions, key)
+            emitted.clear()
+
+            for seq, record in enumerate(records):
+                key = key_func(record)
+                if key is MISSING:
+                    continue
+                record_files.write(hash(key) % num_partitions, (seq, key, record))
+
+            for i in range(num_partitions):
+                seen = set(_load_all(key_files.files[i]))
+                for seq, key, record in _load_all(record_files.files[i]):
+                    if key not in seen:
+                        seen.add(key)
+                        outputs.write(i, (seq, record))
+                key_files.files[i].truncate(0)
+                record_files.files[i].truncate(0)
+
+            yield from _merge_by_sequence(outputs)
+        finally:
+            key_files.close()
+            record_files.close()
+            outputs.close()
+
+
+def stream_deduplicate(source: Source, key_func: Callable[[Dict], Any],
+                       max_keys_in_memory: int = 1_000_000, num_partitions: int = 64,
+                       temp_dir: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Lazily yield the first occurrence of each key from an iterable or JSONL file.
+
+    Records are yielded as soon as they are seen while the seen set is below
+    ``max_keys_in_memory``. Past that point the remaining input is spilled to
+    hash-partitioned temp files and finished partition by partition, so memory
+    stays bounded and the output still matches the in-memory functions exactly.
+
+    Args:
+        source: Iterable of dictionaries or a path to a JSONL file
+        key_func: Function that returns the dedup key for a record, or
+            key_spec.MISSING to skip the record
+        max_keys_in_memory: Number of keys held in memory before spilling to disk
+        num_partitions: Number of hash partitions used once spilling starts
+        temp_dir: Directory for spill files (defaults to the system temp dir)
+
+    Returns:
+        Iterator of deduplicated objects in first-occurrence order
+    """
+    if max_keys_in_memory < 1:
+        raise ValueError("max_keys_in_memory must be at least 1")
+    if num_partitions < 1:
+        raise ValueError("num_partitions must be at least 1")
+
+    records = _iter_source(source)
+    seen = set()
+    for record in records:
+        key = key_func(record)
+        if key is MISSING or key in seen:
+            continue
+        seen.add(key)
+        yield record
+        if len(seen) >= max_keys_in_memory:
+            break
+    else:
+        return
+
+    yield from _external_unique(records, key_func, seen, num_partitions, temp_dir)
+
+
+def stream_deduplicate_by_key(source: Source, key: KeySpec, **options) -> Iterator[Dict]:
+    """
+    Streaming version of deduplicate_by_key; objects missing the key are skipped.
+
+    Args:
+        source: Iterable of dictionaries or a path to a JSONL file
+        key: The key to use for deduplication (dotted paths and compiled key specs work too)
+        **options: Memory and spill options accepted by stream_deduplicate
+
+    Returns:
+        Iterator of deduplicated objects
+    """
+    return stream_deduplicate(source, compile_key_spec(key, default=MISSING), **options)
+
+
+def stream_deduplicate_by_multiple_keys(source: Source, keys: KeySpec, **options) -> Iterator[Dict]:
+    """
+    Streaming version of deduplicate_by_multiple_keys.
+
+    Args:
+        source: Iterable of dictionaries or a path to a JSONL file
+        keys: List of keys (or dotted paths) to use for deduplication, or a compiled key spec
+        **options: Memory and spill options accepted by stream_deduplicate
+
+    Returns:
+        Iterator of deduplicated objects
+    """
+    key_func = compile_key_spec(keys) if callable(keys) else compile_key_spec(list(keys))
+    return stream_deduplicate(source, key_func, **options)
+
+
+def stream_deduplicate_by_custom_function(source: Source, key_func: Union[Callable[[Dict], Any], KeySpec],
+                                          **options) -> Iterator[Dict]:
+    """
+    Streaming version of deduplicate_by_custom_function.
+
+    Args:
+        source: Iterable of dictionaries or a path to a JSONL file
+        key_func: Function that takes an object and returns a key for deduplication
+        **options: Memory and spill options accepted by stream_deduplicate
+
+    Returns:
+        Iterator of deduplicated objects
+    """
+    return stream_deduplicate(source, compile_key_spec(key_func), **options)
+
+
+def stream_deduplicate_by_json_string(source: Source, **options) -> Iterator[Dict]:
+    """
+    Streaming version of deduplicate_by_json_string.
+
+    Args:
+        source: Iterable of dictionaries or a path to a JSONL file
+        **options: Memory and spill options accepted by stream_deduplicate
+
+    Returns:
+        Iterator of deduplicated objects
+    """
+    return stream_deduplicate(source, canonical_digest, **options)
+
+
+def stream_deduplicate_keep_latest(source: Source, key: KeySpec, timestamp_key: str = "timestamp",
+                                   max_keys_in_memory: int = 1_000_000, num_partitions: int = 64,
+                                   temp_dir: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Bounded-memory version of deduplicate_keep_latest.
+
+    The latest record for a key is only known once the whole input has been
+    read, so nothing is yielded before the end of the source. Output order
+    matches deduplicate_keep_latest: keys in order of first appearance.
+
+    Args:
+        source: Iterable of dictionaries or a path to a JSONL file
+        key: The key to use for deduplication
+        timestamp_key: The key containing timestamp information
+        max_keys_in_memory: Number of keys held in memory before spilling to disk
+        num_partitions: Number of hash partitions used once spilling starts
+        temp_dir: Directory for spill files (defaults to the system temp dir)
+
+    Returns:
+        Iterator of deduplicated objects with latest timestamps
+    """
+    if max_keys_in_memory < 1:
+        raise ValueError("max_keys_in_memory must be at least 1")
+    if num_partitions < 1:
+        raise ValueError("num_partitions must be at least 1")
+
+    records = _iter_source(source)
+    get_key = compile_key_spec(key, default=MISSING)
+    get_timestamp = compile_key_spec(timestamp_key, default=0)
+    flat = is_flat_key(key) and is_flat_key(timestamp_key)
+    # key -> [first_seq, timestamp, obj]
+    latest = {}
+    spilled = False
+    for seq, obj in enumerate(records):
+        obj_key = (obj[key] if key in obj else MISSING) if flat else get_key(obj)
+        if obj_key is MISSING:
+            continue
+        timestamp = obj.get(timestamp_key, 0) if flat else get_timestamp(obj)
+        entry = latest.get(obj_key)
+        if entry is None:
+            latest[obj_key] = [seq, timestamp, obj]
+            if len(latest) > max_keys_in_memory:
+                spilled = True
+                break
+        elif timestamp > entry[1]:
+            entry[1] = timestamp
+            entry[2] = obj
+
+    if not spilled:
+        for _, _, obj in latest.values():
+            yield obj
+        return
+
+    with tempfile.TemporaryDirectory(dir=temp_dir) as workdir:
+        inputs = _SpillFiles(workdir, "records", num_partitions)
+        outputs = _SpillFiles(workdir, "latest", num_partitions)
+        try:
+            for obj_key, (first_seq, timestamp, obj) in latest.items():
+                inputs.write(hash(obj_key) % num_partitions, (first_seq, obj_key, timestamp, obj))
+            latest.clear()
+
+            for seq, obj in enumerate(records, start=seq + 1):
+                obj_key = get_key(obj)
+                if obj_key is MISSING:
+                    continue
+                inputs.write(hash(obj_key) % num_partitions, (seq, obj_key, get_timestamp(obj), obj))
+
+            for i in range(num_partitions):
+                partition = {}
+                for seq, obj_key, timestamp, obj in _load_all(inputs.files[i]):
+                    entry = partition.get(obj_key)
+                    if entry is None:
+                        partition[obj_key] = [seq, timestamp, obj]
+                    elif timestamp > entry[1]:
+                        entry[1] = timestamp
+                        entry[2] = obj
+                inputs.files[i].truncate(0)
+                # Entries were inserted in first_seq order already
+                for first_seq, _, obj in partition.values():
+                    outputs.write(i, (first_seq, obj))
+
+            yield from _merge_by_sequence(outputs)
+        finally:
+            inputs.close()
+            outputs.close()
@@ -0,0 +1,114 @@
+from collections import deque
+
+import pytest
+from adaptive_limiter import AdaptiveRateLimiter, adaptive_rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeBackend:
+    """Serves `capacity` calls per second quickly; latency and then errors grow beyond that."""
+    def __init__(self, clock, capacity):
+        self.clock = clock
+        self.capacity = capacity
+        self.recent = deque()
+
+    def __call__(self):
+        now = self.clock()
+        self.recent.append(now)
+        while self.recent[0] <= now - 1.0:
+            self.recent.popleft()
+        load = len(self.recent)
+        if load > 1.5 * self.capacity:
+            self.clock.sleep(0.2)
+            raise ConnectionError("backend overloaded")
+        self.clock.sleep(0.005 + max(0, load - self.capacity) * 0.002)
+        return load
+
+
+def make_limiter(clock, **overrides):
+    options = dict(initial_rate=10.0, floor=2.0, ceiling=500.0, latency_target=0.01, increase=5.0,
+                   clock=clock, sleep=clock.sleep)
+    options.update(overrides)
+    return AdaptiveRateLimiter(**options)
+
+
+def simulate(clock, backend, limiter, until):
+    call = adaptive_rate_limit(limiter)(backend)
+    rates = []
+    while clock.now < until:
+        try:
+            call()
+        except ConnectionError:
+            pass
+        rates.append((clock.now, limiter.rate))
+    return rates
+
+
+def test_rate_tracks_backend_capacity():
+    clock = FakeClock()
+    backend = FakeBackend(clock, capacity=80)
+    limiter = make_limiter(clock)
+    rates = simulate(clock, backend, limiter, until=60)
+    settled = [rate for now, rate in rates if now > 30]
+    mean = sum(settled) / len(settled)
+    assert 40 <= mean <= 110
+    assert all(2.0 <= rate <= 500.0 for _, rate in rates)
+
+    # Capacity drops: the limiter backs off, then grows again when it recovers
+    backend.capacity = 20
+    rates = simulate(clock, backend, limiter, until=90)
+    settled = [rate for now, rate in rates if now > 75]
+    assert sum(settled) / len(settled) <= 35
+
+
+def test_stays_within_floor_and_ceiling():
+    clock = FakeClock()
+    limiter = make_limiter(clock, ceiling=12.0)
+    for _ in range(10):
+        clock.now += 1.0
+        for _ in range(20):
+            limiter.record(0.001)
+    assert limiter.rate == 12.0
+    for _ in range(10):
+        clock.now += 1.0
+        limiter.record(1.0, error=True)
+    assert limiter.rate == 2.0
+
+
+def test_errors_back_off_and_are_reraised():
+    clock = FakeClock()
+    limiter = make_limiter(clock, burst=5)
+
+    @adaptive_rate_limit(limiter)
+    def broken():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        broken()
+    clock.now = 1.0
+    limiter.record(0.001)
+    assert limiter.rate == 5.0
+
+
+def test_unused_rate_does_not_grow():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    for _ in range(10):
+        clock.now += 1.0
+        limiter.record(0.001)
+    assert limiter.rate == 10.0
+
+
+def test_rejects_inconsistent_rates():
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(initial_rate=1.0, floor=2.0, ceiling=10.0, latency_target=0.1)
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from async_dedup import (
+    AsyncDeduplicator,
+    async_deduplicate_by_custom_function,
+    async_deduplicate_by_json_string,
+    async_deduplicate_by_key,
+    async_deduplicate_by_multiple_keys,
+)
+from deduplicate_objects import (
+    deduplicate_by_custom_function,
+    deduplicate_by_json_string,
+    deduplicate_by_key,
+    deduplicate_by_multiple_keys,
+)
+from key_spec import MISSING, compile_key_spec
+
+
+@pytest.fixture
+def users():
+    return [
+        {"id": 1, "name": "Alice", "email": "alice@example.com"},
+        {"id": 2, "name": "Bob", "email": "bob@example.com"},
+        {"id": 1, "name": "Alice Updated", "email": "alice@example.com"},
+        {"name": "No Id", "email": "none@example.com"},
+        {"email": "bob@example.com", "id": 2, "name": "Bob"},
+    ]
+
+
+async def aiter_records(records, pulled=None):
+    for record in records:
+        if pulled is not None:
+            pulled.append(record)
+        await asyncio.sleep(0)
+        yield record
+
+
+async def collect(aiterator):
+    return [record async for record in aiterator]
+
+
+def email_key(obj):
+    return obj["email"]
+
+
+def test_strategies_match_list_versions(users):
+    async def main():
+        return (
+            await collect(async_deduplicate_by_key(aiter_records(users), "id")),
+            await collect(async_deduplicate_by_multiple_keys(aiter_records(users), ["name", "email"])),
+            await collect(async_deduplicate_by_custom_function(aiter_records(users), email_key)),
+            await collect(async_deduplicate_by_json_string(aiter_records(users))),
+        )
+
+    by_key, by_keys, by_func, by_json = asyncio.run(main())
+    assert by_key == deduplicate_by_key(users, "id")
+    assert by_keys == deduplicate_by_multiple_keys(users, ["name", "email"])
+    assert by_func == deduplicate_by_custom_function(users, email_key)
+    assert by_json == deduplicate_by_json_string(users)
+
+
+def test_executor_keeps_order_and_first_occurrence():
+    records = [{"id": i % 7, "n": i} for i in range(200)]
+    threads = set()
+
+    def slow_key(obj):
+        threads.add(threading.get_ident())
+        return obj["id"]
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            stage = AsyncDeduplicator(slow_key, executor=executor, max_in_flight=8)
+            return stage, await collect(stage.filter(aiter_records(records)))
+
+    stage, result = asyncio.run(main())
+    assert result == records[:7]
+    assert threading.get_ident() not in threads
+    assert stage.stats() == {"passed": 7, "dropped": 193, "skipped": 0}
+
+
+def test_backpressure_limits_read_ahead():
+    records = [{"id": i} for i in range(100)]
+    pulled = []
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            stage = AsyncDeduplicator("id", executor=executor, max_in_flight=5)
+            results = stage.filter(aiter_records(records, pulled))
+            first = await results.__anext__()
+            read_ahead = len(pulled)
+            await results.aclose()
+            return first, read_ahead
+
+    first, read_ahead = asyncio.run(main())
+    assert first == records[0]
+    assert read_ahead == 5
+
+
+def test_counts_dropped_and_skipped(users):
+    async def main():
+        stage = AsyncDeduplicator(compile_key_spec("id", default=MISSING))
+        return stage, await collect(stage.filter(aiter_records(users)))
+
+    stage, result = asyncio.run(main())
+    assert [user["id"] for user in result] == [1, 2]
+    assert stage.stats() == {"passed": 2, "dropped": 2, "skipped": 1}
+
+
+def test_string_key_skips_records_without_it(users):
+    async def main():
+        stage = AsyncDeduplicator("id")
+        return stage, await collect(stage.filter(aiter_records(users + [{"id": None}])))
+
+    stage, result = asyncio.run(main())
+    # The record lacking "id" is skipped, not kept as the key None
+    assert [user["id"] for user in result] == [1, 2, None]
+    assert stage.stats() == {"passed": 3, "dropped": 2, "skipped": 1}
+
+
+def test_process_pool_skips_records_without_key(users):
+    async def main():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            stage = AsyncDeduplicator(compile_key_spec("id", default=MISSING), executor=executor)
+            return stage, await collect(stage.filter(aiter_records(users)))
+
+    stage, result = asyncio.run(main())
+    assert [user["id"] for user in result] == [1, 2]
+    assert stage.stats() == {"passed": 2, "dropped": 2, "skipped": 1}
+
+
+def test_rejects_empty_window():
+    with pytest.raises(ValueError):
+        AsyncDeduplicator("id", max_in_flight=0)
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from async_throttle import AsyncThrottle, async_throttle
+from throttle_example import ThrottleFunction, throttle
+
+
+def test_queues_calls_at_rate():
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = []
+
+        @async_throttle(rate=50, burst=2)
+        async def call(i):
+            started.append(loop.time())
+            return i
+
+        begin = loop.time()
+        results = await asyncio.gather(*(call(i) for i in range(10)))
+        return results, [t - begin for t in started]
+
+    results, offsets = asyncio.run(main())
+    assert results == list(range(10))
+    # Two calls at once, then one every 20ms
+    assert offsets[1] < 0.01
+    assert offsets[-1] == pytest.approx(8 * 0.02, abs=0.03)
+
+
+def test_limits_concurrency():
+    async def main():
+        running = 0
+        peak = 0
+
+        @async_throttle(rate=1000, burst=100, max_concurrency=3)
+        async def call():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await asyncio.gather(*(call() for _ in range(20)))
+        return peak
+
+    assert asyncio.run(main()) == 3
+
+
+def test_cancelled_and_expired_calls_leave_the_queue():
+    async def main():
+        throttle = AsyncThrottle(rate=20, burst=1)
+        order = []
+
+        async def call(i):
+            order.append(i)
+
+        first = asyncio.create_task(throttle.run(call, 0))
+        doomed = asyncio.create_task(throttle.run(call, 1))
+        expiring = asyncio.create_task(throttle.run(call, 2, timeout=0.01))
+        last = asyncio.create_task(throttle.run(call, 3))
+        await asyncio.sleep(0)
+        assert throttle.pending == 3
+        doomed.cancel()
+        await asyncio.gather(first, last)
+        with pytest.raises(asyncio.CancelledError):
+            await doomed
+        with pytest.raises(asyncio.TimeoutError):
+            await expiring
+        return order, throttle
+
+    order, throttle = asyncio.run(main())
+    assert order == [0, 3]
+    assert throttle.active == 0
+    assert throttle.pending == 0
+
+
+def test_context_manager_holds_a_slot():
+    async def main():
+        throttle = AsyncThrottle(rate=1000, burst=10, max_concurrency=1)
+        async with throttle:
+            assert throttle.active == 1
+            with pytest.raises(asyncio.TimeoutError):
+                await throttle.acquire(timeout=0.01)
+        return throttle.active
+
+    assert asyncio.run(main()) == 0
+
+
+def test_rejects_plain_functions():
+    with pytest.raises(TypeError):
+        async_throttle(1)(lambda: None)
+
+
+def test_drop_throttles_keep_coroutines_awaitable():
+    async def fetch(x):
+        return x
+
+    async def main():
+        decorated = throttle(60.0)(fetch)
+        wrapped = ThrottleFunction(fetch, 60.0)
+        return [await decorated(1), await decorated(2), await wrapped(3), await wrapped(4)]
+
+    assert asyncio.run(main()) == [1, None, 3, None]
@@ -0,0 +1,116 @@
+import pytest
+from bloom_filter import BloomFilter, ApproximateSeenSet, DiskKeySet
+from deduplicate_objects import deduplicate_by_key, deduplicate_by_custom_function
+
+
+def test_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(i)
+    assert all(i in bloom for i in range(1000))
+
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter(10_000, 0.01)
+    for i in range(10_000):
+        bloom.add(f"user-{i}")
+    false_positives = sum(f"other-{i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+    assert bloom.estimated_false_positive_rate() == pytest.approx(0.01, rel=0.5)
+
+
+def test_memory_is_fixed():
+    bloom = BloomFilter(1000, 0.01)
+    size = bloom.memory_bytes
+    for i in range(50_000):
+        bloom.add(i)
+    assert bloom.memory_bytes == size
+    # About 9.6 bits per key at a 1% error rate
+    assert size < 1300
+
+
+def test_add_reports_previous_presence():
+    bloom = BloomFilter(100)
+    assert bloom.add("a") is False
+    assert bloom.add("a") is True
+
+
+def test_equal_keys_collapse_in_both_modes():
+    objects = [{"id": 1}, {"id": 1.0}, {"id": True}, {"id": "1"}, {"id": (1, "a")}, {"id": (1.0, "a")}]
+    exact = deduplicate_by_key(objects, "id")
+    assert exact == [{"id": 1}, {"id": "1"}, {"id": (1, "a")}]
+    assert deduplicate_by_key(objects, "id", seen=ApproximateSeenSet(expected_items=100, error_rate=1e-6)) == exact
+    bloom = BloomFilter(100)
+    bloom.add(1)
+    assert 1.0 in bloom and True in bloom
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+    with pytest.raises(ValueError):
+        BloomFilter(10, 1.5)
+
+
+def test_deduplicate_by_key_approximate():
+    users = [{"id": i % 500} for i in range(2000)]
+    seen = ApproximateSeenSet(expected_items=500, error_rate=0.001)
+    result = deduplicate_by_key(users, "id", seen=seen)
+    # Approximate mode may only drop extra records, never keep duplicates
+    assert len({user["id"] for user in result}) == len(result)
+    assert len(result) >= 495
+    report = seen.report()
+    assert report["memory_bytes"] == seen.filter.memory_bytes
+    assert report["flagged"] >= 1500
+
+
+@pytest.mark.parametrize("store", [set, DiskKeySet])
+def test_exact_store_makes_result_exact(store):
+    # Undersize the filter so false positives are frequent
+    objects = [{"id": i} for i in range(300)] + [{"id": i} for i in range(0, 300, 3)]
+    exact = store()
+    seen = ApproximateSeenSet(expected_items=10, error_rate=0.1, store=exact)
+    result = deduplicate_by_custom_function(objects, lambda obj: obj["id"], seen=seen)
+    assert [obj["id"] for obj in result] == list(range(300))
+    assert len(exact) == 300
+    report = seen.report()
+    assert report["dropped_as_duplicate"] == 100
+    assert report["false_positives_caught"] > 0
+    assert report["estimated_unique_dropped"] == 0
+    if isinstance(exact, DiskKeySet):
+        exact.close()
+
+
+def test_report_estimates_unique_keys_dropped():
+    objects = [{"id": i} for i in range(20_000)]
+    seen = ApproximateSeenSet(expected_items=20_000, error_rate=0.05)
+    kept = len(deduplicate_by_key(objects, "id", seen=seen))
+    report = seen.report()
+    assert report["dropped_as_duplicate"] == 20_000 - kept > 0
+    assert report["estimated_unique_dropped"] == pytest.approx(20_000 - kept, rel=0.5)
+
+
+def test_keys_without_a_canonical_form():
+    class Point:
+        def __init__(self, x):
+            self.x = x
+
+        def __eq__(self, other):
+            return self.x == other.x
+
+        def __hash__(self):
+            return hash(self.x)
+
+    bloom = BloomFilter(100)
+    bloom.add(Point(1))
+    assert Point(1) in bloom
+
+
+def test_disk_key_set_persists(tmp_path):
+    path = str(tmp_path / "keys.sqlite")
+    with DiskKeySet(path) as store:
+        store.add("a")
+        store.add(1)
+        assert "a" in store and 1.0 in store and "b" not in store
+    with DiskKeySet(path) as store:
+        assert len(store) == 2 and True in store
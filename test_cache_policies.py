@@ -0,0 +1,108 @@
+import random
+
+import pytest
+from cache_policies import (POLICIES, ARCCache, CountMinSketch, TwoQCache, WTinyLFUCache, compare_policies,
+                            load_trace, replay, scan_trace)
+from lru_cache import LRUCache, ShardedLRUCache
+
+POLICY_CLASSES = [TwoQCache, ARCCache, WTinyLFUCache]
+
+
+@pytest.mark.parametrize("cls", POLICY_CLASSES)
+def test_get_and_put(cls):
+    cache = cls(10)
+    assert cache.get("a") == -1
+    cache.put("a", 1)
+    cache.put("a", 2)
+    assert cache.get("a") == 2
+    assert "a" in cache and "b" not in cache
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize("cls", POLICY_CLASSES)
+@pytest.mark.parametrize("capacity", [1, 2, 7, 100])
+def test_random_workload_respects_capacity_and_values(cls, capacity):
+    generator = random.Random(capacity)
+    cache = cls(capacity)
+    latest = {}
+    for step in range(20_000):
+        key = int(generator.paretovariate(1.0)) % 300
+        if generator.random() < 0.5:
+            cache.put(key, step)
+            latest[key] = step
+        else:
+            value = cache.get(key)
+            assert value == -1 or value == latest[key]
+        assert len(cache) <= capacity
+
+
+def test_sketch_counts_and_ages():
+    sketch = CountMinSketch(1024, sample_size=1000)
+    for _ in range(5):
+        sketch.increment("hot")
+    sketch.increment("warm")
+    assert sketch.frequency("hot") >= 5
+    assert sketch.frequency("warm") >= 1
+    assert sketch.frequency("cold") <= 1
+    for _ in range(30):
+        sketch.increment("saturated")
+    assert sketch.frequency("saturated") == 15
+    # Reaching the sample size halves every counter
+    for key in range(1000 - 36):
+        sketch.increment(("filler", key))
+    assert sketch.frequency("hot") in (2, 3)
+    assert sketch.frequency("saturated") == 7
+
+
+@pytest.mark.parametrize("cls", POLICY_CLASSES)
+def test_hot_items_survive_a_scan(cls):
+    cache = cls(100)
+    hot = range(50)
+    # Keys 50..149 cycle through once so that hot keys get evicted and
+    # re-requested while they warm up, as they would in a busy cache
+    for round_ in range(20):
+        for key in hot:
+            if cache.get(key) == -1:
+                cache.put(key, key)
+        for key in range(50 + round_ * 10, 60 + round_ * 10):
+            if cache.get(key) == -1:
+                cache.put(key, key)
+    for key in range(10_000, 12_000):
+        cache.put(key, key)
+    survivors = sum(cache.get(key) != -1 for key in hot)
+    assert survivors >= 40
+
+    lru = LRUCache(100)
+    for key in hot:
+        lru.put(key, key)
+    for key in range(10_000, 12_000):
+        lru.put(key, key)
+    assert all(lru.get(key) == -1 for key in hot)
+
+
+def test_policies_beat_lru_on_scan_trace():
+    trace = scan_trace(hot_keys=1000, catalog=4000, requests=60_000, scan_every=15_000)
+    results = compare_policies(trace, [250, 500])
+    assert set(results) == set(POLICIES)
+    for name in ("2Q", "ARC", "W-TinyLFU"):
+        for capacity in (250, 500):
+            assert results[name][capacity] > results["LRU"][capacity]
+
+
+def test_replay_recorded_trace(tmp_path):
+    path = tmp_path / "trace.txt"
+    path.write_text("a\nb\n\na\nc\na\n")
+    trace = load_trace(str(path))
+    assert trace == ["a", "b", "a", "c", "a"]
+    assert replay(trace, LRUCache(2)) == pytest.approx(2 / 5)
+    assert replay([], LRUCache(2)) == 0.0
+
+
+@pytest.mark.parametrize("cls", POLICY_CLASSES)
+def test_policies_as_sharded_segments(cls):
+    cache = ShardedLRUCache(64, shards=4, segment_factory=cls)
+    for key in range(200):
+        cache.put(key, key)
+    stats = cache.stats()
+    assert len(cache) <= 64
+    assert stats["evictions"] == 200 - len(cache)
@@ -0,0 +1,63 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+from canonical_hash import canonical_digest
+from deduplicate_objects import deduplicate_by_json_string
+
+
+def test_digest_is_128_bits():
+    assert len(canonical_digest({"a": 1})) == 16
+
+
+def test_key_order_independent():
+    assert canonical_digest({"a": 1, "b": {"x": 1, "y": 2}}) == canonical_digest({"b": {"y": 2, "x": 1}, "a": 1})
+
+
+@pytest.mark.parametrize("left, right", [
+    ({"a": 1}, {"a": 1.0}),
+    ({"a": 1}, {"a": True}),
+    ({"a": 1}, {"a": "1"}),
+    ({"a": None}, {"a": "null"}),
+    ({"a": [1, 2]}, {"a": [2, 1]}),
+    ({"a": {"b": 1}}, {"a.b": 1}),
+])
+def test_distinguishes_what_json_distinguishes(left, right):
+    assert json.dumps(left, sort_keys=True) != json.dumps(right, sort_keys=True)
+    assert canonical_digest(left) != canonical_digest(right)
+
+
+def test_tuples_hash_like_lists():
+    assert canonical_digest({"a": (1, 2)}) == canonical_digest({"a": [1, 2]})
+
+
+def test_non_json_values():
+    when = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    record = {"when": when, "tags": {"b", "a"}, "raw": b"\x00\xff", "price": decimal.Decimal("9.99"),
+              "id": uuid.UUID(int=7), "day": when.date(), "ttl": datetime.timedelta(hours=1)}
+    same = dict(record, tags={"a", "b"})
+    assert canonical_digest(record) == canonical_digest(same)
+    assert canonical_digest(record) != canonical_digest(dict(record, when=when.replace(second=6)))
+    assert canonical_digest({"v": {1, 2}}) != canonical_digest({"v": [1, 2]})
+
+
+def test_mixed_type_keys():
+    assert canonical_digest({1: "a", "b": 2}) == canonical_digest({"b": 2, 1: "a"})
+    assert canonical_digest({(1, 2): "a"}) != canonical_digest({(1, 3): "a"})
+
+
+def test_unsupported_type():
+    with pytest.raises(TypeError, match="cannot be canonically hashed"):
+        canonical_digest({"a": object()})
+
+
+def test_deduplicate_by_json_string_handles_datetimes():
+    when = datetime.datetime(2024, 1, 1)
+    objects = [
+        {"at": when, "tags": {"x", "y"}},
+        {"tags": {"y", "x"}, "at": when},
+        {"at": when, "tags": {"x"}},
+    ]
+    assert deduplicate_by_json_string(objects) == [objects[0], objects[2]]
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+import columnar_dedup
+from columnar_dedup import first_occurrence_indices
+from deduplicate_objects import deduplicate_by_multiple_keys
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def records():
+    rng = random.Random(11)
+    return [{"id": rng.randrange(500), "price": rng.choice([1, 1.5, 2.0, 3]), "sku": f"s{rng.randrange(40)}",
+             "store": rng.randrange(5)} for _ in range(3000)]
+
+
+def kept(records, indices):
+    return [records[i] for i in indices]
+
+
+@pytest.mark.parametrize("keys", [["id"], ["price"], ["sku"], ["sku", "store"], ["store", "price", "sku"]])
+def test_array_columns_match_records(records, keys):
+    columns = [np.array([record[key] for record in records]) for key in keys]
+    assert kept(records, first_occurrence_indices(columns)) == deduplicate_by_multiple_keys(records, keys)
+
+
+@pytest.mark.parametrize("keys", [["id"], ["sku", "store"]])
+def test_list_columns_match_records(records, keys):
+    columns = [[record[key] for record in records] for key in keys]
+    assert kept(records, first_occurrence_indices(columns)) == deduplicate_by_multiple_keys(records, keys)
+
+
+@pytest.mark.parametrize("values", [
+    [1, "1", 1],                      # mixed types
+    [None, 1, None],                  # missing values
+    [2 ** 70, 2 ** 70, 1],            # too large for int64
+    [float("nan"), float("nan"), 1.0],
+    ["a", "a\x00", "a"],              # NumPy would strip the NUL
+    ["x" * 100, "x" * 100, "y"],      # too long for the fixed-width path
+    [(1, 2), (1, 2), (3,)],           # unhashable by NumPy
+])
+def test_unconvertible_lists_keep_python_equality(values):
+    objects = [{"k": v} for v in values]
+    assert kept(objects, first_occurrence_indices([values])) == deduplicate_by_multiple_keys(objects, ["k"])
+
+
+def test_equal_numbers_collapse_like_python():
+    assert first_occurrence_indices([[1, 1.0, True, 0, False]]) == [0, 3]
+
+
+def test_columns_validation():
+    with pytest.raises(ValueError):
+        first_occurrence_indices([])
+    with pytest.raises(ValueError):
+        first_occurrence_indices([np.arange(3), np.arange(4)])
+    assert first_occurrence_indices([np.array([], dtype=np.int64)]) == []
+
+
+def test_without_numpy(records, monkeypatch):
+    monkeypatch.setattr(columnar_dedup, "np", None)
+    columns = [[record["sku"] for record in records], [record["store"] for record in records]]
+    assert kept(records, first_occurrence_indices(columns)) == \
+        deduplicate_by_multiple_keys(records, ["sku", "store"])
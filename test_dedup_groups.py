@@ -0,0 +1,70 @@
+from array import array
+
+import pytest
+from dedup_groups import (
+    group_by_custom_function,
+    group_by_json_string,
+    group_by_key,
+    group_by_multiple_keys,
+    group_keep_latest,
+)
+from deduplicate_objects import (
+    deduplicate_by_custom_function,
+    deduplicate_by_json_string,
+    deduplicate_by_key,
+    deduplicate_by_multiple_keys,
+    deduplicate_keep_latest,
+)
+
+
+@pytest.fixture
+def users():
+    return [
+        {"id": 1, "name": "Alice", "email": "alice@example.com", "ts": 10},
+        {"id": 2, "name": "Bob", "email": "bob@example.com", "ts": 10},
+        {"id": 1, "name": "Alice Updated", "email": "alice@example.com", "ts": 30},
+        {"name": "No Id", "email": "none@example.com"},
+        {"id": 2, "name": "Bob", "email": "bob@example.com", "ts": 20},
+    ]
+
+
+def test_by_key_arrays(users):
+    groups = group_by_key(users, "id")
+    assert groups.kept == array("q", [0, 1])
+    assert groups.counts == array("q", [2, 2])
+    assert groups.representative == array("q", [0, 1, 0, -1, 1])
+    assert groups.dropped() == array("q", [2, 4])
+    assert groups.duplicates_of() == {0: [2], 1: [4]}
+    assert groups.gather(users) == deduplicate_by_key(users, "id")
+
+
+def test_gather_matches_every_strategy(users):
+    def email(obj):
+        return obj["email"]
+
+    assert group_by_multiple_keys(users, ["name", "email"]).gather(users) == \
+        deduplicate_by_multiple_keys(users, ["name", "email"])
+    assert group_by_custom_function(users, email).gather(users) == deduplicate_by_custom_function(users, email)
+    assert group_by_json_string(users + users[:2]).gather(users + users[:2]) == deduplicate_by_json_string(users)
+
+
+def test_keep_latest_points_to_newest(users):
+    groups = group_keep_latest(users, "id", "ts")
+    assert groups.kept == array("q", [2, 4])
+    assert groups.representative == array("q", [2, 4, 2, -1, 4])
+    assert groups.dropped() == array("q", [0, 1])
+    assert groups.gather(users) == deduplicate_keep_latest(users, "id", "ts")
+
+
+def test_arrays_share_buffer_with_numpy(users):
+    np = pytest.importorskip("numpy")
+    groups = group_by_key(users, "id")
+    view = np.frombuffer(groups.representative, dtype=np.int64)
+    assert view.tolist() == [0, 1, 0, -1, 1]
+    assert np.shares_memory(view, np.frombuffer(groups.representative, dtype=np.int64))
+
+
+def test_empty_input():
+    groups = group_by_key([], "id")
+    assert len(groups) == 0
+    assert groups.gather([]) == []
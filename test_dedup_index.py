@@ -0,0 +1,70 @@
+import pytest
+from dedup_index import DedupIndex
+from deduplicate_objects import deduplicate_by_key, deduplicate_keep_latest
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "keys.db")
+
+
+def test_first_batch_matches_in_memory(index_path):
+    users = [{"id": 1, "n": "a"}, {"id": 2}, {"id": 1, "n": "b"}, {"name": "no id"}, {"id": 3}]
+    with DedupIndex(index_path) as index:
+        assert index.deduplicate_by_key(users, "id") == deduplicate_by_key(users, "id")
+        assert len(index) == 3
+
+
+def test_duplicates_across_batches_are_dropped(index_path):
+    with DedupIndex(index_path) as index:
+        index.deduplicate_by_key([{"id": 1}, {"id": 2}], "id")
+    with DedupIndex(index_path) as index:
+        result = index.deduplicate_by_key([{"id": 2}, {"id": 3}, {"id": 3}, {"id": 1.0}], "id")
+        assert result == [{"id": 3}]
+        timestamp, batch_id, offset = index.lookup(3)
+        assert (batch_id, offset) == (2, 1)
+        assert [batch[2] for batch in index.batches()] == [2, 4]
+
+
+def test_keep_latest_across_batches(index_path):
+    first = [{"user_id": 1, "timestamp": 100}, {"user_id": 2, "timestamp": 100},
+             {"user_id": 1, "timestamp": 300}]
+    second = [{"user_id": 1, "timestamp": 200}, {"user_id": 2, "timestamp": 150},
+              {"user_id": 3, "timestamp": 50}]
+    with DedupIndex(index_path) as index:
+        assert index.deduplicate_keep_latest(first, "user_id") == deduplicate_keep_latest(first, "user_id")
+        assert index.deduplicate_keep_latest(second, "user_id") == [second[1], second[2]]
+        assert index.lookup(1)[0] == 300
+        assert index.lookup(2)[0] == 150
+
+
+def test_large_batch_lookup_is_chunked(index_path):
+    with DedupIndex(index_path) as index:
+        index.deduplicate_by_key([{"id": i} for i in range(0, 3000, 2)], "id")
+        result = index.deduplicate_by_key([{"id": i} for i in range(3000)], "id")
+        assert [obj["id"] for obj in result] == list(range(1, 3000, 2))
+
+
+def test_read_only_while_writer_is_open(index_path):
+    writer = DedupIndex(index_path)
+    writer.deduplicate_by_key([{"id": 1}], "id")
+    reader = DedupIndex(index_path, read_only=True)
+    try:
+        writer.deduplicate_by_key([{"id": 2}], "id")
+        assert 2 in reader
+        # Readers filter against the index without recording anything
+        assert reader.deduplicate_by_key([{"id": 1}, {"id": 9}], "id") == [{"id": 9}]
+        assert 9 not in writer
+        with pytest.raises(ValueError):
+            reader.compact()
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_compact_removes_old_entries(index_path):
+    with DedupIndex(index_path) as index:
+        index.deduplicate_by_key([{"id": i, "ts": i} for i in range(10)], "id", timestamp_key="ts")
+        assert index.compact(older_than=5) == 5
+        assert len(index) == 5
+        assert index.deduplicate_by_key([{"id": 1, "ts": 20}, {"id": 7, "ts": 20}], "id") == [{"id": 1, "ts": 20}]
@@ -0,0 +1,110 @@
+import pickle
+
+import pytest
+from dedup_groups import group_by_key, group_keep_latest
+from deduplicate_objects import deduplicate_by_key, deduplicate_by_multiple_keys, deduplicate_keep_latest
+from key_spec import MISSING, compile_key_spec
+from parallel_dedup import parallel_deduplicate
+from streaming_dedup import stream_deduplicate_by_key, stream_deduplicate_keep_latest
+
+
+@pytest.fixture
+def orders():
+    return [
+        {"id": 1, "ts": 1, "customer": {"address": {"zip": "10001"}, "tier": "gold"}},
+        {"id": 2, "ts": 2, "customer": {"address": {"zip": "94103"}, "tier": "gold"}},
+        {"id": 3, "ts": 3, "customer": {"address": {"zip": "10001"}, "tier": "basic"}},
+        {"id": 4, "ts": 4, "customer": {"tier": "basic"}},
+        {"id": 5, "ts": 5, "customer": None},
+        {"id": 6, "ts": 6, "customer": {"address": {"zip": "94103"}, "tier": "gold"}},
+    ]
+
+
+def test_flat_key_uses_default():
+    get_id = compile_key_spec("id", default=MISSING)
+    assert get_id({"id": 7}) == 7
+    assert get_id({}) is MISSING
+
+
+def test_nested_paths():
+    for depth in (2, 3, 5):
+        path = ".".join(f"k{i}" for i in range(depth))
+        obj = {"leaf": 1}
+        for i in reversed(range(depth)):
+            obj = {f"k{i}": obj}
+        get_leaf = compile_key_spec(path + ".leaf")
+        assert get_leaf(obj) == 1
+        assert get_leaf({"k0": {}}) is None
+        assert get_leaf({"k0": "not a dict"}) is None
+
+
+def test_literal_dotted_key_fallback():
+    get_key = compile_key_spec("a.b", default=MISSING)
+    assert get_key({"a.b": 1}) == 1
+    assert get_key({"a": {"b": 2}, "a.b": 1}) == 2
+    assert get_key({"a": 1}) is MISSING
+
+
+def test_sequences_extract_tuples():
+    obj = {"a": 1, "b": {"c": 2}}
+    assert compile_key_spec(["a"])(obj) == (1,)
+    assert compile_key_spec(["a", "z"])(obj) == (1, None)
+    assert compile_key_spec(("a", "b.c"))(obj) == (1, 2)
+    assert compile_key_spec(["a", "z"], default=0)(obj) == (1, 0)
+
+
+def test_callables_pass_through():
+    get_key = compile_key_spec("a")
+    assert compile_key_spec(get_key) is get_key
+    assert compile_key_spec(len)({"a": 1}) == 1
+
+
+def test_invalid_specs():
+    with pytest.raises(ValueError):
+        compile_key_spec([])
+    with pytest.raises(TypeError):
+        compile_key_spec(["a", 1])
+
+
+def test_flat_specs_match_previous_behavior():
+    objects = [{"id": 1, "x": 1}, {"x": 2}, {"id": 1, "x": 3}, {"id": None}, {"id": None}]
+    assert deduplicate_by_key(objects, "id") == [objects[0], objects[3]]
+    assert deduplicate_by_multiple_keys(objects, ["id"]) == [objects[0], objects[1]]
+
+
+def test_nested_key_across_modules(orders):
+    expected = [orders[0], orders[1]]
+    assert deduplicate_by_key(orders, "customer.address.zip") == expected
+    assert list(stream_deduplicate_by_key(iter(orders), "customer.address.zip")) == expected
+    assert group_by_key(orders, "customer.address.zip").gather(orders) == expected
+    assert parallel_deduplicate(orders, key="customer.address.zip", max_workers=1) == expected
+
+
+def test_nested_multiple_keys(orders):
+    keys = ["customer.tier", "customer.address.zip"]
+    expected = [orders[0], orders[1], orders[2], orders[3], orders[4]]
+    assert deduplicate_by_multiple_keys(orders, keys) == expected
+    assert parallel_deduplicate(orders, strategy="multiple_keys", keys=keys, max_workers=1) == expected
+    compiled = compile_key_spec(keys)
+    assert deduplicate_by_multiple_keys(orders, compiled) == expected
+
+
+def test_nested_keep_latest(orders):
+    expected = [orders[2], orders[5]]
+    assert deduplicate_keep_latest(orders, "customer.address.zip", "ts") == expected
+    assert list(stream_deduplicate_keep_latest(iter(orders), "customer.address.zip", "ts")) == expected
+
+
+def test_flat_fast_paths_match_compiled_specs():
+    objects = [{"id": 1, "ts": 1}, {"ts": 9}, {"id": 2}, {"id": 1, "ts": 5}, {"id": None, "ts": 2}]
+    by_id = compile_key_spec("id", default=MISSING)
+    assert deduplicate_by_key(objects, "id") == deduplicate_by_key(objects, by_id)
+    assert deduplicate_keep_latest(objects, "id", "ts") == deduplicate_keep_latest(objects, by_id, "ts")
+    assert deduplicate_keep_latest(objects, "id", "ts") == [objects[3], objects[2], objects[4]]
+    assert group_keep_latest(objects, "id", "ts").gather(objects) == deduplicate_keep_latest(objects, "id", "ts")
+
+
+def test_missing_survives_pickling():
+    assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+    get_id = pickle.loads(pickle.dumps(compile_key_spec("id", default=MISSING)))
+    assert get_id({}) is MISSING
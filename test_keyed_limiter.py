@@ -0,0 +1,119 @@
+import threading
+
+import pytest
+from keyed_limiter import KeyedTokenBucket, keyed_throttle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_keys_are_limited_independently(clock):
+    limiter = KeyedTokenBucket(rate=1.0, burst=2, clock=clock)
+    assert [limiter.try_acquire("alice") for _ in range(3)] == [True, True, False]
+    assert limiter.try_acquire("bob")
+    clock.now = 1.0
+    assert limiter.try_acquire("alice")
+    assert not limiter.try_acquire("alice")
+
+
+def test_idle_keys_are_evicted_without_loosening_limits(clock):
+    limiter = KeyedTokenBucket(rate=1.0, burst=2, stripes=1, clock=clock)
+    for user in range(1000):
+        clock.now = user * 0.25
+        limiter.try_acquire(user)
+    # Only keys used within the last burst / rate = 2 seconds remain
+    assert len(limiter) == 8
+    assert limiter.evicted == 992
+
+
+def test_capacity_evicts_least_recently_used(clock):
+    limiter = KeyedTokenBucket(rate=1.0, burst=1, max_keys=3, stripes=1, clock=clock)
+    for key in "abc":
+        assert limiter.try_acquire(key)
+    assert not limiter.try_acquire("a")
+    assert limiter.try_acquire("d")
+    assert len(limiter) == 3
+    # "b" was least recently used, so it was forgotten and starts with a full bucket
+    assert limiter.try_acquire("b")
+    assert not limiter.try_acquire("a")
+
+
+def test_blocking_acquire(clock):
+    limiter = KeyedTokenBucket(rate=2.0, burst=1, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire("a")
+    assert not limiter.acquire("a", timeout=0.1)
+    assert limiter.acquire("a")
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_keyed_throttle_decorator(clock):
+    calls = []
+
+    @keyed_throttle(rate=0.5, clock=clock)
+    def user_profile_api(user_id):
+        calls.append(user_id)
+        return f"Profile data for user: {user_id}"
+
+    @keyed_throttle(rate=0.5, key_func=lambda endpoint, **params: endpoint, clock=clock)
+    def api_call(endpoint, **params):
+        return endpoint
+
+    assert user_profile_api(1) == "Profile data for user: 1"
+    assert user_profile_api(1) is None
+    assert user_profile_api(2) == "Profile data for user: 2"
+    assert api_call("/a", page=1) == "/a"
+    assert api_call("/a", page=2) is None
+    assert calls == [1, 2]
+    assert len(user_profile_api.limiter) == 2
+
+
+def test_default_key_is_the_first_parameter_however_passed(clock):
+    @keyed_throttle(rate=0.5, clock=clock)
+    def user_profile_api(user_id, verbose=False):
+        return user_id
+
+    @keyed_throttle(rate=0.5, clock=clock)
+    def search(*, query="all"):
+        return query
+
+    assert user_profile_api(user_id=1) == 1
+    assert user_profile_api(1, verbose=True) is None
+    assert user_profile_api(verbose=True, user_id=2) == 2
+    assert search() == "all"
+    assert search(query="all") is None
+    assert search(query="x") == "x"
+    with pytest.raises(TypeError):
+        user_profile_api(verbose=True)
+    with pytest.raises(TypeError):
+        keyed_throttle(rate=1.0)(lambda **kwargs: None)
+
+
+def test_thread_safety():
+    limiter = KeyedTokenBucket(rate=1e-6, burst=50, stripes=4)
+    admitted = []
+    barrier = threading.Barrier(16)
+
+    def worker():
+        barrier.wait()
+        admitted.extend((key, limiter.try_acquire(key)) for key in range(8) for _ in range(20))
+
+    workers = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    for key in range(8):
+        assert sum(ok for k, ok in admitted if k == key) == 50
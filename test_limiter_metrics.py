@@ -0,0 +1,137 @@
+import gc
+import importlib
+import threading
+
+import pytest
+from limiter_metrics import REGISTRY, WAIT_BUCKETS, MetricsRegistry
+from rate_limiter import TokenBucket, rate_limit
+import throttle_example
+from throttle_example import ThrottleFunction, throttle
+
+
+def test_counts_from_many_threads_add_up():
+    metrics = MetricsRegistry().limiter("api", gauge=lambda: 2.5)
+
+    def worker():
+        for _ in range(1000):
+            metrics.allowed()
+            metrics.throttled()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = metrics.snapshot()
+    assert snapshot["allowed"] == 8000
+    assert snapshot["throttled"] == 8000
+    assert snapshot["tokens"] == 2.5
+
+
+def test_wait_histogram():
+    metrics = MetricsRegistry().limiter("api")
+    for seconds in (0.0, 0.00005, 0.005, 0.005, 30.0):
+        metrics.waited(seconds)
+    metrics.waited(0.5, allowed=False)
+    snapshot = metrics.snapshot()
+    assert snapshot["queued"] == 6
+    assert (snapshot["allowed"], snapshot["throttled"]) == (5, 1)
+    assert snapshot["wait_seconds"] == pytest.approx(30.51005)
+    assert snapshot["wait_histogram"] == {0.0: 1, 1e-4: 1, 1e-3: 0, 0.01: 2, 0.1: 0, 1.0: 1, 10.0: 0, None: 1}
+    assert len(snapshot["wait_histogram"]) == len(WAIT_BUCKETS) + 1
+
+
+def test_exporters_receive_snapshots():
+    registry = MetricsRegistry()
+    registry.limiter("a").allowed()
+    registry.limiter("b").throttled()
+    assert registry.limiter("a") is registry.limiter("a")
+    exported = []
+    registry.add_exporter(exported.append)
+    registry.export()
+    assert exported[0]["a"]["allowed"] == 1
+    assert exported[0]["b"]["throttled"] == 1
+
+    ticked = threading.Event()
+    registry.add_exporter(lambda snapshot: ticked.set())
+    stop = registry.start_exporting(0.01)
+    assert ticked.wait(5)
+    stop()
+
+
+def test_throttles_record_metrics_instead_of_printing(capsys):
+    decorated = throttle(60.0, name="test.throttle")(lambda: "ok")
+    wrapped = ThrottleFunction(lambda: "ok", 60.0, name="test.class_throttle")
+    for _ in range(3):
+        decorated()
+        wrapped()
+    assert capsys.readouterr().out == ""
+    for name in ("test.throttle", "test.class_throttle"):
+        snapshot = REGISTRY.snapshot()[name]
+        assert (snapshot["allowed"], snapshot["throttled"]) == (1, 2)
+        assert 0.0 <= snapshot["tokens"] < 0.01
+
+
+def test_rate_limit_records_waits():
+    now = [0.0]
+    bucket = TokenBucket(10.0, 1, clock=lambda: now[0], sleep=lambda s: now.__setitem__(0, now[0] + s))
+
+    @rate_limit(bucket, name="test.rate_limit")
+    def call():
+        return "ok"
+
+    for _ in range(3):
+        call()
+    snapshot = call.metrics.snapshot()
+    assert (snapshot["allowed"], snapshot["queued"]) == (3, 2)
+    assert snapshot["wait_seconds"] == pytest.approx(0.2)
+    assert snapshot["wait_histogram"][0.1] == 2
+    assert snapshot["tokens"] == pytest.approx(0.0)
+
+
+def test_default_names_include_the_module():
+    def call():
+        return "ok"
+
+    decorated = throttle(60.0)(call)
+    assert decorated.metrics.name == "test_limiter_metrics.test_default_names_include_the_module.<locals>.call"
+
+
+def test_limiters_sharing_a_name_get_their_own_gauge():
+    registry = MetricsRegistry()
+    first = registry.limiter("api", gauge=lambda: 1.0)
+    second = registry.limiter("api", gauge=lambda: 2.0)
+    assert (first.name, second.name) == ("api", "api#2")
+    assert registry.limiter("api") is first
+    snapshot = registry.snapshot()
+    assert (snapshot["api"]["tokens"], snapshot["api#2"]["tokens"]) == (1.0, 2.0)
+
+
+def test_repeated_decoration_does_not_fail():
+    def call():
+        return "ok"
+
+    wrapped = [ThrottleFunction(call, 60.0) for _ in range(3)]
+    assert len({w.metrics.name for w in wrapped}) == 3
+    importlib.reload(throttle_example)
+    importlib.reload(throttle_example)
+
+
+def test_metrics_leave_the_registry_with_their_limiter():
+    decorated = throttle(60.0, name="test.short_lived")(lambda: "ok")
+    wrapped = ThrottleFunction(lambda: "ok", 60.0, name="test.short_lived_class")
+    assert {"test.short_lived", "test.short_lived_class"} <= REGISTRY.snapshot().keys()
+    del decorated, wrapped
+    gc.collect()
+    assert not {"test.short_lived", "test.short_lived_class"} & REGISTRY.snapshot().keys()
+
+
+def test_cells_of_finished_threads_are_folded():
+    metrics = MetricsRegistry().limiter("api")
+    threads = [threading.Thread(target=metrics.allowed) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+    metrics.allowed()
+    assert metrics.snapshot()["allowed"] == 51
+    assert len(metrics._cells) == 1
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+from load_simulator import VirtualClock, bursty_arrivals, diurnal_arrivals, poisson_arrivals, simulate
+from rate_limiter import TokenBucket
+from throttle_example import ThrottleFunction, throttle
+
+
+def test_demo_schedule_replays_in_virtual_time():
+    # test_api_throttling: a 2 second throttle called every 0.5 seconds
+    clock = VirtualClock(start=1000.0)
+    api_call = throttle(2.0, name="test.simulated_api_call", clock=clock)(lambda endpoint: endpoint)
+    payment = ThrottleFunction(lambda amount: amount, 1.5, name="test.simulated_payment", clock=clock)
+    calls, payments = [], []
+    for i in range(5):
+        calls.append(api_call(i))
+        payments.append(payment(i))
+        clock.sleep(0.5)
+    assert calls == [0, None, None, None, 4]
+    assert payments == [0, None, None, 3, None]
+
+
+def test_first_call_is_allowed_at_time_zero():
+    clock = VirtualClock()
+    api_call = throttle(2.0, name="test.call_at_zero", clock=clock)(lambda: "called")
+    payment = ThrottleFunction(lambda: "paid", 1.5, name="test.payment_at_zero", clock=clock)
+    assert api_call.metrics.snapshot()["tokens"] == 1.0
+    assert api_call() == "called"
+    assert payment() == "paid"
+    assert api_call() is None and payment() is None
+    clock.sleep(2.0)
+    assert api_call() == "called"
+
+
+def test_traces_are_reproducible_and_have_the_right_rate():
+    arrivals = list(poisson_arrivals(1000.0, 10.0, seed=7))
+    assert arrivals == list(poisson_arrivals(1000.0, 10.0, seed=7))
+    assert arrivals == sorted(arrivals) and 0 < arrivals[0] and arrivals[-1] < 10.0
+    assert len(arrivals) == pytest.approx(10_000, rel=0.05)
+
+    bursts = list(bursty_arrivals(10.0, 1000.0, 1.0, 10.0, 100.0, seed=7))
+    assert bursts == sorted(bursts)
+    in_burst = sum(1 for t in bursts if t % 10.0 < 1.0)
+    assert in_burst == pytest.approx(10 * 1000, rel=0.05)
+    assert len(bursts) - in_burst == pytest.approx(10 * 90, rel=0.15)
+
+    daily = list(diurnal_arrivals(100.0, 1000.0, period=1000.0, amplitude=0.8, seed=7))
+    assert len(daily) == pytest.approx(100_000, rel=0.05)
+    night = sum(1 for t in daily if t < 100.0 or t >= 900.0)
+    noon = sum(1 for t in daily if 400.0 <= t < 600.0)
+    assert noon > 4 * night
+
+
+def test_simulate_reports_rejections():
+    clock = VirtualClock()
+    bucket = TokenBucket(100.0, 10, clock=clock, sleep=clock.sleep)
+    report = simulate(bucket.try_acquire, poisson_arrivals(400.0, 100.0, seed=3), clock)
+    assert report["admitted"] + report["rejected"] == report["calls"]
+    assert report["throughput"] == pytest.approx(100.0, rel=0.02)
+    assert report["rejection_rate"] == pytest.approx(0.75, abs=0.02)
+    assert report["max_latency"] == 0.0
+
+
+def test_blocking_limiter_queues_calls():
+    clock = VirtualClock()
+    bucket = TokenBucket(10.0, 1, clock=clock, sleep=clock.sleep)
+    # Five calls at once: each waits 0.1 seconds longer than the one before
+    report = simulate(bucket.acquire, [1.0] * 5, clock)
+    assert report["rejected"] == 0
+    assert clock.now == pytest.approx(1.4)
+    assert report["max_latency"] == pytest.approx(0.4)
+    assert report["latency"][50] == pytest.approx(0.2)
+
+
+def test_million_calls_run_fast():
+    clock = VirtualClock()
+    bucket = TokenBucket(1000.0, 100, clock=clock, sleep=clock.sleep)
+    start = time.perf_counter()
+    report = simulate(bucket.try_acquire, poisson_arrivals(10_000.0, 100.0, seed=1), clock)
+    assert report["calls"] == pytest.approx(1_000_000, rel=0.01)
+    assert report["throughput"] == pytest.approx(1000.0, rel=0.01)
+    assert time.perf_counter() - start < 60
@@ -1,6 +1,7 @@
 
+import threading
 import unittest
-from lru_cache import LRUCache
+from lru_cache import LRUCache, ShardedLRUCache
 
 class TestLRUCache(unittest.TestCase):
 
@@ -46,5 +47,180 @@ class TestLRUCache(unittest.TestCase):
         cache.put(1, 10)
         self.assertEqual(cache.get(1), 10)
 
+class TestShardedLRUCache(unittest.TestCase):
+
+    def test_put_and_get(self):
+        """Test that items land in their segments and come back out."""
+        cache = ShardedLRUCache(100, shards=4)
+        for key in range(50):
+            cache.put(key, key * 10)
+        self.assertEqual(cache.get(7), 70)
+        self.assertEqual(cache.get("missing"), -1)
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(cache.stats()["shard_sizes"], [13, 13, 12, 12])
+
+    def test_capacity_is_split_across_shards(self):
+        """Test that each segment evicts its own least recently used key."""
+        cache = ShardedLRUCache(10, shards=4)
+        self.assertEqual(cache.shard_capacity, 3)
+        self.assertEqual(cache.capacity, 12)
+        for key in (0, 4, 8):
+            cache.put(key, key)
+        cache.get(0)
+        cache.put(12, 12)  # Same segment as 0, 4 and 8: evicts 4
+        self.assertEqual(cache.get(4), -1)
+        self.assertEqual([cache.get(key) for key in (0, 8, 12)], [0, 8, 12])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_aggregate_stats(self):
+        """Test that hits, misses and evictions are summed over segments."""
+        cache = ShardedLRUCache(4, shards=2)
+        for key in range(6):
+            cache.put(key, key)
+        cache.put(5, 50)  # Update, not an eviction
+        for key in range(6):
+            cache.get(key)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (4, 2, 2))
+        self.assertEqual(stats["hit_ratio"], 4 / 6)
+        self.assertEqual(stats["size"], 4)
+
+    def test_segment_factory(self):
+        """Test that segments are built by the given factory."""
+        capacities = []
+
+        def factory(capacity):
+            capacities.append(capacity)
+            return LRUCache(capacity)
+        ShardedLRUCache(64, shards=8, segment_factory=factory)
+        self.assertEqual(capacities, [8] * 8)
+
+    def test_concurrent_use(self):
+        """Test that many threads can share the cache without losing updates."""
+        cache = ShardedLRUCache(1000, shards=8)
+        barrier = threading.Barrier(16)
+        errors = []
+
+        def worker(offset):
+            barrier.wait()
+            try:
+                for i in range(2000):
+                    key = (offset * 131 + i) % 1500
+                    cache.put(key, key)
+                    value = cache.get(key)
+                    if value not in (key, -1):
+                        errors.append((key, value))
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 16 * 2000)
+        self.assertLessEqual(len(cache), cache.capacity)
+        self.assertTrue(all(size <= cache.shard_capacity for size in stats["shard_sizes"]))
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCacheExpiryAndWeight(unittest.TestCase):
+
+    def test_items_expire_after_ttl(self):
+        """Test that an item is gone ttl seconds after it was put."""
+        clock = FakeClock()
+        cache = LRUCache(10, ttl=5.0, clock=clock)
+        cache.put(1, 1)
+        clock.now = 3.0
+        cache.put(2, 2)
+        self.assertEqual(cache.get(1), 1)  # Reading does not extend the ttl
+        clock.now = 5.0
+        self.assertEqual(cache.get(1), -1)
+        self.assertEqual(cache.get(2), 2)
+        cache.put(2, 20)  # Putting again does
+        clock.now = 9.0
+        self.assertEqual(cache.get(2), 20)
+        clock.now = 10.0
+        self.assertEqual(cache.get(2), -1)
+        self.assertEqual(len(cache.cache), 0)
+
+    def test_operations_sweep_expired_items(self):
+        """Test that expired items are removed without being looked up."""
+        clock = FakeClock()
+        cache = LRUCache(1000, ttl=1.0, clock=clock)
+        for key in range(100):
+            cache.put(key, key)
+        clock.now = 2.0
+        for key in range(100, 150):
+            cache.put(key, key)
+        # Each put sweeps up to two expired items
+        self.assertEqual(len(cache.cache), 50)
+        self.assertEqual(set(cache.cache), set(range(100, 150)))
+        clock.now = 4.0
+        self.assertEqual(cache.expire(), 50)
+        self.assertEqual(len(cache.cache), 0)
+        self.assertEqual(cache.weight, 0)
+
+    def test_weighted_capacity(self):
+        """Test that capacity bounds the total weight."""
+        cache = LRUCache(10, weigher=len)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+        cache.put("c", b"12345")  # Needs 5 of the 2 left: evicts b
+        self.assertEqual(cache.get("b"), -1)
+        self.assertEqual(cache.weight, 9)
+        cache.put("d", b"12345678")  # Evicts a and c, least recently used first
+        self.assertEqual(list(cache.cache), ["d"])
+        self.assertEqual(cache.weight, 8)
+        cache.put("d", b"1")
+        self.assertEqual(cache.weight, 1)
+
+    def test_item_heavier_than_capacity_is_not_cached(self):
+        """Test that an oversized item neither gets cached nor flushes the cache."""
+        cache = LRUCache(10, weigher=len)
+        cache.put("a", b"123")
+        cache.put("big", b"x" * 11)
+        self.assertEqual(cache.get("big"), -1)
+        self.assertEqual(cache.get("a"), b"123")
+        cache.put("a", b"x" * 11)  # Replacing with an oversized value drops the old one
+        self.assertEqual(cache.get("a"), -1)
+        self.assertEqual(cache.weight, 0)
+
+    def test_sharded_segments_with_ttl_and_weight(self):
+        """Test that ShardedLRUCache can build expiring, weighted segments."""
+        clock = FakeClock()
+        cache = ShardedLRUCache(100, shards=2,
+                                segment_factory=lambda capacity: LRUCache(capacity, ttl=1.0, weigher=len, clock=clock))
+        cache.put(0, b"x" * 50)
+        cache.put(2, b"x" * 10)  # Same segment: evicts 0
+        self.assertEqual(cache.get(0), -1)
+        clock.now = 1.0
+        self.assertEqual(cache.get(2), -1)
+        self.assertEqual(len(cache), 0)
+
+    def test_sharded_stats_separate_evictions_expirations_and_rejections(self):
+        """Test that only capacity pressure counts as an eviction."""
+        clock = FakeClock()
+        cache = ShardedLRUCache(20, shards=2,
+                                segment_factory=lambda capacity: LRUCache(capacity, ttl=1.0, weigher=len, clock=clock))
+        cache.put(0, b"x" * 6)
+        cache.put(2, b"x" * 6)  # Same segment: evicts 0
+        cache.put(4, b"x" * 11)  # Heavier than the segment: rejected
+        cache.put(1, b"x")
+        clock.now = 1.0
+        cache.put(3, b"x")  # Sweeps 1, which expired
+        self.assertEqual(cache.get(2), -1)  # Expired on lookup
+        stats = cache.stats()
+        self.assertEqual((stats["evictions"], stats["expirations"], stats["rejections"]), (1, 2, 1))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+from micro_batch import MicroBatcher, micro_batch
+
+
+def test_full_batches_are_sent_at_once():
+    sent = []
+
+    @micro_batch(max_batch_size=3, max_delay=60)
+    def double(items):
+        sent.append(list(items))
+        return [item * 2 for item in items]
+
+    futures = [double(i) for i in range(7)]
+    assert [f.result(timeout=0) for f in futures[:6]] == [0, 2, 4, 6, 8, 10]
+    assert not futures[6].done()
+    double.flush()
+    assert futures[6].result(timeout=0) == 12
+    assert sent == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_partial_batch_is_sent_after_max_delay():
+    sent = []
+    batcher = MicroBatcher(lambda items: sent.append(items) or items, max_batch_size=100, max_delay=0.05)
+    start = time.monotonic()
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == list(range(5))
+    assert time.monotonic() - start >= 0.05
+    assert sent == [[0, 1, 2, 3, 4]]
+    batcher.close()
+
+
+def test_equal_items_are_coalesced():
+    batcher = MicroBatcher(lambda items: [item.upper() for item in items], max_batch_size=4)
+    futures = [batcher.submit(q) for q in ["a", "b", "a", "a"]]
+    assert [f.result(timeout=0) for f in futures] == ["A", "B", "A", "A"]
+    assert batcher.calls == 4
+    assert batcher.batches == 1
+    batcher.close()
+
+
+def test_errors_reach_every_caller():
+    def broken(items):
+        raise RuntimeError("backend down")
+
+    batcher = MicroBatcher(broken, max_batch_size=2)
+    futures = [batcher.submit(i) for i in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=0)
+
+    short = MicroBatcher(lambda items: items[:-1], max_batch_size=2)
+    with pytest.raises(ValueError):
+        [short.submit(i) for i in range(2)][0].result(timeout=0)
+
+
+def test_concurrent_callers_get_their_own_results():
+    batches = []
+
+    @micro_batch(max_batch_size=16, max_delay=0.02)
+    def square(items):
+        batches.append(len(items))
+        return [item * item for item in items]
+
+    results = {}
+
+    def caller(i):
+        results[i] = square(i).result(timeout=5)
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(64)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {i: i * i for i in range(64)}
+    assert sum(batches) == 64
+    assert len(batches) < 64
+
+
+def test_close_flushes_and_rejects_new_items():
+    batcher = MicroBatcher(lambda items: items, max_delay=60)
+    future = batcher.submit(1)
+    batcher.close()
+    assert future.result(timeout=0) == 1
+    with pytest.raises(RuntimeError):
+        batcher.submit(2)
@@ -0,0 +1,82 @@
+import pytest
+import near_duplicates
+from near_duplicates import (
+    deduplicate_near_duplicates,
+    find_near_duplicates,
+    minhash_signatures,
+    optimal_bands,
+)
+
+
+@pytest.fixture
+def products():
+    return [
+        {"id": "p1", "name": "Laptop", "category": "Electronics", "price": 999},
+        {"id": "p2", "name": "Phone", "category": "Electronics", "price": 599},
+        {"id": "p1", "name": "Laptop Pro", "category": "Electronics", "price": 1299},
+        {"id": "p3", "name": "Book", "category": "Books", "price": 19},
+    ]
+
+
+def test_finds_laptop_variants(products):
+    assert find_near_duplicates(products, ["name", "category"], threshold=0.6) == [[0, 2]]
+
+
+def test_threshold_controls_links(products):
+    assert find_near_duplicates(products, ["name"], threshold=0.9) == []
+
+
+def test_deduplicate_keeps_first_of_cluster(products):
+    result = deduplicate_near_duplicates(products, ["name", "category"], threshold=0.6)
+    assert [p["name"] for p in result] == ["Laptop", "Phone", "Book"]
+
+
+def test_clusters_are_transitive():
+    objects = [{"t": "the quick brown fox jumps"}, {"t": "the quick brown fox jumped"},
+               {"t": "a quick brown fox jumped"}, {"t": "completely unrelated words"}]
+    assert find_near_duplicates(objects, ["t"], threshold=0.6) == [[0, 1, 2]]
+
+
+def test_signature_agreement_estimates_jaccard():
+    left, right = minhash_signatures(["abcdefghijklmnop", "abcdefghijklmxyz"], num_perm=256)
+    agreement = sum(x == y for x, y in zip(left, right)) / 256
+    # 11 shared of 17 distinct 3-shingles
+    assert agreement == pytest.approx(11 / 17, abs=0.12)
+
+
+def test_numpy_and_python_signatures_match(monkeypatch):
+    pytest.importorskip("numpy")
+    texts = ["Laptop Pro", "laptop", "x", ""]
+    vectorized = minhash_signatures(texts, num_perm=32, batch_size=3)
+    monkeypatch.setattr(near_duplicates, "np", None)
+    assert minhash_signatures(texts, num_perm=32) == vectorized
+
+
+def test_optimal_bands_fit_signature():
+    bands, rows = optimal_bands(0.5, 128)
+    assert bands * rows <= 128
+    assert 0.3 < (1 / bands) ** (1 / rows) < 0.7
+
+
+def test_invalid_threshold(products):
+    with pytest.raises(ValueError):
+        find_near_duplicates(products, ["name"], threshold=0)
+
+
+@pytest.mark.parametrize("bands", [0, 33])
+def test_invalid_bands(products, bands):
+    with pytest.raises(ValueError):
+        find_near_duplicates(products, ["name"], num_perm=32, bands=bands)
+
+
+def test_large_bucket_of_copies_is_one_cluster():
+    objects = [{"t": "the same listing title"} for _ in range(5000)] + [{"t": "something else entirely"}]
+    assert find_near_duplicates(objects, ["t"], num_perm=32) == [list(range(5000))]
+
+
+def test_records_without_text_are_never_clustered():
+    objects = [{"sku": 1}, {"sku": 2}, {"name": None}, {"name": "  "}, {"name": "Laptop"}, {"name": "Laptop"}]
+    assert find_near_duplicates(objects, ["name"]) == [[4, 5]]
+    assert deduplicate_near_duplicates(objects, ["name"]) == objects[:5]
+    assert find_near_duplicates([{"a": None, "b": "x y z"}, {"b": "x y z"}], ["a", "b"]) == [[0, 1]]
+    assert find_near_duplicates([{}, {}], ["name"]) == []
@@ -0,0 +1,135 @@
+import datetime
+import gc
+import multiprocessing
+import random
+import threading
+
+import pytest
+from deduplicate_objects import (
+    deduplicate_by_key,
+    deduplicate_by_multiple_keys,
+    deduplicate_by_custom_function,
+    deduplicate_by_json_string,
+    deduplicate_keep_latest,
+)
+import parallel_dedup
+from parallel_dedup import parallel_deduplicate
+
+
+def bucket_key(obj):
+    return obj["timestamp"] // 50
+
+
+@pytest.fixture(scope="module")
+def orders():
+    rng = random.Random(3)
+    orders = []
+    for i in range(3000):
+        order = {"order_id": i, "user_id": rng.choice([rng.randrange(300), f"u{rng.randrange(300)}"]),
+                 "sku": rng.choice("abc"), "timestamp": rng.randrange(1000)}
+        if rng.random() < 0.05:
+            del order["user_id"]
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_by_key(orders, workers):
+    result = parallel_deduplicate(orders, "key", key="user_id", max_workers=workers)
+    assert result == deduplicate_by_key(orders, "user_id")
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_keep_latest(orders, workers):
+    result = parallel_deduplicate(orders, "keep_latest", key="user_id", max_workers=workers, chunk_size=128)
+    assert result == deduplicate_keep_latest(orders, "user_id", "timestamp")
+
+
+def test_single_worker_skips_sharding(orders, monkeypatch):
+    def fail(*args):
+        raise AssertionError("a single worker should not shard")
+    monkeypatch.setattr(parallel_dedup, "_map_records", fail)
+    monkeypatch.setattr(parallel_dedup, "key_digest", fail)
+    result = parallel_deduplicate(orders, "keep_latest", key="user_id", max_workers=1)
+    assert result == deduplicate_keep_latest(orders, "user_id", "timestamp")
+
+
+@pytest.mark.parametrize("keep_latest", [False, True])
+def test_portable_shards_match_serial(orders, tmp_path, keep_latest):
+    # The map and reduce tasks run in-process, sharding on the digest used without fork
+    spec = ("keep_latest" if keep_latest else "key", "user_id", "timestamp")
+    ranges = [(start, min(start + 700, len(orders))) for start in range(0, len(orders), 700)]
+    for start, end in ranges:
+        parallel_dedup._map_records(orders[start:end], start, spec, 3, True, str(tmp_path))
+    reduced = [parallel_dedup._reduce_shard([parallel_dedup._shard_path(str(tmp_path), start, shard)
+                                             for start, _ in ranges], keep_latest)
+               for shard in range(3)]
+    expected = deduplicate_keep_latest(orders, "user_id", "timestamp") if keep_latest \
+        else deduplicate_by_key(orders, "user_id")
+    assert parallel_dedup._gather(orders, reduced) == expected
+
+
+def test_default_start_method_is_respected(orders, monkeypatch, tmp_path):
+    get_context = multiprocessing.get_context
+    monkeypatch.setattr(multiprocessing, "get_context", lambda method=None: get_context(method or "spawn"))
+    result = parallel_deduplicate(orders, "keep_latest", key="user_id", max_workers=2, temp_dir=str(tmp_path))
+    assert result == deduplicate_keep_latest(orders, "user_id", "timestamp")
+
+
+def test_keeps_a_freeze_made_by_the_application(orders):
+    gc.freeze()
+    try:
+        parallel_deduplicate(orders, "key", key="user_id", max_workers=2)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+    parallel_deduplicate(orders, "key", key="user_id", max_workers=2)
+    assert gc.get_freeze_count() == 0
+
+
+def test_concurrent_calls_from_threads(orders):
+    inputs = [orders, [{"user_id": i % 7, "timestamp": i} for i in range(500)]]
+    results = [None, None]
+
+    def run(index):
+        results[index] = parallel_deduplicate(inputs[index], "key", key="user_id", max_workers=2)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [deduplicate_by_key(data, "user_id") for data in inputs]
+
+
+def test_multiple_keys(orders):
+    result = parallel_deduplicate(orders, "multiple_keys", keys=["user_id", "sku"], max_workers=2)
+    assert result == deduplicate_by_multiple_keys(orders, ["user_id", "sku"])
+
+
+def test_custom_function(orders):
+    result = parallel_deduplicate(orders, "custom_function", key_func=bucket_key, max_workers=2)
+    assert result == deduplicate_by_custom_function(orders, bucket_key)
+
+
+def test_json_string():
+    when = datetime.datetime(2024, 1, 1)
+    objects = [{"a": i % 7, "at": when} for i in range(100)] + [{"at": when, "a": 3}]
+    assert parallel_deduplicate(objects, "json_string", max_workers=2, chunk_size=10) == \
+        deduplicate_by_json_string(objects)
+
+
+def test_equal_numeric_keys_share_a_shard():
+    objects = [{"id": 1}, {"id": 1.0}, {"id": True}, {"id": 2}]
+    assert parallel_deduplicate(objects, "key", key="id", max_workers=4, chunk_size=1) == [{"id": 1}, {"id": 2}]
+
+
+def test_empty_input():
+    assert parallel_deduplicate([], "key", key="id", max_workers=2) == []
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        parallel_deduplicate([], "fuzzy")
+    with pytest.raises(ValueError, match="requires key"):
+        parallel_deduplicate([], "keep_latest")
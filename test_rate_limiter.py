@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+from rate_limiter import SlidingWindowCounter, SlidingWindowLog, TokenBucket, rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make(cls, clock, *args):
+    return cls(*args, clock=clock, sleep=clock.sleep)
+
+
+def test_token_bucket_burst_then_rate(clock):
+    bucket = make(TokenBucket, clock, 2.0, 3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now = 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now = 100
+    assert bucket.available == 3
+
+
+def test_token_bucket_blocking_wait(clock):
+    bucket = make(TokenBucket, clock, 4.0, 1)
+    assert bucket.acquire()
+    assert bucket.acquire()
+    assert clock.now == pytest.approx(0.25)
+    assert not bucket.acquire(timeout=0.1)
+    assert clock.now == pytest.approx(0.25)
+    assert bucket.acquire(timeout=0.25)
+
+
+def test_sliding_window_log_is_exact(clock):
+    log = make(SlidingWindowLog, clock, 3, 1.0)
+    for now in (0.0, 0.4, 0.8):
+        clock.now = now
+        assert log.try_acquire()
+    clock.now = 0.99
+    assert not log.try_acquire()
+    clock.now = 1.0
+    assert log.try_acquire()
+    assert log.acquire()
+    assert clock.now == pytest.approx(1.4)
+
+
+def test_sliding_window_log_rounds_fractional_costs_up(clock):
+    log = make(SlidingWindowLog, clock, 2, 1.0)
+    assert log.try_acquire(0.5)
+    assert not log.try_acquire(1.5)
+    assert log.try_acquire(0.1)
+    assert not log.try_acquire(0.5)
+    with pytest.raises(ValueError):
+        log.try_acquire(2.5)
+
+
+def test_sliding_window_counter_weights_previous_window(clock):
+    counter = make(SlidingWindowCounter, clock, 10, 1.0)
+    assert all(counter.try_acquire() for _ in range(10))
+    assert not counter.try_acquire()
+    # Halfway into the next window half of the previous count still applies
+    clock.now = 1.5
+    assert all(counter.try_acquire() for _ in range(5))
+    assert not counter.try_acquire()
+    assert counter.acquire()
+    assert 1.5 < clock.now < 2.0
+    clock.now = 5
+    assert all(counter.try_acquire() for _ in range(10))
+
+
+# The counter's estimate errs on the safe side, so it admits somewhat fewer calls
+@pytest.mark.parametrize("cls, args, tolerance", [(TokenBucket, (10.0, 5), 0.01), (SlidingWindowLog, (5, 0.5), 0.01),
+                                                  (SlidingWindowCounter, (5, 0.5), 0.3)])
+def test_blocking_acquire_holds_rate(clock, cls, args, tolerance):
+    limiter = make(cls, clock, *args)
+    for _ in range(105):
+        assert limiter.acquire()
+    # 5 calls up front, then 10 per second
+    assert 10 * (1 - tolerance) <= clock.now <= 10 * (1 + tolerance)
+
+
+def test_rejects_requests_larger_than_capacity(clock):
+    for limiter in (make(TokenBucket, clock, 1.0, 2), make(SlidingWindowLog, clock, 2, 1.0),
+                    make(SlidingWindowCounter, clock, 2, 1.0)):
+        with pytest.raises(ValueError):
+            limiter.try_acquire(3)
+
+
+def test_decorator_modes(clock):
+    calls = []
+
+    @rate_limit(make(TokenBucket, clock, 1.0, 1), blocking=False)
+    def dropping(x):
+        calls.append(x)
+        return x
+
+    @rate_limit(make(TokenBucket, clock, 1.0, 1))
+    def waiting(x):
+        calls.append(x)
+        return x
+
+    assert [dropping(i) for i in range(3)] == [0, None, None]
+    assert [waiting(i) for i in range(3)] == [0, 1, 2]
+    assert clock.now == pytest.approx(2)
+    assert dropping.__name__ == "dropping"
+    assert calls == [0, 0, 1, 2]
+
+
+def test_limiters_are_thread_safe():
+    limiters = [TokenBucket(1e-6, 100), SlidingWindowLog(100, 3600.0), SlidingWindowCounter(100, 3600.0)]
+    for limiter in limiters:
+        barrier = threading.Barrier(32)
+        admitted = []
+
+        def worker():
+            barrier.wait()
+            admitted.extend(limiter.try_acquire() for _ in range(20))
+
+        workers = [threading.Thread(target=worker) for _ in range(32)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        assert admitted.count(True) == 100
@@ -0,0 +1,91 @@
+import fcntl
+import multiprocessing
+import os
+
+import pytest
+from shared_limiter import SharedTokenBucket
+
+
+def take_tokens(path, attempts, results):
+    with SharedTokenBucket(path, rate=1e-6, burst=100) as limiter:
+        results.put(sum(limiter.try_acquire() for _ in range(attempts)))
+
+
+def die_holding_lock(path):
+    limiter = SharedTokenBucket(path, rate=1e-6, burst=100)
+    limiter._locked().__enter__()
+    os._exit(1)
+
+
+def test_processes_share_one_budget(tmp_path):
+    path = str(tmp_path / "bucket")
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=take_tokens, args=(path, 50, results)) for _ in range(8)]
+    for worker in workers:
+        worker.start()
+    admitted = sum(results.get(timeout=30) for _ in workers)
+    for worker in workers:
+        worker.join()
+    assert admitted == 100
+
+
+def test_survives_a_worker_crashing_inside_the_lock(tmp_path):
+    path = str(tmp_path / "bucket")
+    worker = multiprocessing.Process(target=die_holding_lock, args=(path,))
+    worker.start()
+    worker.join()
+    assert worker.exitcode == 1
+    with SharedTokenBucket(path, rate=1e-6, burst=100) as limiter:
+        assert limiter.try_acquire()
+
+
+def test_state_persists_between_opens(tmp_path):
+    path = str(tmp_path / "bucket")
+    with SharedTokenBucket(path, rate=1e-6, burst=3) as limiter:
+        assert limiter.try_acquire(2)
+    with SharedTokenBucket(path, rate=1e-6, burst=3) as limiter:
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+
+
+def test_resets_state_from_an_earlier_boot(tmp_path):
+    path = str(tmp_path / "bucket")
+    with SharedTokenBucket(path, rate=1.0, burst=2, clock=lambda: 1000.0) as limiter:
+        assert limiter.try_acquire(2)
+    # Monotonic time restarted below the stored timestamp
+    with SharedTokenBucket(path, rate=1.0, burst=2, clock=lambda: 5.0) as limiter:
+        assert limiter.try_acquire(2)
+
+
+def test_rejects_mismatched_configuration(tmp_path):
+    path = str(tmp_path / "bucket")
+    SharedTokenBucket(path, rate=10.0, burst=5).close()
+    with pytest.raises(ValueError):
+        SharedTokenBucket(path, rate=20.0, burst=5)
+    other = tmp_path / "other"
+    other.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        SharedTokenBucket(str(other), rate=10.0, burst=5)
+
+
+def test_bucket_opened_before_fork_locks_across_processes(tmp_path):
+    path = str(tmp_path / "bucket")
+    with SharedTokenBucket(path, rate=1e-6, burst=100) as limiter:
+        with limiter._locked():
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    fcntl.flock(limiter._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os._exit(0)
+                os._exit(1)
+            _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+        # The child draws from the same budget once the parent lets go
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if limiter.try_acquire(60) else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert not limiter.try_acquire(60)
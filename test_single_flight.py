@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from async_throttle import async_throttle
+from single_flight import AsyncSingleFlight, SingleFlight, SingleFlightError, single_flight
+from throttle_example import throttle
+
+
+def run_callers(func, arg, count, ready):
+    results = []
+    errors = []
+
+    def caller():
+        try:
+            results.append(func(arg))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=caller) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    # Hold the backend until every caller has joined the running call
+    deadline = time.monotonic() + 10
+    while func.flight.in_flight((arg,)) < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+    ready.set()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+    ready = threading.Event()
+
+    @single_flight()
+    @throttle(3.0)
+    def user_profile_api(user_id):
+        calls.append(user_id)
+        ready.wait()
+        return f"Profile data for user: {user_id}"
+
+    results, errors = run_callers(user_profile_api, 1001, 200, ready)
+    assert calls == [1001]
+    assert errors == []
+    assert results == ["Profile data for user: 1001"] * 200
+    assert user_profile_api.flight.in_flight((1001,)) == 0
+
+
+def test_exceptions_are_shared():
+    calls = []
+    ready = threading.Event()
+
+    @single_flight()
+    def failing(x):
+        calls.append(x)
+        ready.wait()
+        raise KeyError(x)
+
+    results, errors = run_callers(failing, 7, 20, ready)
+    assert calls == [7]
+    assert results == []
+    assert len(errors) == 20
+    # The caller that ran it gets the KeyError, the others a fresh wrapper each
+    assert sum(isinstance(e, KeyError) for e in errors) == 1
+    shared = [e for e in errors if isinstance(e, SingleFlightError)]
+    assert len(shared) == 19 and len({id(e) for e in shared}) == 19
+    assert all(isinstance(e.__cause__, KeyError) for e in shared)
+
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+    assert flight.do("k", lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do("k", lambda: calls.append(1) or len(calls)) == 2
+    assert flight.do("k", lambda x, y=0: x + y, 1, y=2) == 3
+
+
+def test_async_callers_share_one_call():
+    calls = []
+
+    @single_flight()
+    @async_throttle(rate=1000)
+    async def fetch(user_id, verbose=False):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return {"id": user_id}
+
+    async def main():
+        return await asyncio.gather(*(fetch(i % 2) for i in range(100)), fetch(1, verbose=True))
+
+    results = asyncio.run(main())
+    assert sorted(calls) == [0, 1, 1]
+    assert results[:2] == [{"id": 0}, {"id": 1}]
+    assert results[0] is results[98]
+
+
+def test_async_cancelled_caller_does_not_cancel_others():
+    async def main():
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        assert flight.in_flight("k") == 2
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, flight.in_flight("k")
+
+    assert asyncio.run(main()) == ("done", 0)
+
+
+def test_async_exceptions_are_wrapped_for_other_callers():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise KeyError("k")
+
+    async def main():
+        flight = AsyncSingleFlight()
+        return await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+
+    first, *others = asyncio.run(main())
+    assert isinstance(first, KeyError)
+    assert all(isinstance(e, SingleFlightError) and e.__cause__ is first for e in others)
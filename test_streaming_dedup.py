@@ -0,0 +1,110 @@
+import json
+import random
+
+import pytest
+from deduplicate_objects import (
+    deduplicate_by_key,
+    deduplicate_by_multiple_keys,
+    deduplicate_by_custom_function,
+    deduplicate_by_json_string,
+    deduplicate_keep_latest,
+)
+from streaming_dedup import (
+    iter_jsonl,
+    stream_deduplicate_by_key,
+    stream_deduplicate_by_multiple_keys,
+    stream_deduplicate_by_custom_function,
+    stream_deduplicate_by_json_string,
+    stream_deduplicate_keep_latest,
+)
+
+
+def make_orders(n, seed=7):
+    rng = random.Random(seed)
+    orders = []
+    for i in range(n):
+        order = {"order_id": i, "user_id": rng.randrange(200), "sku": rng.choice("abcde"),
+                 "timestamp": rng.randrange(1000)}
+        if rng.random() < 0.05:
+            del order["user_id"]
+        orders.append(order)
+    return orders
+
+
+@pytest.fixture
+def orders():
+    return make_orders(2000)
+
+
+def test_in_memory_path_matches(orders):
+    assert list(stream_deduplicate_by_key(orders, "user_id")) == deduplicate_by_key(orders, "user_id")
+
+
+@pytest.mark.parametrize("max_keys", [1, 7, 50])
+def test_spilled_by_key_matches(orders, tmp_path, max_keys):
+    result = stream_deduplicate_by_key(orders, "user_id", max_keys_in_memory=max_keys,
+                                       num_partitions=4, temp_dir=tmp_path)
+    assert list(result) == deduplicate_by_key(orders, "user_id")
+
+
+def test_spilled_multiple_keys_matches(orders, tmp_path):
+    result = stream_deduplicate_by_multiple_keys(orders, ["user_id", "sku"], max_keys_in_memory=10,
+                                                 num_partitions=3, temp_dir=tmp_path)
+    assert list(result) == deduplicate_by_multiple_keys(orders, ["user_id", "sku"])
+
+
+def test_spilled_custom_function_matches(orders, tmp_path):
+    def key_func(obj):
+        return obj["timestamp"] // 10
+
+    result = stream_deduplicate_by_custom_function(orders, key_func, max_keys_in_memory=5,
+                                                   temp_dir=tmp_path)
+    assert list(result) == deduplicate_by_custom_function(orders, key_func)
+
+
+def test_spilled_json_string_matches(tmp_path):
+    objects = [{"a": i % 13, "b": i % 3} for i in range(300)] + [{"b": 1, "a": 1}]
+    result = stream_deduplicate_by_json_string(objects, max_keys_in_memory=4, num_partitions=2,
+                                               temp_dir=tmp_path)
+    assert list(result) == deduplicate_by_json_string(objects)
+
+
+@pytest.mark.parametrize("max_keys", [1, 20, 10_000])
+def test_keep_latest_matches(orders, tmp_path, max_keys):
+    result = stream_deduplicate_keep_latest(orders, "user_id", "timestamp", max_keys_in_memory=max_keys,
+                                            num_partitions=5, temp_dir=tmp_path)
+    assert list(result) == deduplicate_keep_latest(orders, "user_id", "timestamp")
+
+
+def test_reads_jsonl_path(orders, tmp_path):
+    path = tmp_path / "orders.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for order in orders:
+            f.write(json.dumps(order) + "\n")
+        f.write("\n")
+
+    assert list(iter_jsonl(path)) == orders
+    result = stream_deduplicate_by_key(str(path), "user_id", max_keys_in_memory=16, temp_dir=tmp_path)
+    assert list(result) == deduplicate_by_key(orders, "user_id")
+
+
+def test_yields_lazily():
+    def source():
+        yield {"id": 1}
+        yield {"id": 1}
+        yield {"id": 2}
+        raise AssertionError("read past the records that were needed")
+
+    stream = stream_deduplicate_by_key(source(), "id")
+    assert next(stream) == {"id": 1}
+    assert next(stream) == {"id": 2}
+
+
+def test_spill_files_are_removed(orders, tmp_path):
+    list(stream_deduplicate_by_key(orders, "user_id", max_keys_in_memory=3, temp_dir=tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        list(stream_deduplicate_by_key([], "id", max_keys_in_memory=0))
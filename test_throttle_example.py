@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+import throttle_example
+from throttle_example import ThrottleFunction, throttle
+
+
+class YieldingTimestamp(float):
+    def __sub__(self, other):
+        time.sleep(0)
+        return float(self) - other
+
+
+class YieldingTime:
+    """Stands in for the time module; comparing a timestamp yields to other threads."""
+    def time(self):
+        return YieldingTimestamp(time.time())
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+@pytest.fixture(autouse=True)
+def yielding_clock(monkeypatch):
+    # A thread switch between checking the clock and recording the call is what
+    # lets several threads through the same window, so force one on every check
+    monkeypatch.setattr(throttle_example, "time", YieldingTime())
+
+
+def run_concurrently(func, threads=64, calls_per_thread=50):
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls_per_thread):
+            results.append(func())
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+def test_throttle_admits_one_call_per_window():
+    calls = []
+    throttled = throttle(60.0)(lambda: calls.append(1) or "ok")
+    results = run_concurrently(throttled)
+    assert results.count("ok") == 1
+    assert len(calls) == 1
+
+
+def test_class_throttle_admits_one_call_per_window():
+    calls = []
+    throttled = ThrottleFunction(lambda: calls.append(1) or "ok", 60.0)
+    results = run_concurrently(throttled)
+    assert results.count("ok") == 1
+    assert len(calls) == 1
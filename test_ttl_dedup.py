@@ -0,0 +1,81 @@
+import pytest
+from ttl_dedup import WindowedDeduplicator
+
+
+def event_id(event):
+    return event["id"]
+
+
+def events(*pairs):
+    return [{"id": key, "ts": ts} for key, ts in pairs]
+
+
+def test_drops_duplicates_within_time_window():
+    dedup = WindowedDeduplicator(event_id, window_seconds=10, timestamp_key="ts")
+    stream = events(("a", 0), ("b", 1), ("a", 5), ("a", 16), ("b", 17))
+    assert list(dedup.filter(stream)) == [stream[0], stream[1], stream[3], stream[4]]
+
+
+def test_repeated_sightings_extend_the_window():
+    dedup = WindowedDeduplicator(event_id, window_seconds=10, timestamp_key="ts")
+    stream = events(("a", 0), ("a", 8), ("a", 16), ("a", 27))
+    assert [e["ts"] for e in dedup.filter(stream)] == [0, 27]
+
+
+def test_memory_tracks_window_not_history():
+    dedup = WindowedDeduplicator(event_id, window_seconds=5, timestamp_key="ts")
+    for ts in range(10_000):
+        dedup.accept({"id": ts, "ts": ts})
+    assert len(dedup) <= 6
+    assert len(dedup._expiry) <= 6
+
+
+def test_out_of_order_within_lateness():
+    dedup = WindowedDeduplicator(event_id, window_seconds=10, timestamp_key="ts", allowed_lateness=5)
+    stream = events(("a", 100), ("b", 103), ("a", 99), ("c", 98), ("d", 94))
+    assert [e["id"] for e in dedup.filter(stream)] == ["a", "b", "c"]
+    assert dedup.watermark == 98
+
+
+def test_event_count_window():
+    dedup = WindowedDeduplicator(event_id, window_events=3)
+    stream = [{"id": key} for key in "abcabdeaa"]
+    # The second "a" is within the last 3 events; the third is not
+    assert "".join(e["id"] for e in dedup.filter(stream)) == "abcdea"
+    assert len(dedup) <= 3
+
+
+def test_arrival_time_clock():
+    now = [0.0]
+    dedup = WindowedDeduplicator(event_id, window_seconds=1, clock=lambda: now[0])
+    assert dedup.accept({"id": 1})
+    now[0] = 0.5
+    assert not dedup.accept({"id": 1})
+    now[0] = 2.0
+    assert dedup.accept({"id": 1})
+
+
+def test_per_window_stats():
+    dedup = WindowedDeduplicator(event_id, window_seconds=10, timestamp_key="ts", max_stat_windows=2)
+    list(dedup.filter(events(("a", 1), ("a", 2), ("b", 12), ("a", 25), ("c", 3))))
+    assert dedup.stats() == [
+        {"window_start": 10, "events": 1, "passed": 1, "duplicates": 0, "late": 0},
+        {"window_start": 20, "events": 1, "passed": 1, "duplicates": 0, "late": 0},
+    ]
+    dedup.accept({"id": "z", "ts": 15})
+    assert dedup.stats()[0]["late"] == 1
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        WindowedDeduplicator(event_id)
+    with pytest.raises(ValueError):
+        WindowedDeduplicator(event_id, window_seconds=1, window_events=1)
+    with pytest.raises(ValueError):
+        WindowedDeduplicator(event_id, window_seconds=1, allowed_lateness=-1)
+
+
+def test_mixed_key_types_with_equal_expiry():
+    dedup = WindowedDeduplicator(event_id, window_seconds=1, timestamp_key="ts")
+    stream = events((1, 0), ("1", 0), ((1,), 0), (1, 5))
+    assert len(list(dedup.filter(stream))) == 4
@@ -1,25 +1,59 @@
+import inspect
+import threading
 import time
 from functools import wraps
 
-def throttle(delay):
+from keyed_limiter import keyed_throttle
+from limiter_metrics import REGISTRY, default_name
+
+def throttle(delay, name=None, clock=None):
     """
     Throttle decorator that limits function execution to once per delay period.
+    Coroutine functions stay awaitable; use async_throttle to queue their
+    excess calls instead of dropping them.
+    Allowed and throttled calls are counted in limiter_metrics.REGISTRY.
     
     Args:
         delay (float): Time in seconds between allowed function calls
+        name (str): Name the metrics are reported under; defaults to the function's module and qualified name
+        clock (callable): Time source in seconds; defaults to time.time
+            (load_simulator.VirtualClock replays traffic without waiting)
     """
     def decorator(func):
-        last_called = [0]  # Using list to make it mutable in closure
+        # Using list to make it mutable in closure; -inf so the first call is
+        # allowed whatever the clock reads, including a VirtualClock at 0
+        last_called = [float("-inf")]
+        lock = threading.Lock()
+        now = clock or (lambda: time.time())
+        metrics = REGISTRY.limiter(
+            name or default_name(func),
+            gauge=lambda: min(1.0, (now() - last_called[0]) / delay) if delay > 0 else 1.0,
+        )
         
         @wraps(func)
         def wrapper(*args, **kwargs):
-            current_time = time.time()
-            if current_time - last_called[0] >= delay:
-                last_called[0] = current_time
+            # Only the check-and-set is locked; func itself runs outside the lock
+            with lock:
+                current_time = now()
+                allowed = current_time - last_called[0] >= delay
+                if allowed:
+                    last_called[0] = current_time
+            if allowed:
+                metrics.allowed()
                 return func(*args, **kwargs)
             else:
-                print(f"Function {func.__name__} throttled - called too frequently")
+                metrics.throttled()
                 return None
+        
+        if inspect.iscoroutinefunction(func):
+            # Keep coroutine functions awaitable: a dropped call resolves to None
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                result = wrapper(*args, **kwargs)
+                return None if result is None else await result
+            async_wrapper.metrics = metrics
+            return async_wrapper
+        wrapper.metrics = metrics
         return wrapper
     return decorator
 
@@ -36,7 +70,7 @@ def search_api(query):
     time.sleep(0.1)  # Simulate search processing
     return f"Search results for: {query}"
 
-@throttle(3.0)  # Allow only one call per 3 seconds
+@keyed_throttle(rate=1 / 3.0)  # Allow only one call per 3 seconds for each user
 def user_profile_api(user_id):
     print(f"Fetching profile for user: {user_id}")
     time.sleep(0.1)  # Simulate database query
@@ -69,8 +103,8 @@ def test_api_throttling():
         time.sleep(0.3)  # Wait 0.3 seconds between calls
     
     # Test 3: User profile API with longer throttle
-    print("\nTest 3: User profile API calls (3-second throttle):")
-    user_ids = [1001, 1002, 1003, 1004, 1005]
+    print("\nTest 3: User profile API calls (3-second throttle per user):")
+    user_ids = [1001, 1002, 1001, 1003, 1002]
     for user_id in user_ids:
         result = user_profile_api(user_id)
         if result:
@@ -79,20 +113,37 @@ def test_api_throttling():
             print(f"✗ Profile fetch for user {user_id} throttled")
         time.sleep(1.0)  # Wait 1 second between calls
 
+async def _dropped_call():
+    return None
+
 # Alternative implementation using a class
 class ThrottleFunction:
-    def __init__(self, func, delay):
+    def __init__(self, func, delay, name=None, clock=None):
         self.func = func
         self.delay = delay
-        self.last_called = 0
+        self.clock = clock or (lambda: time.time())
+        self.last_called = float("-inf")  # Never called, so the first call is always allowed
+        self._lock = threading.Lock()
+        self.metrics = REGISTRY.limiter(name or default_name(func), gauge=self._readiness)
+    
+    def _readiness(self):
+        if self.delay <= 0:
+            return 1.0
+        return min(1.0, (self.clock() - self.last_called) / self.delay)
     
     def __call__(self, *args, **kwargs):
-        current_time = time.time()
-        if current_time - self.last_called >= self.delay:
-            self.last_called = current_time
+        with self._lock:
+            current_time = self.clock()
+            allowed = current_time - self.last_called >= self.delay
+            if allowed:
+                self.last_called = current_time
+        if allowed:
+            self.metrics.allowed()
             return self.func(*args, **kwargs)
         else:
-            print(f"Function {self.func.__name__} throttled")
+            self.metrics.throttled()
+            if inspect.iscoroutinefunction(self.func):
+                return _dropped_call()
             return None
 
 # Test class-based throttle
@@ -133,3 +184,7 @@ if __name__ == "__main__":
     print("- Only the first call in each throttle period is executed")
     print("- Subsequent calls within the throttle period are blocked")
     print("- Different functions can have different throttle delays")
+    
+    print("\nThrottle metrics:")
+    for name, stats in REGISTRY.snapshot().items():
+        print(f"- {name}: {stats['allowed']} allowed, {stats['throttled']} throttled")
@@ -0,0 +1,175 @@
+import heapq
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from key_spec import KeySpec, compile_key_spec
+
+
+class WindowedDeduplicator:
+    """
+    Streaming deduplicator that drops events whose key was seen within a sliding
+    window of the last N seconds or the last N events.
+
+    Unlike deduplicate_keep_latest, state only covers the window: expired keys
+    are evicted incrementally from a min-heap of expiry times (time windows) or
+    a ring of recent keys (event windows), so memory tracks the window size
+    rather than the whole history.
+    """
+    def __init__(self, key_func: Union[Callable[[Dict], Any], KeySpec], window_seconds: Optional[float] = None,
+                 window_events: Optional[int] = None, timestamp_key: Optional[str] = None,
+                 allowed_lateness: float = 0.0, clock: Callable[[], float] = time.time,
+                 max_stat_windows: int = 100):
+        """
+        Args:
+            key_func: Function that takes an event and returns its dedup key,
+                or a key spec (path or list of paths) to compile
+            window_seconds: Length of a time-based window
+            window_events: Length of an event-count window (use instead of window_seconds)
+            timestamp_key: Event key holding its timestamp; events are stamped
+                with clock() on arrival when omitted
+            allowed_lateness: How far (in seconds) behind the newest timestamp an
+                event may arrive before it is dropped as late
+            clock: Time source used when timestamp_key is not given
+            max_stat_windows: Number of most recent windows kept in stats()
+        """
+        if (window_seconds is None) == (window_events is None):
+            raise ValueError("Specify exactly one of window_seconds or window_events")
+        if window_seconds is not None and window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        if window_events is not None and window_events < 1:
+            raise ValueError("window_events must be at least 1")
+        if allowed_lateness < 0:
+            raise ValueError("allowed_lateness cannot be negative")
+
+        self.key_func = compile_key_spec(key_func)
+        self.window_seconds = window_seconds
+        self.window_events = window_events
+        self.timestamp_key = timestamp_key
+        self.allowed_lateness = allowed_lateness
+        self.clock = clock
+        self.max_stat_windows = max_stat_windows
+
+        # Time windows: key -> newest timestamp, plus (expiry, seq, key) heap
+        self._last_seen = {}
+        self._expiry = []
+        self._pushed = 0
+        self._max_timestamp = float("-inf")
+        # Event windows: ring of recent keys with per-key counts
+        self._recent = deque()
+        self._counts = {}
+        self._events = 0
+
+        self._stats = {}
+
+    @property
+    def watermark(self) -> float:
+        """Events with timestamps below this are dropped as late."""
+        return self._max_timestamp - self.allowed_lateness
+
+    def __len__(self) -> int:
+        """Number of keys currently held in the window."""
+        return len(self._last_seen) if self.window_seconds is not None else len(self._counts)
+
+    def _window_stats(self, window_start: float) -> Dict[str, Any]:
+        stats = self._stats.get(window_start)
+        if stats is None:
+            stats = {"window_start": window_start, "events": 0, "passed": 0, "duplicates": 0, "late": 0}
+            self._stats[window_start] = stats
+            if len(self._stats) > self.max_stat_windows:
+                # Late events can open windows out of order, so drop the oldest by start
+                del self._stats[min(self._stats)]
+        return stats
+
+    def accept(self, event: Dict) -> bool:
+        """
+        Records an event and decides whether it passes.
+
+        Args:
+            event: The event to check
+
+        Returns:
+            True if the key was not seen within the window, False for duplicates and late events
+        """
+        key = self.key_func(event)
+        if self.window_events is not None:
+            return self._accept_counted(key)
+        timestamp = event[self.timestamp_key] if self.timestamp_key else self.clock()
+        return self._accept_timed(key, timestamp)
+
+    def _accept_counted(self, key: Any) -> bool:
+        stats = self._window_stats(self._events // self.window_events * self.window_events)
+        self._events += 1
+        stats["events"] += 1
+
+        counts = self._counts
+        duplicate = key in counts
+        counts[key] = counts.get(key, 0) + 1
+        self._recent.append(key)
+        if len(self._recent) > self.window_events:
+            expired = self._recent.popleft()
+            if counts[expired] == 1:
+                del counts[expired]
+            else:
+                counts[expired] -= 1
+
+        stats["duplicates" if duplicate else "passed"] += 1
+        return not duplicate
+
+    def _accept_timed(self, key: Any, timestamp: float) -> bool:
+        window = self.window_seconds
+        stats = self._window_stats(timestamp // window * window)
+        stats["events"] += 1
+        if timestamp < self.watermark:
+            stats["late"] += 1
+            return False
+
+        if timestamp > self._max_timestamp:
+            self._max_timestamp = timestamp
+            self._evict_expired()
+
+        last = self._last_seen.get(key)
+        duplicate = last is not None and abs(timestamp - last) < window
+        if last is None or timestamp > last:
+            self._last_seen[key] = timestamp
+            # The sequence number breaks expiry ties so keys are never compared
+            self._pushed += 1
+            heapq.heappush(self._expiry, (timestamp + window, self._pushed, key))
+
+        stats["duplicates" if duplicate else "passed"] += 1
+        return not duplicate
+
+    def _evict_expired(self) -> None:
+        # A key whose newest timestamp plus the window is at or below the
+        # watermark can no longer match any event that is not already late.
+        watermark = self.watermark
+        expiry, last_seen, window = self._expiry, self._last_seen, self.window_seconds
+        while expiry and expiry[0][0] <= watermark:
+            _, _, key = heapq.heappop(expiry)
+            last = last_seen.get(key)
+            if last is not None and last + window <= watermark:
+                del last_seen[key]
+
+    def filter(self, events: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Lazily yield the events that pass.
+
+        Args:
+            events: Iterable of events
+
+        Returns:
+            Iterator of events whose key was not seen within the window
+        """
+        accept = self.accept
+        for event in events:
+            if accept(event):
+                yield event
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            Per-window counts of events, passed, duplicate and late events,
+            oldest window first; time windows are keyed by their start time and
+            event windows by the index of their first event
+        """
+        return [dict(self._stats[start]) for start in sorted(self._stats)]